@@ -1,18 +1,30 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Literal, Optional
+from collections import OrderedDict
 import aiohttp
 import os
 import logging
 import httpx
 import json
+import random
+import time
+import uuid
 import yaml
 from prometheus_fastapi_instrumentator import Instrumentator
+import fast_json
+from fast_json import ORJSONResponse
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli is optional, gzip is always available
+    BrotliMiddleware = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Agent Service", version="1.0.0")
+app = FastAPI(title="Agent Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Setup Prometheus metrics
 Instrumentator().instrument(app).expose(app)
@@ -22,6 +34,20 @@ LLM_PROXY_URL = os.getenv("LLM_PROXY_URL", "http://litellm:4000")
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://mcp-server:8000")
 LITELLM_API_KEY = os.getenv("LITELLM_API_KEY", "sk-1234")
 
+# Response size controls
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+STEP_PAYLOAD_MAX_ITEMS = int(os.getenv("STEP_PAYLOAD_MAX_ITEMS", "500"))
+STEP_PAYLOAD_TTL_SECONDS = int(os.getenv("STEP_PAYLOAD_TTL_SECONDS", "900"))
+TOOL_RESULT_SUMMARY_CHARS = 200
+TOOL_RESULT_LOG_SAMPLE_RATE = float(os.getenv("TOOL_RESULT_LOG_SAMPLE_RATE", "0.1"))
+
+# Compress responses: brotli when installed (it falls back to gzip for clients
+# that don't accept br), plain gzip otherwise
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_SIZE)
+
 # Load agent prompts from YAML file
 def load_agent_prompts():
     """Load agent system prompts from config/agent_prompts.yaml"""
@@ -56,6 +82,7 @@ class AgentRequest(BaseModel):
     temperature: float = 0.7  # Sampling temperature
     top_p: float = 0.9  # Nucleus sampling
     top_k: int = 40  # Top-k sampling
+    verbosity: Literal["minimal", "summary", "full"] = "full"  # How much tool output to embed; "full" keeps the original response contract
 
 class AgentResponse(BaseModel):
     result: str
@@ -73,6 +100,84 @@ class ChatResponse(BaseModel):
     response: str
     model: str
 
+class StepPayloadStore:
+    """Bounded in-memory store for full tool results, fetched lazily by payload id"""
+
+    def __init__(self, max_items: int = 500, ttl_seconds: int = 900):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def put(self, payload: Any) -> str:
+        payload_id = uuid.uuid4().hex
+        self._items[payload_id] = (time.monotonic() + self.ttl_seconds, payload)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return payload_id
+
+    def get(self, payload_id: str) -> Optional[Any]:
+        item = self._items.get(payload_id)
+        if item is None:
+            return None
+        expires_at, payload = item
+        if expires_at < time.monotonic():
+            del self._items[payload_id]
+            return None
+        return payload
+
+step_payloads = StepPayloadStore(max_items=STEP_PAYLOAD_MAX_ITEMS, ttl_seconds=STEP_PAYLOAD_TTL_SECONDS)
+
+def summarize_tool_result(tool_result: Any, limit: int = TOOL_RESULT_SUMMARY_CHARS) -> str:
+    """Short, human-readable preview of a tool result"""
+    text = tool_result if isinstance(tool_result, str) else fast_json.dumps_str(tool_result)
+    return text[:limit] + "..." if len(text) > limit else text
+
+def log_tool_result(tool_name: str, tool_result: Any):
+    """Log a sample of full tool results at DEBUG instead of every result at INFO"""
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < TOOL_RESULT_LOG_SAMPLE_RATE:
+        logger.debug(f"Tool result ({tool_name}): {summarize_tool_result(tool_result, limit=2000)}")
+
+def shape_steps(steps: List[Dict], verbosity: str) -> List[Dict]:
+    """Trim embedded tool results according to the requested verbosity"""
+    if verbosity == "full":
+        return steps
+
+    shaped = []
+    for step in steps:
+        step = dict(step)
+        result = step.get("result")
+        if isinstance(result, (dict, list)):
+            step["payload_id"] = step_payloads.put(result)
+            if verbosity == "summary":
+                step["result"] = summarize_tool_result(result)
+            else:
+                del step["result"]
+        if verbosity == "minimal":
+            step.pop("arguments", None)
+        shaped.append(step)
+    return shaped
+
+def shape_metadata(metadata: Dict, verbosity: str) -> Dict:
+    """Trim MCP usage details according to the requested verbosity"""
+    mcp_usage = metadata.get("mcp_usage")
+    if verbosity != "minimal" or not mcp_usage:
+        return metadata
+
+    metadata = dict(metadata)
+    metadata["mcp_usage"] = {
+        "tools_used": [{"name": tool["name"]} for tool in mcp_usage.get("tools_used", [])],
+        "resources_accessed": mcp_usage.get("resources_accessed", [])
+    }
+    return metadata
+
+def make_agent_response(verbosity: str, steps: List[Dict], metadata: Dict, **kwargs) -> "AgentResponse":
+    """Build an AgentResponse shaped for the requested verbosity"""
+    return AgentResponse(
+        steps=shape_steps(steps, verbosity),
+        metadata=shape_metadata(metadata, verbosity),
+        **kwargs
+    )
+
 @app.get("/health")
 async def health_check():
     health_status = {
@@ -177,68 +282,62 @@ def convert_tools_to_functions(mcp_tools: List[Dict]) -> List[Dict]:
 
     return functions
 
+# Last /tools/list response, revalidated with If-None-Match so unchanged
+# catalogs cost a 304 and skip the function conversion
+_tools_cache: Dict[str, Any] = {"etag": None, "tools": [], "functions": []}
+
+async def fetch_mcp_tools() -> tuple:
+    """Fetch MCP tools and their function-calling definitions, using the ETag cache"""
+    headers = {"If-None-Match": _tools_cache["etag"]} if _tools_cache["etag"] else {}
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(f"{MCP_SERVER_URL}/tools/list", headers=headers, timeout=10.0)
+
+    if resp.status_code == 304:
+        return _tools_cache["tools"], _tools_cache["functions"]
+
+    resp.raise_for_status()
+    tools = fast_json.loads(resp.content).get('tools', [])
+    _tools_cache.update(
+        etag=resp.headers.get("etag"),
+        tools=tools,
+        functions=convert_tools_to_functions(tools)
+    )
+    return tools, _tools_cache["functions"]
+
 async def call_mcp_tool(tool_name: str, arguments: Dict) -> Dict:
-    """Call an MCP server tool"""
-    # Map tool names to MCP endpoints
-    endpoint_map = {
-        "search_knowledge_base": "/tools/search",
-        "get_document": lambda args: f"/resources/document/{args.get('document_id')}",
-        "analyze_data": "/tools/analyze_data",
-        "generate_chart": "/tools/generate_chart",
-        "process_csv": "/tools/process_csv",
-        "semantic_search": "/tools/semantic_search",
-        "web_search": "/tools/web_search",
-        "find_similar_documents": lambda args: f"/tools/find_similar_documents/{args.get('document_id')}",
-        "summarize_document": "/tools/summarize_document",
-        "translate_text": "/tools/translate_text",
-        "generate_report": "/tools/generate_report",
-        "check_permissions": "/tools/check_permissions",
-        "audit_log": "/tools/audit_log",
-        "scan_sensitive_data": "/tools/scan_sensitive_data",
-        "create_task": "/tools/create_task",
-        "send_notification": "/tools/send_notification",
-        "schedule_meeting": "/tools/schedule_meeting",
-        "call_api": "/tools/call_api",
-        "execute_sql": "/tools/execute_sql",
-        "sql_query": "/tools/sql_query",
-        "sql_get_schema": "/tools/sql_get_schema",
-        "sql_list_tables": "/tools/sql_list_tables",
-        "sql_explain_query": "/tools/sql_explain_query",
-        "run_script": "/tools/run_script",
-        "send_email": "/tools/send_email",
-        "create_slack_message": "/tools/create_slack_message",
-        "upload_file": "/tools/upload_file",
-        "download_file": "/tools/download_file",
-        "list_files": "/tools/list_files",
-        "calculate_metrics": "/tools/calculate_metrics",
-        "financial_calculator": "/tools/financial_calculator",
-    }
+    """Call an MCP server tool through the generic /tools/invoke dispatcher"""
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{MCP_SERVER_URL}/tools/invoke",
+            headers={"Content-Type": "application/json"},
+            content=fast_json.dumps({"tool": tool_name, "arguments": arguments}),
+            timeout=30.0
+        )
 
-    endpoint = endpoint_map.get(tool_name)
-    if not endpoint:
-        raise ValueError(f"Unknown tool: {tool_name}")
-
-    # Handle dynamic endpoints (lambdas)
-    if callable(endpoint):
-        endpoint = endpoint(arguments)
-        method = "GET"
-    else:
-        # Only sql_list_tables uses GET, other SQL tools use POST
-        if tool_name == "sql_list_tables":
-            method = "GET"
-        else:
-            method = "POST" if not endpoint.startswith("/resources/") else "GET"
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
+
+        return fast_json.loads(response.content)
 
+async def call_mcp_tools_batch(calls: List[Dict]) -> List[Dict]:
+    """
+    Call several MCP tools concurrently in one request via /tools/batch_invoke
+
+    Each call is {"id", "tool", "arguments"}; returns per-call results in the
+    same order, each with "success" and either "result" or "error".
+    """
     async with httpx.AsyncClient() as client:
-        if method == "GET":
-            response = await client.get(f"{MCP_SERVER_URL}{endpoint}", timeout=30.0)
-        else:
-            response = await client.post(f"{MCP_SERVER_URL}{endpoint}", json=arguments, timeout=30.0)
+        response = await client.post(
+            f"{MCP_SERVER_URL}/tools/batch_invoke",
+            headers={"Content-Type": "application/json"},
+            content=fast_json.dumps({"calls": calls}),
+            timeout=60.0
+        )
 
         if response.status_code != 200:
             raise HTTPException(status_code=response.status_code, detail=response.text)
 
-        return response.json()
+        return fast_json.loads(response.content)["results"]
 
 def detect_tool_intent(task: str) -> Optional[tuple]:
     """Fallback: Detect tool intent from user message when function calling not supported"""
@@ -528,18 +627,13 @@ async def execute_agent(request: AgentRequest):
 
         # Step 1: 獲取可用工具
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(f"{MCP_SERVER_URL}/tools/list", timeout=10.0)
-                tools_data = resp.json()
-                tools = tools_data.get('tools', [])
-                steps.append({
-                    "step": "fetch_tools",
-                    "result": f"Found {len(tools)} tools",
-                    "status": "success"
-                })
-
-                # Convert to function calling format
-                functions = convert_tools_to_functions(tools)
+            # Function calling definitions are cached alongside the tool list
+            tools, functions = await fetch_mcp_tools()
+            steps.append({
+                "step": "fetch_tools",
+                "result": f"Found {len(tools)} tools",
+                "status": "success"
+            })
         except Exception as e:
             logger.error(f"Failed to fetch tools: {e}")
             steps.append({
@@ -577,7 +671,7 @@ async def execute_agent(request: AgentRequest):
                 # Call the tool directly
                 tool_result = await call_mcp_tool(tool_name, tool_args)
 
-                logger.info(f"Tool result: {tool_result}")
+                log_tool_result(tool_name, tool_result)
 
                 steps.append({
                     "step": "tool_execution",
@@ -626,7 +720,7 @@ async def execute_agent(request: AgentRequest):
                         result_items = []
                         for i, r in enumerate(results[:5], 1):
                             title = r.get('title', 'N/A')
-                            content = r.get('content', '')[:200]  # First 200 chars
+                            content = (r.get('snippet') or r.get('content', ''))[:200]  # First 200 chars
                             result_items.append(f"{i}. **{title}**\n   {content}...")
                         result = f"✅ 搜索完成！找到 {len(results)} 個結果。\n\n" + "\n\n".join(result_items)
                     else:
@@ -712,10 +806,11 @@ async def execute_agent(request: AgentRequest):
                 mcp_usage["tools_used"].append({
                     "name": tool_name,
                     "arguments": tool_args,
-                    "result_summary": str(tool_result)[:200] + "..." if len(str(tool_result)) > 200 else str(tool_result)
+                    "result_summary": summarize_tool_result(tool_result)
                 })
 
-                return AgentResponse(
+                return make_agent_response(
+                    request.verbosity,
                     result=result,
                     steps=steps,
                     metadata={
@@ -736,7 +831,8 @@ async def execute_agent(request: AgentRequest):
                     "status": "failed"
                 })
 
-                return AgentResponse(
+                return make_agent_response(
+                    request.verbosity,
                     result=f"❌ 工具執行失敗: {str(tool_error)}",
                     steps=steps,
                     metadata={
@@ -845,10 +941,14 @@ async def execute_agent(request: AgentRequest):
                         if not request.model.startswith("claude"):
                             llm_payload["tool_choice"] = "auto"
 
+                    # messages carry full tool results, so serialize with orjson
                     llm_response = await client.post(
                         f"{LLM_PROXY_URL}/v1/chat/completions",
-                        headers={"Authorization": f"Bearer {LITELLM_API_KEY}"},
-                        json=llm_payload,
+                        headers={
+                            "Authorization": f"Bearer {LITELLM_API_KEY}",
+                            "Content-Type": "application/json"
+                        },
+                        content=fast_json.dumps(llm_payload),
                         timeout=60.0
                     )
 
@@ -864,13 +964,14 @@ async def execute_agent(request: AgentRequest):
                             "status": "failed"
                         })
 
-                        return AgentResponse(
+                        return make_agent_response(
+                            request.verbosity,
                             result=f"LLM錯誤: {error_detail}",
                             steps=steps,
                             metadata={"agent_type": request.agent_type, "error": error_detail, "mcp_usage": mcp_usage}
                         )
 
-                    llm_data = llm_response.json()
+                    llm_data = fast_json.loads(llm_response.content)
                     assistant_message = llm_data["choices"][0]["message"]
 
                     # Add assistant message to history
@@ -903,7 +1004,8 @@ async def execute_agent(request: AgentRequest):
                             "status": "success"
                         })
 
-                        return AgentResponse(
+                        return make_agent_response(
+                            request.verbosity,
                             result=result,
                             steps=steps,
                             metadata={
@@ -917,10 +1019,11 @@ async def execute_agent(request: AgentRequest):
                             needs_more_info=needs_more_info
                         )
 
-                    # Execute each tool call
+                    # Collect every tool call of this turn
+                    pending_calls = []
                     for tool_call in tool_calls:
                         function_name = tool_call["function"]["name"]
-                        function_args = json.loads(tool_call["function"]["arguments"])
+                        function_args = fast_json.loads(tool_call["function"]["arguments"])
 
                         steps.append({
                             "step": f"tool_call_{iteration}",
@@ -928,16 +1031,30 @@ async def execute_agent(request: AgentRequest):
                             "arguments": function_args,
                             "status": "executing"
                         })
+                        pending_calls.append((tool_call, function_name, function_args))
 
-                        try:
-                            # Call the MCP tool
-                            tool_result = await call_mcp_tool(function_name, function_args)
+                    # Execute them concurrently on the MCP server in one round trip
+                    try:
+                        call_results = await call_mcp_tools_batch([
+                            {"id": tool_call["id"], "tool": function_name, "arguments": function_args}
+                            for tool_call, function_name, function_args in pending_calls
+                        ])
+                    except Exception as batch_error:
+                        call_results = [{"success": False, "error": str(batch_error)} for _ in pending_calls]
+
+                    for (tool_call, function_name, function_args), call_result in zip(pending_calls, call_results):
+                        if call_result["success"]:
+                            tool_result = call_result["result"]
+                            log_tool_result(function_name, tool_result)
+
+                            # Serialize once, reused for the summary and the LLM message
+                            tool_result_json = fast_json.dumps_str(tool_result)
 
                             # Track tool usage
                             tool_usage_record = {
                                 "name": function_name,
                                 "arguments": function_args,
-                                "result_summary": str(tool_result)[:200] + "..." if len(str(tool_result)) > 200 else str(tool_result)
+                                "result_summary": summarize_tool_result(tool_result_json)
                             }
                             mcp_usage["tools_used"].append(tool_usage_record)
 
@@ -964,10 +1081,11 @@ async def execute_agent(request: AgentRequest):
                             messages.append({
                                 "role": "tool",
                                 "tool_call_id": tool_call["id"],
-                                "content": json.dumps(tool_result)
+                                "content": tool_result_json
                             })
 
-                        except Exception as tool_error:
+                        else:
+                            tool_error = call_result["error"]
                             logger.error(f"Tool execution error for {function_name}: {tool_error}")
                             steps.append({
                                 "step": f"tool_error_{iteration}",
@@ -980,7 +1098,7 @@ async def execute_agent(request: AgentRequest):
                             messages.append({
                                 "role": "tool",
                                 "tool_call_id": tool_call["id"],
-                                "content": json.dumps({"error": str(tool_error)})
+                                "content": fast_json.dumps_str({"error": str(tool_error)})
                             })
 
                     # Continue loop to get LLM's response with tool results
@@ -993,14 +1111,16 @@ async def execute_agent(request: AgentRequest):
                     "status": "failed"
                 })
 
-                return AgentResponse(
+                return make_agent_response(
+                    request.verbosity,
                     result=f"處理失敗: {str(e)}",
                     steps=steps,
                     metadata={"agent_type": request.agent_type, "error": str(e), "mcp_usage": mcp_usage}
                 )
 
         # Max iterations reached
-        return AgentResponse(
+        return make_agent_response(
+            request.verbosity,
             result="任務處理超過最大迭代次數",
             steps=steps,
             metadata={"agent_type": request.agent_type, "max_iterations_reached": True, "mcp_usage": mcp_usage}
@@ -1010,6 +1130,14 @@ async def execute_agent(request: AgentRequest):
         logger.error(f"Agent execution error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/agent/steps/{payload_id}")
+async def get_step_payload(payload_id: str):
+    """獲取步驟的完整工具結果 (verbosity 為 minimal/summary 時使用)"""
+    payload = step_payloads.get(payload_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Step payload not found or expired")
+    return {"payload_id": payload_id, "result": payload}
+
 @app.post("/agent/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """簡單的聊天介面"""
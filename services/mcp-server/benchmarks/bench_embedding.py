@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput benchmark for document ingestion
+
+Compares the old process_document path (one encode() call per chunk) against
+batched encoding, with and without length sorting, and reports chunks/sec.
+
+Usage:
+    cd services/mcp-server && python benchmarks/bench_embedding.py [--chunks 200] [--batch-sizes 8,32,64]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sentence_transformers import SentenceTransformer
+
+from utils.embedding_batching import encode_in_batches
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+WORDS = (
+    "the supplier shall deliver all goods within thirty days of the purchase order "
+    "warranty covers manufacturing defects for twelve months from acceptance "
+    "本合約 雙方 同意 交貨 期限 品質 保證 付款 條件 違約 責任 保密 義務"
+).split()
+
+
+def make_chunks(count: int, seed: int = 42) -> list:
+    """Chunks with the uneven lengths real documents produce (short headings to full chunks)"""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.choice([8, 40, 120, 250, 500]))) for _ in range(count)]
+
+
+def per_chunk(model, chunks, batch_size):
+    for chunk in chunks:
+        model.encode(chunk, show_progress_bar=False)
+
+
+def batched_unsorted(model, chunks, batch_size):
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i:i + batch_size]
+        model.encode(batch, batch_size=len(batch), show_progress_bar=False)
+
+
+def batched_sorted(model, chunks, batch_size):
+    encode_in_batches(
+        chunks,
+        lambda batch: model.encode(batch, batch_size=len(batch), show_progress_bar=False),
+        batch_size
+    )
+
+
+def run(fn, model, chunks, batch_size, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(model, chunks, batch_size)
+        best = min(best, time.perf_counter() - start)
+    return len(chunks) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding throughput")
+    parser.add_argument("--chunks", type=int, default=200)
+    parser.add_argument("--batch-sizes", default="8,32,64")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    model = SentenceTransformer(MODEL_NAME)
+    chunks = make_chunks(args.chunks)
+    model.encode(chunks[:4], show_progress_bar=False)  # warm up
+
+    print("=" * 64)
+    print(f"{MODEL_NAME}, {len(chunks)} chunks")
+    print(f"{'mode':28} {'batch':>6} {'chunks/sec':>12} {'speedup':>9}")
+    print("-" * 64)
+    baseline = run(per_chunk, model, chunks, 1, args.repeats)
+    print(f"{'per-chunk loop (old)':28} {1:6} {baseline:12.1f} {1.0:8.1f}x")
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        for name, fn in (("batched", batched_unsorted), ("batched, length-sorted", batched_sorted)):
+            rate = run(fn, model, chunks, batch_size, args.repeats)
+            print(f"{name:28} {batch_size:6} {rate:12.1f} {rate / baseline:8.1f}x")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Embedding backend benchmark: PyTorch vs ONNX Runtime vs int8 ONNX Runtime
+
+Each backend is loaded in its own process (so RSS is not shared) and reports:
+  - throughput in chunks/sec, encoding the corpus in batches of --batch-size
+  - p50/p95 latency of single-text encodes (the search query path)
+  - peak RSS of the process after loading and encoding
+  - cosine agreement with the PyTorch vectors for the same texts (mean / min)
+
+Usage:
+    cd services/mcp-server && python benchmarks/bench_embedding_backends.py [--chunks 512] [--batch-size 32] [--queries 100]
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.embedding_backends import EMBEDDING_BACKENDS, load_embedding_backend
+
+MODEL = "all-MiniLM-L6-v2"
+
+WORDS = (
+    "contract liability invoice payment employee policy retention security incident "
+    "report quarterly revenue forecast supplier delivery compliance audit data privacy "
+    "customer onboarding renewal termination clause warranty shipment"
+).split()
+
+
+def make_texts(count: int, seed: int = 11):
+    """Chunk-like texts of mixed length (10-300 words)"""
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(WORDS, size=int(rng.integers(10, 300)))) for _ in range(count)]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend, texts, queries, batch_size, threads, results):
+    model = load_embedding_backend(backend, MODEL, threads)
+    model.encode(texts[:batch_size])  # warm-up
+
+    start = time.perf_counter()
+    vectors = np.concatenate([model.encode(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    latencies = []
+    for query in queries:
+        t0 = time.perf_counter()
+        model.encode([query])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    results[backend] = {
+        "dimension": model.dimension,
+        "throughput": throughput,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "rss": peak_rss_mb(),
+        "vectors": vectors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads for ONNX Runtime")
+    parser.add_argument("--backends", default=",".join(EMBEDDING_BACKENDS))
+    args = parser.parse_args()
+
+    texts = make_texts(args.chunks)
+    queries = [" ".join(t.split()[:8]) for t in texts[:args.queries]]
+    backends = args.backends.split(",")
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for backend in backends:
+        process = context.Process(
+            target=run_backend, args=(backend, texts, queries, args.batch_size, args.threads, results)
+        )
+        process.start()
+        process.join()
+        if backend not in results:
+            print(f"{backend}: failed (exit code {process.exitcode})")
+
+    baseline = results.get("torch")
+    print("=" * 96)
+    print(f"{MODEL}, {args.chunks} chunks, batch size {args.batch_size}, {args.queries} single-text queries")
+    print(f"{'backend':12} {'dim':>5} {'chunks/sec':>11} {'p50 ms':>8} {'p95 ms':>8} {'peak RSS MB':>12} {'cos mean':>9} {'cos min':>8}")
+    print("-" * 96)
+    for backend in backends:
+        r = results.get(backend)
+        if r is None:
+            continue
+        if baseline is not None:
+            # Both sides are L2-normalized, so the row-wise dot product is the cosine
+            cosine = (r["vectors"] * baseline["vectors"]).sum(axis=1)
+            agreement = f"{cosine.mean():9.5f} {cosine.min():8.5f}"
+        else:
+            agreement = f"{'n/a':>9} {'n/a':>8}"
+        print(f"{backend:12} {r['dimension']:5} {r['throughput']:11.1f} {r['p50']:8.2f} {r['p95']:8.2f} {r['rss']:12.0f} {agreement}")
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Quantization benchmark: recall@k, latency and memory per configuration
+
+For each configuration (float32, scalar int8, binary; with and without
+oversampling/rescoring) this reports:
+  - recall@k against exact float32 cosine top-k
+  - p50/p95 search latency through Qdrant, using the same create_collection
+    and search params RAGService uses
+  - bytes per vector kept in RAM
+
+Qdrant's local mode (the default, --location :memory:) stores the
+quantization config but always searches the float32 vectors. So recall is
+also computed with a numpy emulation of int8 / binary scoring plus rescoring
+("emulated recall"). Pass --url http://localhost:6333 to measure a real
+server, where the Qdrant recall column reflects actual quantized search.
+
+Usage:
+    cd services/mcp-server && python benchmarks/bench_quantization.py [--points 20000] [--queries 200] [--k 10]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from utils.qdrant_ops import quantization_config, quantization_search_params
+
+DIM = 384  # all-MiniLM-L6-v2
+
+# (label, mode, oversampling, rescore)
+CONFIGS = [
+    ("float32", "none", 1.0, False),
+    ("int8", "scalar", 1.0, False),
+    ("int8 + rescore x2", "scalar", 2.0, True),
+    ("binary", "binary", 1.0, False),
+    ("binary + rescore x2", "binary", 2.0, True),
+    ("binary + rescore x4", "binary", 4.0, True),
+]
+
+BYTES_PER_VECTOR = {"none": DIM * 4, "scalar": DIM, "binary": DIM // 8}
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def make_corpus(points: int, queries: int, seed: int = 7):
+    """Clustered unit vectors (embeddings cluster by topic) and nearby queries"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(points // 200, 8), DIM))
+    assignment = rng.integers(0, len(centers), size=points)
+    corpus = normalize(centers[assignment] + rng.normal(scale=0.6, size=(points, DIM))).astype(np.float32)
+    picks = rng.integers(0, points, size=queries)
+    query_vectors = normalize(corpus[picks] + rng.normal(scale=0.3, size=(queries, DIM))).astype(np.float32)
+    return corpus, query_vectors
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall(found, truth) -> float:
+    return statistics.mean(len(set(f) & set(t)) / len(t) for f, t in zip(found, truth))
+
+
+def emulated_search(corpus, queries, mode, k, oversampling, rescore):
+    """Top-k ids from quantized scores, optionally rescored with float32 over k * oversampling candidates"""
+    if mode == "none":
+        return exact_top_k(corpus, queries, k)
+
+    if mode == "scalar":
+        low, high = np.quantile(corpus, [0.005, 0.995])
+        scale = (high - low) / 255
+        quantize = lambda x: np.clip(np.round((x - low) / scale), 0, 255) * scale + low
+        approx = quantize(queries) @ quantize(corpus).T
+    else:
+        approx = np.sign(queries) @ np.sign(corpus).T
+
+    fetch = int(k * oversampling)
+    candidates = np.argsort(-approx, axis=1)[:, :fetch]
+    if not rescore:
+        return candidates[:, :k]
+    exact = np.take_along_axis(queries @ corpus.T, candidates, axis=1)
+    return np.take_along_axis(candidates, np.argsort(-exact, axis=1)[:, :k], axis=1)
+
+
+def qdrant_run(client, corpus, queries, mode, k, oversampling, rescore):
+    name = f"bench_{mode}"
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=DIM, distance=Distance.COSINE, on_disk=mode != "none"),
+        quantization_config=quantization_config(mode)
+    )
+    for start in range(0, len(corpus), 1000):
+        client.upsert(name, [
+            PointStruct(id=start + i, vector=v.tolist()) for i, v in enumerate(corpus[start:start + 1000])
+        ], wait=True)
+
+    params = quantization_search_params(mode, oversampling, rescore)
+    latencies, found = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        hits = client.search(name, query_vector=q.tolist(), limit=k, search_params=params)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        found.append([h.id for h in hits])
+    client.delete_collection(name)
+    latencies.sort()
+    return found, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant quantization configurations")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--location", default=":memory:", help="Qdrant local mode location")
+    parser.add_argument("--url", default=None, help="Qdrant server URL (overrides --location)")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(location=args.location)
+    corpus, queries = make_corpus(args.points, args.queries)
+    truth = exact_top_k(corpus, queries, args.k)
+
+    print("=" * 100)
+    print(f"{args.points} x {DIM}-dim vectors, {args.queries} queries, k={args.k}, "
+          f"qdrant={'server ' + args.url if args.url else 'local ' + args.location}")
+    print(f"{'config':24} {'RAM B/vec':>10} {'emulated recall':>16} {'qdrant recall':>14} {'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 100)
+    for label, mode, oversampling, rescore in CONFIGS:
+        emulated = recall(emulated_search(corpus, queries, mode, args.k, oversampling, rescore), truth)
+        found, p50, p95 = qdrant_run(client, corpus, queries, mode, args.k, oversampling, rescore)
+        print(f"{label:24} {BYTES_PER_VECTOR[mode]:10} {emulated:16.3f} {recall(found, truth):14.3f} {p50:8.2f} {p95:8.2f}")
+    print("=" * 100)
+    if not args.url:
+        print("Note: local mode ignores quantization, so its recall/latency columns reflect float32 search.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for the largest MCP payloads
+
+Compares the old path (tool json.dumps(indent=2) -> main.py json.loads ->
+jsonable_encoder -> stdlib JSONResponse) against returning a dict through the
+ORJSONResponse default class, and returning ORJSONResponse directly (what the
+SQL, OCR and contract review endpoints do).
+
+Usage:
+    cd services/mcp-server && python benchmarks/bench_serialization.py [--iterations 50]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from tools.contract_review import review_contract_tool
+from utils.fast_json import ORJSONResponse, dumps, loads
+
+
+def make_sql_result(rows: int = 5000) -> dict:
+    """Synthetic sql_query result with the types asyncpg returns"""
+    now = datetime.now()
+    results = [
+        {
+            "id": i,
+            "order_no": f"SO-2024-{i:06d}",
+            "customer": f"客戶 {i % 97}",
+            "amount": Decimal(f"{i * 13.37:.2f}"),
+            "quantity": i % 50,
+            "status": "completed" if i % 3 else "pending",
+            "created_at": now - timedelta(minutes=i)
+        }
+        for i in range(rows)
+    ]
+    return {
+        "success": True,
+        "query": "SELECT * FROM sales_orders",
+        "rows_returned": len(results),
+        "results": results,
+        "columns": [{"name": k, "type": type(v).__name__} for k, v in results[0].items()],
+        "execution_time_seconds": 0.042,
+        "executed_at": now.isoformat()
+    }
+
+
+def make_ocr_result(pages: int = 200) -> dict:
+    """Synthetic OCR result: mixed Chinese/English page text"""
+    page = ("第一條 本合約雙方同意以下條款。The parties agree to the following terms. " * 40 + "\n")
+    text = page * pages
+    return {
+        "success": True,
+        "text": text,
+        "text_length": len(text),
+        "word_count": len(text.split()),
+        "backend": "EasyOCR",
+        "ocr_used": True,
+        "file": "scanned.pdf"
+    }
+
+
+def make_contract_review() -> dict:
+    """Real contract review output for a long synthetic contract"""
+    clauses = [
+        "Employee agrees to indemnify Company for any and all losses with unlimited liability.",
+        "Company may terminate this agreement at any time without cause or notice.",
+        "Employee agrees not to work for any competing business for 5 years anywhere in the world.",
+        "Any disputes shall be resolved through binding arbitration in Company's jurisdiction.",
+    ]
+    contract = "EMPLOYMENT AGREEMENT\n\n" + "\n\n".join(
+        f"{i + 1}. SECTION {i + 1}\n{clauses[i % len(clauses)]}" for i in range(400)
+    )
+    return asyncio.run(review_contract_tool(contract, "Benchmark Contract", "employment"))
+
+
+def old_path(payload: dict) -> bytes:
+    """Tool pre-serializes, main.py parses it back, FastAPI encodes and renders with stdlib json"""
+    as_string = json.dumps(payload, ensure_ascii=False, indent=2, default=str)
+    parsed = json.loads(as_string)
+    return JSONResponse(content=jsonable_encoder(parsed)).body
+
+
+def default_class_path(payload: dict) -> bytes:
+    """Handler returns a dict: FastAPI still runs jsonable_encoder, then ORJSONResponse renders"""
+    return ORJSONResponse(content=jsonable_encoder(payload)).body
+
+
+def new_path(payload: dict) -> bytes:
+    """Handler returns ORJSONResponse directly, skipping jsonable_encoder"""
+    return ORJSONResponse(content=payload).body
+
+
+def time_it(fn, payload, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP response serialization")
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+
+    payloads = {
+        "sql_query (5000 rows)": make_sql_result(),
+        "ocr_extract_pdf (200 pages)": make_ocr_result(),
+        "review_contract (400 clauses)": make_contract_review(),
+    }
+
+    print("=" * 90)
+    print(f"{'payload':32} {'size KB':>9} {'stdlib ms':>11} {'encoder+orjson':>15} {'orjson ms':>11} {'speedup':>9}")
+    print("-" * 90)
+    for name, payload in payloads.items():
+        body = new_path(payload)
+        assert loads(body) == loads(dumps(jsonable_encoder(payload)))  # same JSON either way
+
+        old = statistics.median(time_it(old_path, payload, args.iterations))
+        mid = statistics.median(time_it(default_class_path, payload, args.iterations))
+        new = statistics.median(time_it(new_path, payload, args.iterations))
+        print(f"{name:32} {len(body) / 1024:9.1f} {old:11.2f} {mid:15.2f} {new:11.2f} {old / new:8.1f}x")
+
+        # Request side: decoding the same body (agent-service reading MCP responses)
+        dec_old = statistics.median(time_it(json.loads, body, args.iterations))
+        dec_new = statistics.median(time_it(loads, body, args.iterations))
+        print(f"{'  decode':32} {'':9} {dec_old:11.2f} {'':15} {dec_new:11.2f} {dec_old / dec_new:8.1f}x")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,39 @@ Enterprise RAG Service
 Handles document processing, vectorization, and semantic search
 """
 
+import asyncio
+import codecs
 import logging
-from typing import List, Dict, Optional, Any
-from sentence_transformers import SentenceTransformer
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+import os
+from typing import List, Dict, Optional, Any, Awaitable, BinaryIO, Callable, Iterator, Union
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue,
+    PointIdsList, SetPayload, SetPayloadOperation, Disabled, VectorParamsDiff
+)
 import PyPDF2
 import docx
 import io
-import hashlib
 from datetime import datetime
+from utils.fulltext_search import search_documents
+from utils.rank_fusion import fuse, suggest_keyword_weight
+from utils.embedding_backends import DEFAULT_MAX_SEQ_LENGTH, EMBEDDING_BACKENDS, load_embedding_backend
+from utils.embedding_batching import encode_in_batches
+from utils.embedding_executor import EmbeddingExecutor
+from utils.embedding_scheduler import MicroBatcher
+from utils.embedding_cache import EmbeddingCache
+from utils.search_cache import SearchResultCache, mark_degraded
+from utils.reranker import Reranker
+from utils.text_chunker import approximate_token_offsets, chunk_by_tokens
+from utils.chunk_diff import ChunkRecord, chunk_records, diff_chunks
+from utils.qdrant_ops import (
+    BatchedUpserter, timed, quantization_config, quantization_search_params, quantization_mode_of
+)
 
 logger = logging.getLogger(__name__)
 
+ExtractSource = Union[bytes, str, os.PathLike, BinaryIO]
+
 class RAGService:
     def __init__(self, qdrant_host: str = "qdrant", qdrant_port: int = 6333):
         """Initialize RAG service with embedding model and vector DB"""
@@ -23,57 +43,224 @@ class RAGService:
         self.qdrant_client = None
         self.qdrant_host = qdrant_host
         self.qdrant_port = qdrant_port
+        self.qdrant_grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+        self.qdrant_prefer_grpc = os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true"
+        self.qdrant_upsert_batch_size = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+        # Quantized vectors stay in RAM for search; originals can live on disk for rescoring
+        self.quantization = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+        quantization_config(self.quantization)  # validate early
+        self.vectors_on_disk = os.getenv(
+            "QDRANT_VECTORS_ON_DISK", "false" if self.quantization == "none" else "true"
+        ).lower() == "true"
+        self.search_oversampling = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+        self.search_rescore = os.getenv("QDRANT_RESCORE", "true").lower() == "true"
+        self.migrate_on_startup = os.getenv("QDRANT_MIGRATE_ON_STARTUP", "false").lower() == "true"
+        self.upserter = None
+        self._init_lock = asyncio.Lock()
+        self.embedding_model_name = "all-MiniLM-L6-v2"
         self.vector_size = 384  # all-MiniLM-L6-v2 dimension
+        # torch (SentenceTransformer), onnx or onnx-int8 (ONNX Runtime); same model, same dimension
+        self.embedding_backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+        if self.embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {self.embedding_backend} (expected one of {EMBEDDING_BACKENDS})")
         self.collection_name = "documents"
+        # Chunk sizes are in model tokens; CHUNK_MAX_TOKENS can only lower the model's limit
+        chunk_max_tokens = os.getenv("CHUNK_MAX_TOKENS")
+        self.chunk_max_tokens = int(chunk_max_tokens) if chunk_max_tokens else None
+        self.chunk_overlap_tokens = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+        # Each hybrid leg fetches limit * multiplier candidates before fusion
+        self.hybrid_candidate_multiplier = int(os.getenv("HYBRID_CANDIDATE_MULTIPLIER", "4"))
+        self.embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+        # Chunks embedded and upserted per step when indexing a document
+        self.index_window = int(os.getenv("INDEX_WINDOW_CHUNKS", "256"))
+        self.embedding_executor = EmbeddingExecutor.from_env()
+        # Redis tier is attached at startup (binary client) by main.py
+        # int8 vectors differ slightly from float ones, so each backend gets its own cache keys
+        self.embedding_cache = EmbeddingCache(
+            f"{self.embedding_model_name}:{self.embedding_backend}",
+            max_items=int(os.getenv("EMBEDDING_CACHE_MAX_ITEMS", "10000")),
+            ttl_seconds=int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        )
+        # Search results tagged with a corpus version; the indexing methods below bump it
+        self.search_cache = SearchResultCache(
+            f"{self.embedding_model_name}:{self.embedding_backend}",
+            ttl_seconds=int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 3600))),
+            l1_max_items=int(os.getenv("SEARCH_CACHE_MAX_ITEMS", "1000")),
+            l1_max_bytes=int(os.getenv("SEARCH_CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024))),
+            l1_ttl_seconds=float(os.getenv("CACHE_L1_TTL_SECONDS", "60"))
+        )
+        # Optional cross-encoder pass over over-fetched candidates, on the same workers
+        self.reranker = Reranker.from_env(self.embedding_executor)
+        # Concurrent callers (searches, web_search snippets, ingest) share forward passes
+        self.embedding_scheduler = MicroBatcher(
+            self._encode_on_executor,
+            max_batch_size=self.embedding_batch_size,
+            max_wait_ms=float(os.getenv("EMBEDDING_MAX_WAIT_MS", "3"))
+        )
 
     async def initialize(self):
         """Lazy initialization of models"""
+        if self.embedding_model is not None and self.qdrant_client is not None:
+            return
+
+        async with self._init_lock:
+            await self._initialize()
+
+    async def _initialize(self):
         if self.embedding_model is None:
-            logger.info("Loading embedding model: all-MiniLM-L6-v2")
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            logger.info(f"Loading embedding model: {self.embedding_model_name} ({self.embedding_backend})")
+            model = await self.embedding_executor.run(
+                load_embedding_backend,
+                self.embedding_backend,
+                self.embedding_model_name,
+                self.embedding_executor.torch_threads,
+                size=0
+            )
+            if model.dimension != self.vector_size:
+                raise ValueError(
+                    f"Embedding backend '{self.embedding_backend}' produces {model.dimension}-dim vectors, "
+                    f"collection expects {self.vector_size}"
+                )
+            self.embedding_model = model
             logger.info("Embedding model loaded successfully")
 
         if self.qdrant_client is None:
             logger.info(f"Connecting to Qdrant at {self.qdrant_host}:{self.qdrant_port}")
-            self.qdrant_client = QdrantClient(host=self.qdrant_host, port=self.qdrant_port)
+            client = AsyncQdrantClient(
+                host=self.qdrant_host,
+                port=self.qdrant_port,
+                grpc_port=self.qdrant_grpc_port,
+                prefer_grpc=self.qdrant_prefer_grpc
+            )
 
             # Create collection if it doesn't exist
             try:
-                self.qdrant_client.get_collection(self.collection_name)
+                info = await timed("get_collection", client.get_collection(self.collection_name))
                 logger.info(f"Collection '{self.collection_name}' already exists")
+                current = quantization_mode_of(info.config.quantization_config)
             except:
-                logger.info(f"Creating collection '{self.collection_name}'")
-                self.qdrant_client.create_collection(
+                logger.info(f"Creating collection '{self.collection_name}' (quantization: {self.quantization})")
+                await timed("create_collection", client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(size=self.vector_size, distance=Distance.COSINE)
-                )
+                    vectors_config=VectorParams(
+                        size=self.vector_size,
+                        distance=Distance.COSINE,
+                        on_disk=self.vectors_on_disk
+                    ),
+                    quantization_config=quantization_config(self.quantization)
+                ))
                 logger.info(f"Collection '{self.collection_name}' created successfully")
+                current = self.quantization
+
+            self.upserter = BatchedUpserter(client, self.collection_name, self.qdrant_upsert_batch_size)
+            self.qdrant_client = client
+
+            if current != self.quantization:
+                if self.migrate_on_startup:
+                    await self.migrate_collection()
+                else:
+                    logger.warning(
+                        f"Collection '{self.collection_name}' uses quantization '{current}' but "
+                        f"QDRANT_QUANTIZATION is '{self.quantization}'; call migrate_collection() "
+                        f"or set QDRANT_MIGRATE_ON_STARTUP=true"
+                    )
+
+    async def migrate_collection(self, quantization: Optional[str] = None, vectors_on_disk: Optional[bool] = None) -> str:
+        """
+        Switch the existing collection's quantization and vector storage in place
+
+        Qdrant rebuilds the quantized data and moves vectors in the
+        background; search keeps working (unquantized) while it does.
+        """
+        quantization = quantization or self.quantization
+        on_disk = self.vectors_on_disk if vectors_on_disk is None else vectors_on_disk
+        config = quantization_config(quantization)
 
-    def extract_text_from_pdf(self, file_content: bytes) -> str:
+        await timed("update_collection", self.qdrant_client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config={"": VectorParamsDiff(on_disk=on_disk)},
+            quantization_config=config if config is not None else Disabled.DISABLED
+        ))
+        self.quantization = quantization
+        self.vectors_on_disk = on_disk
+        logger.info(f"Collection '{self.collection_name}' migrated to quantization '{quantization}' (vectors on disk: {on_disk})")
+        return quantization
+
+    async def close(self):
+        """Close the shared Qdrant client"""
+        if self.qdrant_client is not None:
+            await self.qdrant_client.close()
+            self.qdrant_client = None
+            self.upserter = None
+
+    async def flush(self):
+        """Wait until all wait=False upserts (bulk ingest) are applied and searchable"""
+        if self.upserter is not None:
+            await self.upserter.flush()
+        # Searches run before the flush may have cached results without the new points
+        await self.search_cache.bump()
+
+    # Extraction sources: bytes, a path, or a binary file object such as the
+    # spooled temp file behind an UploadFile. Files are read page by page and
+    # never copied into memory as a whole.
+
+    def iter_text_from_pdf(self, source: ExtractSource) -> Iterator[str]:
+        """Yield the text of each PDF page; PdfReader reads pages lazily from the file"""
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+
+    def iter_text_from_docx(self, source: ExtractSource) -> Iterator[str]:
+        """Yield DOCX paragraphs"""
+        doc = docx.Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+        for paragraph in doc.paragraphs:
+            yield paragraph.text
+
+    def iter_text_from_txt(self, source: ExtractSource, block_size: int = 1 << 20) -> Iterator[str]:
+        """Yield UTF-8 text in blocks (multi-byte characters split across blocks are kept whole)"""
+        if isinstance(source, bytes):
+            yield source.decode("utf-8")
+            return
+        stream = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            while block := stream.read(block_size):
+                yield decoder.decode(block)
+            yield decoder.decode(b"", final=True)
+        finally:
+            if stream is not source:
+                stream.close()
+
+    def iter_text_from_file(self, source: ExtractSource, filename: str) -> Iterator[str]:
+        """Text segments (pages, paragraphs or blocks) based on file type"""
+        filename_lower = filename.lower()
+
+        if filename_lower.endswith('.pdf'):
+            return self.iter_text_from_pdf(source)
+        elif filename_lower.endswith('.docx'):
+            return self.iter_text_from_docx(source)
+        elif filename_lower.endswith('.txt'):
+            return self.iter_text_from_txt(source)
+        else:
+            raise ValueError(f"Unsupported file type: {filename}")
+
+    def extract_text_from_pdf(self, file_content: ExtractSource) -> str:
         """Extract text from PDF file"""
         try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            return "\n".join(self.iter_text_from_pdf(file_content)).strip()
         except Exception as e:
             logger.error(f"PDF extraction error: {e}")
             raise
 
-    def extract_text_from_docx(self, file_content: bytes) -> str:
+    def extract_text_from_docx(self, file_content: ExtractSource) -> str:
         """Extract text from DOCX file"""
         try:
-            doc_file = io.BytesIO(file_content)
-            doc = docx.Document(doc_file)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text.strip()
+            return "\n".join(self.iter_text_from_docx(file_content)).strip()
         except Exception as e:
             logger.error(f"DOCX extraction error: {e}")
             raise
 
-    def extract_text_from_file(self, file_content: bytes, filename: str) -> str:
+    def extract_text_from_file(self, file_content: ExtractSource, filename: str) -> str:
         """Extract text based on file type"""
         filename_lower = filename.lower()
 
@@ -81,28 +268,71 @@ class RAGService:
             return self.extract_text_from_pdf(file_content)
         elif filename_lower.endswith('.docx'):
             return self.extract_text_from_docx(file_content)
-        elif filename_lower.endswith('.txt'):
-            return file_content.decode('utf-8')
         else:
-            raise ValueError(f"Unsupported file type: {filename}")
+            return "".join(self.iter_text_from_file(file_content, filename))
+
+    def chunk_text(self, text: str, max_tokens: Optional[int] = None, overlap: Optional[int] = None) -> List[str]:
+        """
+        Split text into overlapping chunks that fit the embedding model
+
+        Sizes are counted with the model's tokenizer once it is loaded and
+        capped at its max sequence length minus [CLS]/[SEP], so nothing is
+        truncated at encode time. Cuts follow paragraph and sentence ends,
+        including Chinese 。！？.
+        """
+        if self.embedding_model is not None:
+            token_offsets = self.embedding_model.token_offsets
+            model_limit = self.embedding_model.max_seq_length - 2
+        else:
+            token_offsets = approximate_token_offsets
+            model_limit = DEFAULT_MAX_SEQ_LENGTH - 2
+
+        limit = min(max_tokens or self.chunk_max_tokens or model_limit, model_limit)
+        return chunk_by_tokens(
+            text,
+            token_offsets,
+            max_tokens=limit,
+            overlap_tokens=self.chunk_overlap_tokens if overlap is None else overlap
+        )
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Encode one batch in a single forward pass"""
+        return self.embedding_model.encode(texts).tolist()
+
+    async def _encode_on_executor(self, texts: List[str]) -> List[List[float]]:
+        """Encode one micro-batch on the dedicated embedding workers"""
+        return await self.embedding_executor.run(
+            encode_in_batches,
+            texts,
+            self._encode_batch,
+            self.embedding_batch_size,
+            size=len(texts)
+        )
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embedding vectors for many texts
 
-    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
-        """Split text into overlapping chunks"""
-        words = text.split()
-        chunks = []
+        Cached vectors are returned without touching the model; the rest are
+        deduplicated and encoded through the shared micro-batcher.
+        """
+        if not texts:
+            return []
 
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk:
-                chunks.append(chunk)
+        embeddings = await self.embedding_cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, embeddings) if vector is None))
+        if missing:
+            await self.initialize()
+            computed = dict(zip(missing, await self.embedding_scheduler.submit(missing)))
+            await self.embedding_cache.set_many(missing, [computed[text] for text in missing])
+            embeddings = [vector if vector is not None else computed[text] for text, vector in zip(texts, embeddings)]
 
-        return chunks
+        return embeddings
 
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding vector for text"""
-        await self.initialize()
-        embedding = self.embedding_model.encode(text)
-        return embedding.tolist()
+        embeddings = await self.generate_embeddings([text])
+        return embeddings[0]
 
     async def process_document(
         self,
@@ -110,57 +340,178 @@ class RAGService:
         title: str,
         content: str,
         metadata: Dict[str, Any] = None,
-        chunk_size: int = 500
+        chunk_size: Optional[int] = None,
+        wait: bool = True
     ) -> int:
-        """Process and store document with embeddings"""
+        """
+        Process and store document with embeddings
+
+        Bulk ingest can pass wait=False to skip waiting for Qdrant to index
+        each batch, then call flush() once at the end.
+        """
         await self.initialize()
 
         # Chunk the document
-        chunks = self.chunk_text(content, chunk_size=chunk_size)
+        chunks = self.chunk_text(content, max_tokens=chunk_size)
         logger.info(f"Document {doc_id} split into {len(chunks)} chunks")
 
-        # Generate embeddings for each chunk
-        points = []
-        for idx, chunk in enumerate(chunks):
-            embedding = await self.generate_embedding(chunk)
+        # Embed and store window by window; point ids come from chunk content hashes
+        await self._index_records(doc_id, title, chunk_records(doc_id, chunks), metadata, wait=wait)
+        await self.search_cache.bump()
 
-            point_id = f"{doc_id}_{idx}"
-            # Use hash to create a consistent numeric ID
-            numeric_id = int(hashlib.md5(point_id.encode()).hexdigest()[:8], 16)
+        logger.info(f"Stored {len(chunks)} vectors for document {doc_id}")
+        return len(chunks)
 
-            point = PointStruct(
-                id=numeric_id,
+    async def _index_records(
+        self,
+        doc_id: int,
+        title: str,
+        records: List[ChunkRecord],
+        metadata: Optional[Dict[str, Any]],
+        wait: bool = True,
+        guard: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> None:
+        """
+        Embed and upsert records index_window at a time
+
+        Only one window of vectors and points is held at once, however long
+        the document. Upserts are applied in order, so waiting on the last
+        window covers the earlier ones. guard() is awaited before each
+        upsert and raises to abort.
+        """
+        for start in range(0, len(records), self.index_window):
+            window = records[start:start + self.index_window]
+            last = start + self.index_window >= len(records)
+            points = await self._build_points(doc_id, title, window, metadata)
+            if guard is not None:
+                await guard()
+            await self.upserter.upsert(points, wait=wait and last)
+
+    async def _build_points(
+        self,
+        doc_id: int,
+        title: str,
+        records: List[ChunkRecord],
+        metadata: Optional[Dict[str, Any]]
+    ) -> List[PointStruct]:
+        """Embed chunk records (batched) and wrap them as Qdrant points"""
+        embeddings = await self.generate_embeddings([record.content for record in records])
+
+        return [
+            PointStruct(
+                id=record.point_id,
                 vector=embedding,
                 payload={
                     "doc_id": doc_id,
-                    "chunk_id": idx,
+                    "chunk_id": record.chunk_id,
+                    "chunk_hash": record.chunk_hash,
                     "title": title,
-                    "content": chunk,
+                    "content": record.content,
                     "metadata": metadata or {},
                     "created_at": datetime.now().isoformat()
                 }
             )
-            points.append(point)
+            for record, embedding in zip(records, embeddings)
+        ]
+
+    async def _stored_chunks(self, doc_id: int) -> Dict[str, Dict[str, Any]]:
+        """Point id -> payload (without content or vectors) for a document's chunks"""
+        stored = {}
+        offset = None
+        while True:
+            records, offset = await timed("scroll", self.qdrant_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=Filter(must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]),
+                limit=256,
+                offset=offset,
+                with_payload=["chunk_id", "chunk_hash", "title", "metadata"],
+                with_vectors=False
+            ))
+            for record in records:
+                stored[str(record.id)] = record.payload or {}
+            if offset is None:
+                return stored
+
+    async def reindex_document(
+        self,
+        doc_id: int,
+        title: str,
+        content: str,
+        metadata: Dict[str, Any] = None,
+        chunk_size: Optional[int] = None,
+        guard: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Dict[str, int]:
+        """
+        Re-index an edited document, touching only what changed
+
+        Chunks are identified by content hash: new or edited chunks are
+        embedded and upserted, chunks that disappeared are deleted, and kept
+        chunks only get a payload patch if their position, title or metadata
+        changed. guard() is awaited before every Qdrant write and raises to
+        abort, e.g. when the document changed in the meantime.
+        """
+        await self.initialize()
 
-        # Store in Qdrant
-        self.qdrant_client.upsert(
-            collection_name=self.collection_name,
-            points=points
+        records = chunk_records(doc_id, self.chunk_text(content, max_tokens=chunk_size))
+        stored = await self._stored_chunks(doc_id)
+        to_embed, to_delete, to_patch = diff_chunks(
+            records, stored, {"title": title, "metadata": metadata or {}}
         )
 
-        logger.info(f"Stored {len(points)} vectors for document {doc_id}")
-        return len(chunks)
+        if to_embed:
+            await self._index_records(doc_id, title, to_embed, metadata, guard=guard)
+
+        if to_delete:
+            if guard is not None:
+                await guard()
+            await timed("delete", self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=to_delete)
+            ))
+
+        if to_patch:
+            if guard is not None:
+                await guard()
+            await timed("set_payload", self.qdrant_client.batch_update_points(
+                collection_name=self.collection_name,
+                update_operations=[
+                    SetPayloadOperation(set_payload=SetPayload(payload=patch, points=[point_id]))
+                    for point_id, patch in to_patch
+                ]
+            ))
+
+        if to_embed or to_delete or to_patch:
+            await self.search_cache.bump()
+
+        stats = {
+            "chunks": len(records),
+            "embedded": len(to_embed),
+            "deleted": len(to_delete),
+            "payload_updated": len(to_patch),
+            "unchanged": len(records) - len(to_embed) - len(to_patch)
+        }
+        logger.info(f"Re-indexed document {doc_id}: {stats}")
+        return stats
 
     async def semantic_search(
         self,
         query: str,
         limit: int = 5,
         score_threshold: float = 0.5,
-        filter_metadata: Optional[Dict] = None
+        filter_metadata: Optional[Dict] = None,
+        rerank: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
-        """Perform semantic search using embeddings"""
+        """
+        Perform semantic search using embeddings
+
+        With rerank (default RERANK_ENABLED), max(limit, RERANK_CANDIDATES)
+        hits are fetched and the cross-encoder picks the top limit.
+        """
         await self.initialize()
 
+        rerank = self.reranker.enabled if rerank is None else rerank
+        fetch = max(limit, self.reranker.candidates) if rerank else limit
+
         # Generate query embedding
         query_embedding = await self.generate_embedding(query)
 
@@ -179,12 +530,13 @@ class RAGService:
                 search_filter = Filter(must=conditions)
 
         # Search in Qdrant
-        search_results = self.qdrant_client.search(
+        search_results = await timed("search", self.qdrant_client.search(
             collection_name=self.collection_name,
             query_vector=query_embedding,
-            limit=limit * 2,  # Get more results to filter by score
-            query_filter=search_filter
-        )
+            limit=fetch * 2,  # Get more results to filter by score
+            query_filter=search_filter,
+            search_params=quantization_search_params(self.quantization, self.search_oversampling, self.search_rescore)
+        ))
 
         # Filter by score and format results
         results = []
@@ -210,23 +562,105 @@ class RAGService:
                 "chunk_id": hit.payload.get("chunk_id")
             })
 
-            if len(results) >= limit:
+            if len(results) >= fetch:
                 break
 
+        if rerank:
+            results = await self.reranker.rerank(query, results, limit)
+
         logger.info(f"Semantic search for '{query}' returned {len(results)} results")
         return results
 
+    async def keyword_search(
+        self,
+        db_pool,
+        query: str,
+        limit: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> List[Dict[str, Any]]:
+        """Ranked Postgres full-text search, shaped like semantic_search results"""
+        async with db_pool.acquire() as conn:
+            rows = await search_documents(conn, query, limit, filter_metadata)
+
+        return [
+            {
+                "doc_id": row["id"],
+                "title": row["title"],
+                "content": row["snippet"],
+                "score": row["score"],
+                "metadata": row["metadata"],
+                "chunk_id": None
+            }
+            for row in rows
+        ]
+
+    async def hybrid_search(
+        self,
+        db_pool,
+        query: str,
+        limit: int = 5,
+        score_threshold: float = 0.5,
+        filter_metadata: Optional[Dict] = None,
+        keyword_weight: Optional[float] = None,
+        fusion: str = "rrf",
+        rrf_k: Optional[int] = None,
+        rerank: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Keyword + vector search fused into one top-k
+
+        Both legs run concurrently, so latency is bounded by the slower one.
+        keyword_weight (0-1) sets the keyword share; the vector leg gets the
+        rest. When omitted it is picked from the query (identifiers and
+        quoted phrases favour keyword matches). If one leg fails the other
+        leg's results are still returned. With rerank the fused candidates
+        are rescored by the cross-encoder.
+        """
+        if keyword_weight is None:
+            keyword_weight = suggest_keyword_weight(query)
+        weights = {"vector": 1.0 - keyword_weight, "keyword": keyword_weight}
+        rerank = self.reranker.enabled if rerank is None else rerank
+        fused_limit = max(limit, self.reranker.candidates) if rerank else limit
+        candidates = fused_limit * self.hybrid_candidate_multiplier
+
+        vector_results, keyword_results = await asyncio.gather(
+            self.semantic_search(query, candidates, score_threshold, filter_metadata, rerank=False),
+            self.keyword_search(db_pool, query, candidates, filter_metadata),
+            return_exceptions=True
+        )
+
+        if isinstance(vector_results, Exception) and isinstance(keyword_results, Exception):
+            raise vector_results
+        for leg, result in (("vector", vector_results), ("keyword", keyword_results)):
+            if isinstance(result, Exception):
+                logger.warning(f"Hybrid search {leg} leg failed, using the other leg only: {result}")
+                mark_degraded(f"hybrid {leg} leg failed")
+        ranked_lists = {
+            "vector": [] if isinstance(vector_results, Exception) else vector_results,
+            "keyword": [] if isinstance(keyword_results, Exception) else keyword_results
+        }
+
+        results = fuse(ranked_lists, weights, fused_limit, method=fusion, rrf_k=rrf_k)
+        if rerank:
+            results = await self.reranker.rerank(query, results, limit)
+        logger.info(
+            f"Hybrid search for '{query}' fused {len(ranked_lists['vector'])} vector + "
+            f"{len(ranked_lists['keyword'])} keyword hits into {len(results)} results"
+        )
+        return results
+
     async def delete_document_vectors(self, doc_id: int):
         """Delete all vectors associated with a document"""
         await self.initialize()
 
         # Delete by filter
-        self.qdrant_client.delete(
+        await timed("delete", self.qdrant_client.delete(
             collection_name=self.collection_name,
             points_selector=Filter(
                 must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]
             )
-        )
+        ))
+        await self.search_cache.bump()
 
         logger.info(f"Deleted vectors for document {doc_id}")
 
@@ -234,7 +668,7 @@ class RAGService:
         """Get statistics about the vector collection"""
         await self.initialize()
 
-        collection_info = self.qdrant_client.get_collection(self.collection_name)
+        collection_info = await timed("get_collection", self.qdrant_client.get_collection(self.collection_name))
 
         return {
             "collection_name": self.collection_name,
@@ -242,8 +676,18 @@ class RAGService:
             "points_count": collection_info.points_count,
             "status": collection_info.status,
             "vector_size": self.vector_size,
-            "distance": "cosine"
+            "embedding_backend": self.embedding_backend,
+            "distance": "cosine",
+            "quantization": quantization_mode_of(collection_info.config.quantization_config),
+            "vectors_on_disk": collection_info.config.params.vectors.on_disk,
+            "embedding_cache": self.embedding_cache.stats(),
+            "search_cache": self.search_cache.stats()
         }
 
 # Global instance
 rag_service = RAGService()
+
+
+def extract_text_from_file(file_content: ExtractSource, filename: str) -> str:
+    """Module-level extraction entry point, picklable for process pools (pass a path, not bytes)"""
+    return rag_service.extract_text_from_file(file_content, filename)
@@ -33,6 +33,13 @@ CREATE TABLE documents (
     version INTEGER DEFAULT 1,
     is_published BOOLEAN DEFAULT false,
     view_count INTEGER DEFAULT 0,
+    -- Background indexing: queued / embedding / indexed / failed
+    index_status VARCHAR(20) DEFAULT 'indexed',
+    index_job_id UUID,
+    index_attempts INTEGER DEFAULT 0,
+    index_error TEXT,
+    index_chunks INTEGER,
+    indexed_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -67,12 +74,20 @@ CREATE TABLE audit_logs (
 );
 
 -- Create indexes for better query performance
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 CREATE INDEX idx_documents_title ON documents USING gin(to_tsvector('english', title));
 CREATE INDEX idx_documents_content ON documents USING gin(to_tsvector('english', content));
+-- Trigram indexes for CJK keyword search (english stemming doesn't tokenize Chinese)
+CREATE INDEX idx_documents_title_trgm ON documents USING gin(title gin_trgm_ops);
+CREATE INDEX idx_documents_content_trgm ON documents USING gin(content gin_trgm_ops);
 CREATE INDEX idx_documents_category ON documents(category);
 CREATE INDEX idx_documents_author ON documents(author_id);
 CREATE INDEX idx_documents_created ON documents(created_at DESC);
+-- Keyset pagination for GET /rag/documents
+CREATE INDEX idx_documents_listing_key ON documents((COALESCE(created_at, to_timestamp(0))) DESC, id DESC);
+CREATE INDEX idx_documents_category_listing_key ON documents(category, (COALESCE(created_at, to_timestamp(0))) DESC, id DESC);
 CREATE INDEX idx_documents_metadata ON documents USING gin(metadata);
+CREATE INDEX idx_documents_index_status ON documents(index_status) WHERE index_status IN ('queued', 'embedding');
 
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_username ON users(username);
@@ -1,24 +1,171 @@
 """
 Enhanced Web Search Service with Multi-Provider Support
 Integrates with RAG for vectorized search results
+
+Google, Tavily and SerpAPI are called over their REST APIs on one pooled
+httpx.AsyncClient; DuckDuckGo has no API, so the synchronous
+duckduckgo_search client runs on a small dedicated thread pool. Providers
+therefore run concurrently without blocking the event loop, each bounded
+by its own timeout, and a multi-provider search takes as long as the
+slowest provider.
+
+In race mode a search returns as soon as enough unique results have
+arrived, or a soft deadline passes with some results in hand, and cancels
+the providers still running. Rolling per-provider latency and success
+stats order the providers (fast and reliable first) and skip ones that
+keep failing, probing them again after a cooldown.
 """
 
 import logging
 import os
-from typing import List, Dict, Optional, Any
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import asyncio
 
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+
 logger = logging.getLogger(__name__)
 
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+SERPAPI_SEARCH_URL = "https://serpapi.com/search.json"
+
+# Per-provider override: WEB_SEARCH_TIMEOUT_<PROVIDER>, e.g. WEB_SEARCH_TIMEOUT_TAVILY=15
+WEB_SEARCH_TIMEOUT = float(os.getenv("WEB_SEARCH_TIMEOUT_SECONDS", "8"))
+WEB_SEARCH_RACE = os.getenv("WEB_SEARCH_RACE", "false").lower() == "true"
+WEB_SEARCH_SOFT_DEADLINE = float(os.getenv("WEB_SEARCH_SOFT_DEADLINE_SECONDS", "2"))
+WEB_SEARCH_ADAPTIVE = os.getenv("WEB_SEARCH_ADAPTIVE", "true").lower() == "true"
+WEB_SEARCH_STATS_WINDOW = int(os.getenv("WEB_SEARCH_STATS_WINDOW", "100"))
+WEB_SEARCH_MIN_SAMPLES = int(os.getenv("WEB_SEARCH_MIN_SAMPLES", "5"))
+WEB_SEARCH_SKIP_SUCCESS_BELOW = float(os.getenv("WEB_SEARCH_SKIP_SUCCESS_BELOW", "0.2"))
+WEB_SEARCH_SKIP_COOLDOWN = float(os.getenv("WEB_SEARCH_SKIP_COOLDOWN_SECONDS", "60"))
+
+PROVIDER_CALLS = Counter(
+    "mcp_web_search_provider_calls_total", "Web search provider calls by outcome",
+    ["provider", "result"]  # ok, error, timeout, cancelled (lost a race), skipped (unhealthy)
+)
+PROVIDER_DURATION = Histogram(
+    "mcp_web_search_provider_duration_seconds", "Web search provider latency (completed calls)",
+    ["provider"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 16)
+)
+PROVIDER_LATENCY = Gauge(
+    "mcp_web_search_provider_latency_seconds", "Rolling web search provider latency quantiles",
+    ["provider", "quantile"]
+)
+PROVIDER_SUCCESS_RATIO = Gauge(
+    "mcp_web_search_provider_success_ratio", "Rolling web search provider success ratio",
+    ["provider"]
+)
+
+
+class ProviderStats:
+    """
+    Latency and success of a provider's last `window` calls
+
+    A call cancelled because it lost a race is a sample with ok=None: its
+    elapsed time is a lower bound on the latency, and it counts neither as a
+    success nor a failure. Without it a provider that always loses would
+    never warm up and would stay first in the order.
+    """
+
+    def __init__(self, provider: str, window: int = WEB_SEARCH_STATS_WINDOW):
+        self.provider = provider
+        self.samples: "deque[Tuple[float, Optional[bool]]]" = deque(maxlen=window)
+        self.last_attempt = 0.0
+
+    def record(self, latency: float, ok: Optional[bool]) -> None:
+        self.samples.append((latency, ok))
+        self.last_attempt = time.monotonic()
+        PROVIDER_LATENCY.labels(self.provider, "0.5").set(self.percentile(0.5))
+        PROVIDER_LATENCY.labels(self.provider, "0.95").set(self.percentile(0.95))
+        PROVIDER_SUCCESS_RATIO.labels(self.provider).set(self.success_rate)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        latencies = sorted(latency for latency, _ in self.samples)
+        return latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+
+    @property
+    def success_rate(self) -> float:
+        outcomes = [ok for _, ok in self.samples if ok is not None]
+        if not outcomes:
+            return 1.0
+        return sum(outcomes) / len(outcomes)
+
+    @property
+    def warmed_up(self) -> bool:
+        return len(self.samples) >= WEB_SEARCH_MIN_SAMPLES
+
+    def score(self) -> float:
+        """Expected cost of a useful answer: p50 latency inflated by the failure rate (lower is better)"""
+        if not self.warmed_up:
+            return 0.0  # not enough data: query it so it gets some
+        return self.percentile(0.5) / max(self.success_rate, 0.05)
+
+    def unhealthy(self) -> bool:
+        """Failing too often to be worth querying, until the cooldown since its last attempt has passed"""
+        return (
+            self.warmed_up
+            and self.success_rate < WEB_SEARCH_SKIP_SUCCESS_BELOW
+            and time.monotonic() - self.last_attempt < WEB_SEARCH_SKIP_COOLDOWN
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self.samples),
+            "p50_seconds": round(self.percentile(0.5), 3),
+            "p95_seconds": round(self.percentile(0.95), 3),
+            "success_rate": round(self.success_rate, 3)
+        }
+
 
 class SearchService:
     """Unified search service supporting multiple search providers"""
 
     def __init__(self):
         self.providers = []
+        self.provider_methods = {
+            "duckduckgo": self.search_duckduckgo,
+            "google": self.search_google,
+            "tavily": self.search_tavily,
+            "serpapi": self.search_serpapi
+        }
+        self.timeouts = {
+            provider: float(os.getenv(f"WEB_SEARCH_TIMEOUT_{provider.upper()}", str(WEB_SEARCH_TIMEOUT)))
+            for provider in self.provider_methods
+        }
+        self.stats = {provider: ProviderStats(provider) for provider in self.provider_methods}
+        self._client: Optional[httpx.AsyncClient] = None
+        # Bounded: a provider that hangs past its timeout can't pile up threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("WEB_SEARCH_THREADS", "4")),
+            thread_name_prefix="web-search"
+        )
         self._initialize_providers()
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client (connection pool reused across searches)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(max(self.timeouts.values())),
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+        return self._client
+
+    async def close(self):
+        """Close the HTTP client and the DuckDuckGo thread pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     def _initialize_providers(self):
         """Initialize available search providers based on configuration"""
         # Always add DuckDuckGo (free, no API key needed)
@@ -43,165 +190,247 @@ class SearchService:
         if not self.providers:
             logger.warning("⚠ No search providers configured, using fallback mode")
 
-    async def search_duckduckgo(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
-        """Search using DuckDuckGo (free, no API key)"""
-        try:
-            from duckduckgo_search import DDGS
-
-            results = []
-            with DDGS() as ddgs:
-                search_results = list(ddgs.text(query, max_results=max_results))
+    def _duckduckgo_sync(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        from duckduckgo_search import DDGS
 
-                for idx, result in enumerate(search_results):
-                    results.append({
-                        "title": result.get("title", ""),
-                        "url": result.get("href", ""),
-                        "snippet": result.get("body", ""),
-                        "source": "DuckDuckGo",
-                        "rank": idx + 1
-                    })
+        with DDGS(timeout=self.timeouts["duckduckgo"]) as ddgs:
+            return list(ddgs.text(query, max_results=max_results))
 
-            logger.info(f"DuckDuckGo search returned {len(results)} results for: {query}")
-            return results
+    async def search_duckduckgo(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """Search using DuckDuckGo (free, no API key); the client is synchronous, so it runs on the thread pool"""
+        loop = asyncio.get_running_loop()
+        search_results = await loop.run_in_executor(self._executor, self._duckduckgo_sync, query, max_results)
+
+        results = []
+        for idx, result in enumerate(search_results):
+            results.append({
+                "title": result.get("title", ""),
+                "url": result.get("href", ""),
+                "snippet": result.get("body", ""),
+                "source": "DuckDuckGo",
+                "rank": idx + 1
+            })
 
-        except Exception as e:
-            logger.error(f"DuckDuckGo search error: {e}")
-            return []
+        logger.info(f"DuckDuckGo search returned {len(results)} results for: {query}")
+        return results
 
     async def search_google(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
-        """Search using Google Custom Search API"""
-        try:
-            from googleapiclient.discovery import build
-
-            api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
-            search_engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
-
-            if not api_key or not search_engine_id:
-                logger.warning("Google Search API credentials not configured")
-                return []
-
-            service = build("customsearch", "v1", developerKey=api_key)
+        """Search using Google Custom Search JSON API"""
+        api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
+        search_engine_id = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
 
-            # Google Custom Search API returns max 10 results per request
-            result = service.cse().list(
-                q=query,
-                cx=search_engine_id,
-                num=min(max_results, 10)
-            ).execute()
-
-            results = []
-            for idx, item in enumerate(result.get("items", [])):
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": "Google",
-                    "rank": idx + 1
-                })
+        if not api_key or not search_engine_id:
+            logger.warning("Google Search API credentials not configured")
+            return []
 
-            logger.info(f"Google search returned {len(results)} results for: {query}")
-            return results
+        # Google Custom Search API returns max 10 results per request
+        response = await self.client.get(
+            GOOGLE_SEARCH_URL,
+            params={"key": api_key, "cx": search_engine_id, "q": query, "num": min(max_results, 10)},
+            timeout=self.timeouts["google"]
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        results = []
+        for idx, item in enumerate(result.get("items", [])):
+            results.append({
+                "title": item.get("title", ""),
+                "url": item.get("link", ""),
+                "snippet": item.get("snippet", ""),
+                "source": "Google",
+                "rank": idx + 1
+            })
 
-        except Exception as e:
-            logger.error(f"Google search error: {e}")
-            return []
+        logger.info(f"Google search returned {len(results)} results for: {query}")
+        return results
 
     async def search_tavily(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """Search using Tavily API (optimized for AI/LLM applications)"""
-        try:
-            from tavily import TavilyClient
-
-            api_key = os.getenv("TAVILY_API_KEY")
-            if not api_key:
-                logger.warning("Tavily API key not configured")
-                return []
-
-            client = TavilyClient(api_key=api_key)
-
-            # Tavily search with optimized parameters for AI
-            response = client.search(
-                query=query,
-                max_results=max_results,
-                search_depth="advanced",  # More thorough search
-                include_answer=True,  # Include AI-generated answer
-                include_raw_content=False  # Don't need full HTML
-            )
+        api_key = os.getenv("TAVILY_API_KEY")
+        if not api_key:
+            logger.warning("Tavily API key not configured")
+            return []
 
-            results = []
-
-            # Add Tavily's AI-generated answer as first result if available
-            if response.get("answer"):
-                results.append({
-                    "title": f"AI Summary: {query}",
-                    "url": "",
-                    "snippet": response["answer"],
-                    "source": "Tavily AI",
-                    "rank": 0,
-                    "is_ai_summary": True
-                })
-
-            # Add search results
-            for idx, item in enumerate(response.get("results", [])):
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("url", ""),
-                    "snippet": item.get("content", ""),
-                    "source": "Tavily",
-                    "rank": idx + 1,
-                    "score": item.get("score", 0.0)
-                })
-
-            logger.info(f"Tavily search returned {len(results)} results for: {query}")
-            return results
+        # Tavily search with optimized parameters for AI
+        http_response = await self.client.post(
+            TAVILY_SEARCH_URL,
+            json={
+                "api_key": api_key,
+                "query": query,
+                "max_results": max_results,
+                "search_depth": "advanced",  # More thorough search
+                "include_answer": True,  # Include AI-generated answer
+                "include_raw_content": False  # Don't need full HTML
+            },
+            timeout=self.timeouts["tavily"]
+        )
+        http_response.raise_for_status()
+        response = http_response.json()
+
+        results = []
+
+        # Add Tavily's AI-generated answer as first result if available
+        if response.get("answer"):
+            results.append({
+                "title": f"AI Summary: {query}",
+                "url": "",
+                "snippet": response["answer"],
+                "source": "Tavily AI",
+                "rank": 0,
+                "is_ai_summary": True
+            })
 
-        except Exception as e:
-            logger.error(f"Tavily search error: {e}")
-            return []
+        # Add search results
+        for idx, item in enumerate(response.get("results", [])):
+            results.append({
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "snippet": item.get("content", ""),
+                "source": "Tavily",
+                "rank": idx + 1,
+                "score": item.get("score", 0.0)
+            })
+
+        logger.info(f"Tavily search returned {len(results)} results for: {query}")
+        return results
 
     async def search_serpapi(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """Search using SerpAPI (Google Search aggregator)"""
-        try:
-            import serpapi
+        api_key = os.getenv("SERPAPI_API_KEY")
+        if not api_key:
+            logger.warning("SerpAPI key not configured")
+            return []
 
-            api_key = os.getenv("SERPAPI_API_KEY")
-            if not api_key:
-                logger.warning("SerpAPI key not configured")
-                return []
+        http_response = await self.client.get(
+            SERPAPI_SEARCH_URL,
+            params={"engine": "google", "q": query, "num": max_results, "api_key": api_key},
+            timeout=self.timeouts["serpapi"]
+        )
+        http_response.raise_for_status()
+        response = http_response.json()
+
+        results = []
+
+        # Extract organic search results
+        organic_results = response.get("organic_results", [])
+        for idx, item in enumerate(organic_results[:max_results]):
+            results.append({
+                "title": item.get("title", ""),
+                "url": item.get("link", ""),
+                "snippet": item.get("snippet", ""),
+                "source": "Google (SerpAPI)",
+                "rank": idx + 1,
+                "position": item.get("position", idx + 1)
+            })
 
-            client = serpapi.Client(api_key=api_key)
+        logger.info(f"SerpAPI search returned {len(results)} results for: {query}")
+        return results
 
-            response = client.search({
-                "engine": "google",
-                "q": query,
-                "num": max_results
-            })
+    async def _run_provider(self, provider: str, query: str, max_results: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """(results, error) for one provider; errors and timeouts yield no results instead of failing the search"""
+        started = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(
+                self.provider_methods[provider](query, max_results),
+                timeout=self.timeouts[provider]
+            )
+            self._record(provider, started, "ok")
+            return results, None
+        except asyncio.TimeoutError:
+            self._record(provider, started, "timeout")
+            logger.warning(f"{provider} search timed out after {self.timeouts[provider]:.1f}s for: {query}")
+            return [], "timeout"
+        except asyncio.CancelledError:
+            # Lost a race: the elapsed time is a lower bound on its latency, not a failure
+            PROVIDER_CALLS.labels(provider, "cancelled").inc()
+            self.stats[provider].record(time.perf_counter() - started, None)
+            raise
+        except Exception as e:
+            self._record(provider, started, "error")
+            logger.error(f"{provider} search error after {time.perf_counter() - started:.2f}s: {e}")
+            return [], str(e) or type(e).__name__
 
-            results = []
+    def _record(self, provider: str, started: float, result: str) -> None:
+        latency = time.perf_counter() - started
+        PROVIDER_CALLS.labels(provider, result).inc()
+        PROVIDER_DURATION.labels(provider).observe(latency)
+        self.stats[provider].record(latency, result == "ok")
 
-            # Extract organic search results
-            organic_results = response.get("organic_results", [])
-            for idx, item in enumerate(organic_results[:max_results]):
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": "Google (SerpAPI)",
-                    "rank": idx + 1,
-                    "position": item.get("position", idx + 1)
-                })
+    def select_providers(self, providers: List[str], allow_skip: bool = True) -> Tuple[List[str], List[str]]:
+        """
+        (providers to query, best first; providers skipped as unhealthy)
 
-            logger.info(f"SerpAPI search returned {len(results)} results for: {query}")
-            return results
+        Providers without enough samples go first so they collect some. At
+        least one provider is always queried.
+        """
+        names = [provider for provider in providers if provider in self.provider_methods]
+        if not WEB_SEARCH_ADAPTIVE:
+            return names, []
+
+        ranked = sorted(names, key=lambda name: self.stats[name].score())
+        if not allow_skip:
+            return ranked, []
+        selected = [name for name in ranked if not self.stats[name].unhealthy()]
+        if not selected and ranked:
+            selected = ranked[:1]
+        skipped = [name for name in ranked if name not in selected]
+        for name in skipped:
+            PROVIDER_CALLS.labels(name, "skipped").inc()
+        return selected, skipped
+
+    async def _race(
+        self,
+        names: List[str],
+        query: str,
+        max_results: int,
+        target: int,
+        soft_deadline: float
+    ) -> Dict[str, Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Results of the providers that finished before the race ended
 
-        except Exception as e:
-            logger.error(f"SerpAPI search error: {e}")
-            return []
+        The race ends once `target` unique URLs have arrived, or once the
+        soft deadline has passed and at least one has; without any results
+        it waits for the providers' own timeouts. Providers still running
+        are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + soft_deadline
+        tasks = {asyncio.create_task(self._run_provider(name, query, max_results)): name for name in names}
+        pending = set(tasks)
+        finished = {}
+        urls = set()
+        try:
+            while pending and len(urls) < target:
+                remaining = deadline - loop.time()
+                if remaining <= 0 and urls:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=remaining if remaining > 0 else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    finished[tasks[task]] = task.result()
+                    urls.update(result["url"] for result in finished[tasks[task]][0] if result.get("url"))
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return finished
+
+    def provider_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Rolling latency and success per provider"""
+        return {provider: stats.snapshot() for provider, stats in self.stats.items()}
 
     async def search(
         self,
         query: str,
         max_results: int = 5,
-        providers: Optional[List[str]] = None
+        providers: Optional[List[str]] = None,
+        race: Optional[bool] = None,
+        min_results: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Perform web search across multiple providers
@@ -209,13 +438,19 @@ class SearchService:
         Args:
             query: Search query
             max_results: Maximum results per provider
-            providers: List of providers to use (default: all available)
+            providers: List of providers to use (default: all healthy available ones)
+            race: Return once min_results unique results arrive or the soft
+                deadline passes, cancelling slower providers (default: WEB_SEARCH_RACE)
+            min_results: Unique results that end a race (default: max_results)
 
         Returns:
             Dict with combined results from all providers
         """
+        explicit = providers is not None
         if providers is None:
             providers = self.providers
+        if race is None:
+            race = WEB_SEARCH_RACE
 
         if not providers:
             logger.warning("No search providers available")
@@ -223,29 +458,36 @@ class SearchService:
                 "query": query,
                 "results": [],
                 "providers_used": [],
+                "providers_skipped": [],
+                "providers_cancelled": [],
+                "provider_errors": {},
                 "total_results": 0
             }
 
-        # Run searches in parallel
-        tasks = []
-        for provider in providers:
-            if provider == "duckduckgo":
-                tasks.append(self.search_duckduckgo(query, max_results))
-            elif provider == "google":
-                tasks.append(self.search_google(query, max_results))
-            elif provider == "tavily":
-                tasks.append(self.search_tavily(query, max_results))
-            elif provider == "serpapi":
-                tasks.append(self.search_serpapi(query, max_results))
-
-        # Wait for all searches to complete
-        all_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Combine results
+        # Providers explicitly asked for are never skipped, only ordered
+        names, skipped = self.select_providers(providers, allow_skip=not explicit)
+
+        if race:
+            finished = await self._race(
+                names, query, max_results,
+                target=min_results or max_results,
+                soft_deadline=WEB_SEARCH_SOFT_DEADLINE
+            )
+        else:
+            # Run searches concurrently; total time is that of the slowest provider (bounded by its timeout)
+            all_results = await asyncio.gather(*(self._run_provider(name, query, max_results) for name in names))
+            finished = dict(zip(names, all_results))
+
+        # Combine results, best-ranked provider first
         combined_results = []
-        for provider_results in all_results:
-            if isinstance(provider_results, list):
-                combined_results.extend(provider_results)
+        provider_errors = {}
+        for name in names:
+            if name not in finished:
+                continue
+            provider_results, error = finished[name]
+            combined_results.extend(provider_results)
+            if error:
+                provider_errors[name] = error
 
         # Sort by rank and remove duplicates by URL
         seen_urls = set()
@@ -260,8 +502,11 @@ class SearchService:
 
         return {
             "query": query,
-            "results": unique_results[:max_results * len(providers)],
-            "providers_used": providers,
+            "results": unique_results[:max_results * max(len(names), 1)],
+            "providers_used": names,
+            "providers_skipped": skipped,
+            "providers_cancelled": [name for name in names if name not in finished],
+            "provider_errors": provider_errors,
             "total_results": len(unique_results),
             "timestamp": datetime.now().isoformat()
         }
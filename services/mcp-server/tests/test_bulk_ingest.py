@@ -0,0 +1,260 @@
+"""
+Test Bulk Ingestion Pipeline
+"""
+
+import asyncio
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.bulk_ingest import BulkIngestPipeline, BulkItem, insert_documents, ndjson_items
+
+
+async def aiter(values):
+    for value in values:
+        yield value
+
+
+def extract(data, filename):
+    if filename.endswith(".bad"):
+        raise ValueError(f"Unsupported file type: {filename}")
+    return data.decode("utf-8")
+
+
+class FakeStore:
+    def __init__(self):
+        self.batches = []
+        self.next_id = 100
+
+    async def __call__(self, batch):
+        self.batches.append(len(batch))
+        ids = list(range(self.next_id, self.next_id + len(batch)))
+        self.next_id += len(batch)
+        return ids
+
+
+class FakeIndex:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.flushed = False
+
+    async def __call__(self, item):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if "fail" in item.content:
+            raise RuntimeError("qdrant down")
+        return len(item.content.split())
+
+    async def flush(self):
+        self.flushed = True
+
+
+class FakeCopyConnection:
+    """Hands out sequence ids and records COPY calls"""
+
+    def __init__(self):
+        self.copies = []
+
+    async def fetch(self, sql, count):
+        return [{"id": 100 + i} for i in range(count)]
+
+    async def copy_records_to_table(self, table, columns, records):
+        self.copies.append((table, columns, records))
+
+
+async def collect(pipeline, items):
+    return [event async for event in pipeline.run(aiter(items))]
+
+
+class TestBulkIngestPipeline:
+    """Test stage wiring, batching, bounded concurrency and per-document status"""
+
+    @pytest.mark.asyncio
+    async def test_every_document_gets_a_status_and_summary(self):
+        store, index = FakeStore(), FakeIndex()
+        pipeline = BulkIngestPipeline(extract, store, index, flush=index.flush, extract_concurrency=2, index_concurrency=3)
+        items = [BulkItem(index=i, title=f"doc{i}.txt", data=f"word {i} here".encode()) for i in range(10)]
+        items.append(BulkItem(index=10, title="x.bad", data=b"?"))
+        items.append(BulkItem(index=11, title="empty.txt", data=b"   "))
+        items.append(BulkItem(index=12, title="inline", content="please fail"))
+
+        events = await collect(pipeline, items)
+        summary = events.pop()
+
+        by_index = {e["index"]: e for e in events}
+        assert sorted(by_index) == list(range(13))
+        assert all(by_index[i]["status"] == "indexed" and by_index[i]["chunks"] == 3 for i in range(10))
+        assert by_index[10]["stage"] == "extract"
+        assert by_index[11]["error"] == "No text content extracted"
+        assert by_index[12]["stage"] == "index" and by_index[12]["doc_id"] is not None
+        assert summary["status"] == "done"
+        assert (summary["indexed"], summary["failed"], summary["chunks"]) == (10, 3, 30)
+        assert index.flushed
+        assert index.peak <= 3
+
+    @pytest.mark.asyncio
+    async def test_full_embedding_queue_is_backpressure_not_failure(self):
+        class Busy(Exception):
+            pass
+
+        attempts = []
+
+        async def index(item):
+            attempts.append(item.index)
+            if attempts.count(item.index) < 3:
+                raise Busy()
+            return 1
+
+        pipeline = BulkIngestPipeline(
+            extract, FakeStore(), index, busy_errors=(Busy,), busy_retry_delay=0.001
+        )
+        events = await collect(pipeline, [BulkItem(index=i, title="t", content="x") for i in range(2)])
+
+        assert [e["status"] for e in events[:-1]] == ["indexed", "indexed"]
+        assert len(attempts) == 6
+
+        pipeline.busy_max_wait = 0
+        attempts.clear()
+        events = await collect(pipeline, [BulkItem(index=0, title="t", content="x")])
+        assert events[0]["status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_store_batches_and_failures(self):
+        async def broken_store(batch):
+            raise RuntimeError("connection lost")
+
+        pipeline = BulkIngestPipeline(extract, broken_store, FakeIndex(), store_batch_size=4)
+        events = await collect(pipeline, [BulkItem(index=i, title="t", content="text") for i in range(3)])
+
+        assert [e["stage"] for e in events[:-1]] == ["store"] * 3
+        assert events[-1]["failed"] == 3
+
+        store = FakeStore()
+        pipeline = BulkIngestPipeline(extract, store, FakeIndex(), store_batch_size=4, queue_size=100)
+        await collect(pipeline, [BulkItem(index=i, title="t", content="text") for i in range(10)])
+        assert sum(store.batches) == 10
+        assert max(store.batches) <= 4
+
+    @pytest.mark.asyncio
+    async def test_stored_rows_start_embedding_under_a_job(self):
+        conn = FakeCopyConnection()
+        items = [BulkItem(index=i, title="t", content="text") for i in range(2)]
+
+        assert await insert_documents(conn, items) == [100, 101]
+
+        _, columns, records = conn.copies[0]
+        rows = [dict(zip(columns, record)) for record in records]
+        assert [r["index_status"] for r in rows] == ["embedding", "embedding"]
+        assert [str(r["index_job_id"]) for r in rows] == [item.job_id for item in items]
+        assert items[0].job_id != items[1].job_id
+
+    @pytest.mark.asyncio
+    async def test_index_outcomes_are_reported(self):
+        reported = []
+
+        async def report(event):
+            reported.append(event)
+            if event["doc_id"] == 101:
+                raise RuntimeError("postgres down")
+
+        async def store(batch):
+            for item in batch:
+                item.job_id = f"job-{item.index}"
+            return [100 + item.index for item in batch]
+
+        pipeline = BulkIngestPipeline(extract, store, FakeIndex(), report=report)
+        items = [BulkItem(index=0, title="a", content="ok"), BulkItem(index=1, title="b", content="fail me"),
+                 BulkItem(index=2, title="c", content="   ")]
+        events = await collect(pipeline, items)
+
+        # The empty document never reached storage, so only two outcomes are reported
+        assert sorted((e["doc_id"], e["job_id"], e["status"]) for e in reported) == [
+            (100, "job-0", "indexed"), (101, "job-1", "failed")
+        ]
+        # A failing report doesn't drop the event
+        assert events[-1]["indexed"] == 1 and events[-1]["failed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_indexed_status_waits_for_flush(self):
+        reported = []
+        flushed = []
+
+        async def report(event):
+            reported.append((event["doc_id"], event["status"], event.get("stage"), bool(flushed)))
+
+        async def flush():
+            flushed.append(True)
+            raise RuntimeError("barrier timed out")
+
+        pipeline = BulkIngestPipeline(extract, FakeStore(), FakeIndex(), flush=flush, report=report)
+        events = await collect(pipeline, [BulkItem(index=0, title="a", content="ok"),
+                                          BulkItem(index=1, title="b", content="fail me")])
+
+        # The index failure is reported right away, the indexed document only after the failed flush
+        assert sorted(reported) == [(100, "failed", "flush", True), (101, "failed", "index", False)]
+        assert events[-1]["flush_error"] == "barrier timed out"
+        assert events[-1]["unconfirmed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_reports_unsettled_documents(self):
+        reported = []
+        started = asyncio.Event()
+
+        async def report(event):
+            reported.append((event["doc_id"], event["stage"]))
+
+        async def stuck_index(item):
+            started.set()
+            await asyncio.Event().wait()
+
+        pipeline = BulkIngestPipeline(extract, FakeStore(), stuck_index, report=report)
+        run = pipeline.run(aiter([BulkItem(index=0, title="a", content="text")]))
+        consumer = asyncio.create_task(run.__anext__())
+        await started.wait()
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        await run.aclose()
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        assert reported == [(100, "cancelled")]
+
+    @pytest.mark.asyncio
+    async def test_spooled_files_are_removed_after_extraction(self, tmp_path):
+        def extract_path(path, filename):
+            with open(path, "rb") as f:
+                return f.read().decode("utf-8")
+
+        spools = []
+        for i, text in enumerate(["first document", ""]):
+            spool = tmp_path / f"upload{i}.txt"
+            spool.write_text(text)
+            spools.append(spool)
+
+        pipeline = BulkIngestPipeline(extract_path, FakeStore(), FakeIndex())
+        events = await collect(pipeline, [BulkItem(index=i, title=p.name, path=str(p)) for i, p in enumerate(spools)])
+
+        assert [e["status"] for e in events[:-1]].count("indexed") == 1
+        assert not any(p.exists() for p in spools)
+
+
+class TestNdjsonItems:
+    """Test NDJSON parsing across chunk boundaries"""
+
+    @pytest.mark.asyncio
+    async def test_lines_split_across_chunks(self):
+        chunks = [b'{"title": "a", "content": "x", "tags": ["t"]}\n{"title": "b",', b' "content": "y"}\n', b"not json\n\n"]
+
+        items = [item async for item in ndjson_items(aiter(chunks))]
+
+        assert [(i.index, i.title, i.content) for i in items[:2]] == [(0, "a", "x"), (1, "b", "y")]
+        assert items[0].tags == ["t"]
+        assert items[2].error and items[2].index == 2
@@ -0,0 +1,73 @@
+"""
+Test Incremental Re-indexing Chunk Diff
+"""
+
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.chunk_diff import chunk_records, diff_chunks
+
+
+def stored(records, title="Doc", metadata=None):
+    """Payloads as Qdrant would return them after indexing records"""
+    return {
+        r.point_id: {"chunk_id": r.chunk_id, "chunk_hash": r.chunk_hash, "title": title, "metadata": metadata or {}}
+        for r in records
+    }
+
+
+class TestChunkDiff:
+    """Test stable ids and minimal change sets"""
+
+    def test_ids_are_stable_and_unique_per_occurrence(self):
+        first = chunk_records(7, ["intro", "boilerplate", "boilerplate"])
+        again = chunk_records(7, ["intro", "boilerplate", "boilerplate"])
+
+        assert [r.point_id for r in first] == [r.point_id for r in again]
+        assert len({r.point_id for r in first}) == 3
+        assert chunk_records(8, ["intro"])[0].point_id != first[0].point_id
+
+    def test_unchanged_document_needs_no_work(self):
+        records = chunk_records(1, ["a", "b", "c"])
+
+        assert diff_chunks(records, stored(records), {"title": "Doc", "metadata": {}}) == ([], [], [])
+
+    def test_edit_touches_only_changed_chunk(self):
+        old = chunk_records(1, ["a", "b", "c", "d"])
+        new = chunk_records(1, ["a", "b changed", "c", "d"])
+
+        to_embed, to_delete, to_patch = diff_chunks(new, stored(old), {"title": "Doc", "metadata": {}})
+
+        assert [r.content for r in to_embed] == ["b changed"]
+        assert to_delete == [old[1].point_id]
+        assert to_patch == []
+
+    def test_removed_chunk_shifts_positions_with_payload_patch(self):
+        old = chunk_records(1, ["a", "b", "c"])
+        new = chunk_records(1, ["a", "c"])
+
+        to_embed, to_delete, to_patch = diff_chunks(new, stored(old), {"title": "Doc", "metadata": {}})
+
+        assert to_embed == []
+        assert to_delete == [old[1].point_id]
+        assert to_patch == [(old[2].point_id, {"chunk_id": 1})]
+
+    def test_title_change_patches_without_reembedding(self):
+        records = chunk_records(1, ["a", "b"])
+
+        to_embed, _, to_patch = diff_chunks(records, stored(records), {"title": "Renamed", "metadata": {}})
+
+        assert to_embed == []
+        assert [patch for _, patch in to_patch] == [{"title": "Renamed"}, {"title": "Renamed"}]
+
+    def test_legacy_points_without_hash_are_replaced(self):
+        records = chunk_records(1, ["a"])
+        legacy = {"12345": {"chunk_id": 0, "title": "Doc", "metadata": {}}}
+
+        to_embed, to_delete, _ = diff_chunks(records, legacy, {"title": "Doc", "metadata": {}})
+
+        assert [r.content for r in to_embed] == ["a"]
+        assert to_delete == ["12345"]
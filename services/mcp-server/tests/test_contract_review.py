@@ -5,6 +5,7 @@ Test Contract Review Functionality
 import pytest
 import asyncio
 from pathlib import Path
+from types import SimpleNamespace
 import sys
 
 # Add parent directory to path
@@ -13,7 +14,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 from tools.contract_review import (
     ContractReviewer,
     review_contract_tool,
-    analyze_clause_tool
+    analyze_clause_tool,
+    compare_contracts_tool
 )
 from utils.contract_parser import parse_contract_text
 
@@ -170,16 +172,13 @@ class TestContractReviewTool:
     @pytest.mark.asyncio
     async def test_review_employment_contract(self):
         """Test full review of employment contract"""
-        result = await review_contract_tool(
+        data = await review_contract_tool(
             contract_content=SAMPLE_EMPLOYMENT_CONTRACT,
             contract_name="Test Employment Agreement",
             contract_type="employment",
             llm_client=None  # Run without LLM for unit test
         )
 
-        import json
-        data = json.loads(result)
-
         assert 'contract_name' in data
         assert 'risk_score' in data
         assert 'risk_analysis' in data
@@ -188,20 +187,74 @@ class TestContractReviewTool:
     @pytest.mark.asyncio
     async def test_review_nda(self):
         """Test full review of NDA"""
-        result = await review_contract_tool(
+        data = await review_contract_tool(
             contract_content=SAMPLE_NDA,
             contract_name="Test NDA",
             contract_type="nda",
             llm_client=None
         )
 
-        import json
-        data = json.loads(result)
-
         assert data['contract_type'] == 'nda'
         assert 'risk_score' in data
 
 
+def _fake_llm_client(content):
+    """Minimal stand-in for an OpenAI-style async client returning fixed content"""
+    async def create(**kwargs):
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+class TestLLMTools:
+    """Test parsing of LLM-backed clause analysis and comparison"""
+
+    @pytest.mark.asyncio
+    async def test_analyze_clause_parses_json(self):
+        """Test the model's JSON is returned as a structured object"""
+        data = await analyze_clause_tool(
+            clause_text="Company may terminate at any time.",
+            llm_client=_fake_llm_client('{"risk_level": "HIGH", "issues": ["no notice"]}')
+        )
+
+        assert data == {"risk_level": "HIGH", "issues": ["no notice"]}
+
+    @pytest.mark.asyncio
+    async def test_analyze_clause_invalid_json(self):
+        """Test non-JSON output falls back to error + raw_result"""
+        data = await analyze_clause_tool(
+            clause_text="Company may terminate at any time.",
+            llm_client=_fake_llm_client("not json")
+        )
+
+        assert data["error"] == "Failed to parse analysis result"
+        assert data["raw_result"] == "not json"
+
+    @pytest.mark.asyncio
+    async def test_compare_contracts_parses_json(self):
+        """Test comparison JSON is returned as a structured object"""
+        data = await compare_contracts_tool(
+            contract_a=SAMPLE_EMPLOYMENT_CONTRACT,
+            contract_b=SAMPLE_NDA,
+            llm_client=_fake_llm_client('{"differences": []}')
+        )
+
+        assert data == {"differences": []}
+
+    @pytest.mark.asyncio
+    async def test_compare_contracts_invalid_json(self):
+        """Test non-JSON output falls back to error + raw_result"""
+        data = await compare_contracts_tool(
+            contract_a=SAMPLE_EMPLOYMENT_CONTRACT,
+            contract_b=SAMPLE_NDA,
+            llm_client=_fake_llm_client("plain text")
+        )
+
+        assert data["error"] == "Failed to parse comparison result"
+        assert data["raw_result"] == "plain text"
+
+
 class TestRecommendations:
     """Test recommendation generation"""
 
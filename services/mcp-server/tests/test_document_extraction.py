@@ -0,0 +1,39 @@
+"""
+Test Streaming Document Extraction
+"""
+
+import io
+
+import docx
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag_service import rag_service
+
+
+class TestDocumentExtraction:
+    """Test page/block-wise extraction from files, paths and bytes"""
+
+    def test_txt_blocks_keep_multibyte_characters_whole(self):
+        text = "合約條款 contract terms " * 50
+        blocks = list(rag_service.iter_text_from_txt(io.BytesIO(text.encode("utf-8")), block_size=7))
+
+        assert len(blocks) > 1
+        assert "".join(blocks) == text
+
+    def test_sources_give_the_same_text(self, tmp_path):
+        document = docx.Document()
+        document.add_paragraph("First paragraph")
+        document.add_paragraph("第二段")
+        path = tmp_path / "sample.docx"
+        document.save(path)
+
+        from_path = rag_service.extract_text_from_file(str(path), "sample.docx")
+        with open(path, "rb") as f:
+            from_file = rag_service.extract_text_from_file(f, "sample.docx")
+
+        assert from_path == from_file == rag_service.extract_text_from_file(path.read_bytes(), "sample.docx")
+        assert from_path == "First paragraph\n第二段"
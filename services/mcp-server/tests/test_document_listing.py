@@ -0,0 +1,121 @@
+"""
+Test Keyset Pagination for the Document List
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.document_listing import SORT_KEY, build_page_query, decode_cursor, encode_cursor, list_documents_page
+
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeConnection:
+    """Serves the page query from in-memory rows and records every query"""
+
+    def __init__(self, count=10, reltuples=0, plan_rows=0, undated=()):
+        # Two documents share each timestamp, so ties on created_at are exercised
+        self.rows = [
+            {"id": i, "title": f"doc {i}", "category": None, "tags": [],
+             "created_at": None if i in undated else BASE + timedelta(minutes=i // 2), "updated_at": None}
+            for i in range(1, count + 1)
+        ]
+        for row in self.rows:
+            row["sort_key"] = row["created_at"] or EPOCH
+        self.reltuples = reltuples
+        self.plan_rows = plan_rows
+        self.queries = []
+
+    async def fetch(self, sql, *args):
+        self.queries.append(sql)
+        rows = sorted(self.rows, key=lambda r: (r["sort_key"], r["id"]), reverse=True)
+        if f"({SORT_KEY}, id) <" in sql:
+            rows = [r for r in rows if (r["sort_key"], r["id"]) < (args[-3], args[-2])]
+        return rows[:args[-1]]
+
+    async def fetchval(self, sql, *args):
+        self.queries.append(sql)
+        if "reltuples" in sql:
+            return self.reltuples
+        if sql.startswith("EXPLAIN"):
+            return f'[{{"Plan": {{"Node Type": "Aggregate", "Plan Rows": 1, "Plans": [{{"Plan Rows": {self.plan_rows}}}]}}}}]'
+        return len(self.rows)
+
+
+class TestDocumentListing:
+    """Test cursors, keyset queries and count modes"""
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(BASE, 42)
+
+        assert decode_cursor(cursor) == (BASE, 42)
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_page_query_uses_keyset_not_offset(self):
+        sql, args = build_page_query(20, category="legal", cursor=encode_cursor(BASE, 7))
+
+        assert "OFFSET" not in sql
+        assert "category = $1" in sql and f"({SORT_KEY}, id) < ($2, $3)" in sql
+        assert f"ORDER BY {SORT_KEY} DESC, id DESC" in sql
+        assert args == ["legal", BASE, 7, 21]
+
+    def test_search_goes_through_indexes(self):
+        sql, args = build_page_query(5, search="termination clause")
+        assert "websearch_to_tsquery('english', $1)" in sql and "ILIKE" not in sql
+
+        sql, args = build_page_query(5, search="保密 協議")
+        assert args[:2] == ["%保密%", "%協議%"] and "websearch_to_tsquery" not in sql
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_row_once(self):
+        conn = FakeConnection(count=7)
+        seen, cursor = [], None
+
+        while True:
+            page = await list_documents_page(conn, 3, cursor=cursor, count="none")
+            seen += [d["id"] for d in page["documents"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == [7, 6, 5, 4, 3, 2, 1]
+        assert page["total"] is None
+
+    @pytest.mark.asyncio
+    async def test_undated_rows_are_paged_last(self):
+        conn = FakeConnection(count=7, undated={2, 3, 6})
+        seen, cursor = [], None
+
+        while True:
+            page = await list_documents_page(conn, 2, cursor=cursor, count="none")
+            seen += [d["id"] for d in page["documents"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == [7, 5, 4, 1, 6, 3, 2]
+
+    @pytest.mark.asyncio
+    async def test_count_modes(self):
+        conn = FakeConnection(count=4, reltuples=50000, plan_rows=1200)
+
+        assert (await list_documents_page(conn, 2, count="exact"))["total"] == 4
+        assert (await list_documents_page(conn, 2, count="estimated"))["total"] == 50000
+        assert (await list_documents_page(conn, 2, search="nda", count="estimated"))["total"] == 1200
+        assert not any(q.startswith("SELECT COUNT") for q in conn.queries[-3:])
+
+        # Small or never-analyzed tables get an exact count instead
+        conn = FakeConnection(count=4, reltuples=-1)
+        assert (await list_documents_page(conn, 2, count="estimated"))["total"] == 4
+
+        with pytest.raises(ValueError):
+            await list_documents_page(conn, 2, count="fast")
@@ -0,0 +1,131 @@
+"""
+Test Embedding Backends
+"""
+
+import numpy as np
+import pytest
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.embedding_backends import hub_repo_id, load_embedding_backend, mean_pool_normalize, quantized_model_path
+
+
+class TestEmbeddingBackends:
+    """Test pooling parity with sentence-transformers and backend selection"""
+
+    def test_mean_pool_ignores_padding_and_normalizes(self):
+        tokens = np.array([
+            [[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]],
+            [[0.0, 2.0], [0.0, 4.0], [0.0, 6.0]]
+        ])
+        mask = np.array([[1, 1, 0], [1, 1, 1]])
+
+        pooled = mean_pool_normalize(tokens, mask)
+
+        np.testing.assert_allclose(pooled, [[1.0, 0.0], [0.0, 1.0]])
+
+    def test_all_padding_row_does_not_divide_by_zero(self):
+        pooled = mean_pool_normalize(np.ones((1, 2, 3)), np.zeros((1, 2)))
+
+        assert np.isfinite(pooled).all()
+
+    def test_hub_repo_id(self):
+        assert hub_repo_id("all-MiniLM-L6-v2") == "sentence-transformers/all-MiniLM-L6-v2"
+        assert hub_repo_id("intfloat/e5-small-v2") == "intfloat/e5-small-v2"
+
+    def test_unknown_backend_is_rejected(self):
+        with pytest.raises(ValueError):
+            load_embedding_backend("tensorrt", "all-MiniLM-L6-v2")
+
+
+def write_tiny_onnx_model(path):
+    """Single MatMul graph: enough weights for dynamic quantization to act on"""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    weights = numpy_helper.from_array(np.random.default_rng(0).standard_normal((64, 32)).astype(np.float32), "W")
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["x", "W"], ["y"])],
+        "tiny",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [None, 64])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [None, 32])],
+        initializer=[weights]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    onnx.save(model, str(path))
+
+
+@pytest.fixture
+def fake_quantizer(monkeypatch):
+    """Stand-in for onnxruntime.quantization that records calls and copies the model"""
+    calls = []
+
+    def quantize_dynamic(source, target, weight_type=None):
+        calls.append((source, target))
+        Path(target).write_bytes(Path(source).read_bytes())
+
+    module = ModuleType("onnxruntime.quantization")
+    module.quantize_dynamic = quantize_dynamic
+    module.QuantType = SimpleNamespace(QInt8="QInt8")
+    monkeypatch.setitem(sys.modules, "onnxruntime", ModuleType("onnxruntime"))
+    monkeypatch.setitem(sys.modules, "onnxruntime.quantization", module)
+    return calls
+
+
+class TestQuantizedModelPath:
+    """Test int8 quantization caching"""
+
+    def test_writes_to_cache_dir_once(self, tmp_path, fake_quantizer):
+        snapshot = tmp_path / "snapshot"
+        snapshot.mkdir()
+        source = snapshot / "model.onnx"
+        source.write_bytes(b"model")
+        cache_dir = tmp_path / "cache"
+
+        target = quantized_model_path(str(source), str(cache_dir))
+
+        assert target.parent == cache_dir and target.name.endswith(".int8.onnx")
+        assert target.read_bytes() == b"model"
+        assert list(snapshot.iterdir()) == [source]
+        assert quantized_model_path(str(source), str(cache_dir)) == target
+        assert len(fake_quantizer) == 1
+
+    def test_different_snapshots_get_different_files(self, tmp_path, fake_quantizer):
+        paths = []
+        for snapshot in ("a", "b"):
+            source = tmp_path / snapshot / "model.onnx"
+            source.parent.mkdir()
+            source.write_bytes(b"model")
+            paths.append(quantized_model_path(str(source), str(tmp_path / "cache")))
+
+        assert paths[0] != paths[1]
+
+    def test_failed_quantization_leaves_nothing_behind(self, tmp_path, fake_quantizer, monkeypatch):
+        def fail(source, target, weight_type=None):
+            Path(target).write_bytes(b"partial")
+            raise RuntimeError("quantization failed")
+
+        monkeypatch.setattr(sys.modules["onnxruntime.quantization"], "quantize_dynamic", fail)
+        source = tmp_path / "model.onnx"
+        source.write_bytes(b"model")
+
+        with pytest.raises(RuntimeError):
+            quantized_model_path(str(source), str(tmp_path / "cache"))
+        assert list((tmp_path / "cache").iterdir()) == []
+
+    def test_quantizes_real_model(self, tmp_path):
+        ort = pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnxruntime.quantization")
+        source = tmp_path / "model.onnx"
+        write_tiny_onnx_model(source)
+
+        target = quantized_model_path(str(source), str(tmp_path / "cache"))
+
+        assert target.stat().st_size < source.stat().st_size
+        session = ort.InferenceSession(str(target), providers=["CPUExecutionProvider"])
+        x = np.ones((2, 64), dtype=np.float32)
+        assert session.run(None, {"x": x})[0].shape == (2, 32)
@@ -0,0 +1,38 @@
+"""
+Test Length-Sorted Embedding Batching
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.embedding_batching import encode_in_batches, length_sorted_batches
+
+
+class TestEmbeddingBatching:
+    """Test batch grouping and order restoration"""
+
+    def test_batches_group_similar_lengths(self):
+        texts = ["a", "aaaa", "aa", "aaaaa", "aaa"]
+
+        assert length_sorted_batches(texts, 2) == [[3, 1], [4, 2], [0]]
+
+    def test_results_come_back_in_input_order(self):
+        texts = ["ccc", "a", "bb", "dddd"]
+        calls = []
+
+        def encode_batch(batch):
+            calls.append(batch)
+            return [len(t) for t in batch]
+
+        assert encode_in_batches(texts, encode_batch, batch_size=3) == [3, 1, 2, 4]
+        assert calls == [["dddd", "ccc", "bb"], ["a"]]
+
+    def test_empty_input_and_invalid_batch_size(self):
+        assert encode_in_batches([], lambda batch: batch, batch_size=4) == []
+
+        with pytest.raises(ValueError):
+            length_sorted_batches(["a"], 0)
@@ -0,0 +1,106 @@
+"""
+Test Two-Tier Embedding Cache
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.embedding_cache import EmbeddingCache, decode_vector, encode_vector
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.ops.append((key, value))
+
+    async def execute(self):
+        self.store.update(self.ops)
+
+
+class FakeRedis:
+    """In-memory stand-in for the binary redis.asyncio client"""
+
+    def __init__(self, fail=False):
+        self.store = {}
+        self.fail = fail
+
+    async def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction=False):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return FakePipeline(self.store)
+
+
+class TestEmbeddingCache:
+    """Test keys, tiers and degradation"""
+
+    def test_float16_round_trip_is_compact(self):
+        data = encode_vector([0.5, -0.25, 0.125])
+
+        assert len(data) == 6
+        assert decode_vector(data) == [0.5, -0.25, 0.125]
+
+    def test_key_normalizes_text_and_includes_model(self):
+        cache = EmbeddingCache("model-a")
+
+        assert cache.key("  hello\n world ") == cache.key("hello world")
+        assert cache.key("ＡＢＣ") == cache.key("ABC")
+        assert cache.key("hello") != EmbeddingCache("model-b").key("hello")
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_and_lru_eviction(self):
+        cache = EmbeddingCache("m", max_items=2)
+        await cache.set_many(["a", "b", "c"], [[1.0], [2.0], [3.0]])
+
+        assert await cache.get_many(["a", "b", "c"]) == [None, [2.0], [3.0]]
+        assert cache.stats()["memory_hit_ratio"] == pytest.approx(2 / 3, abs=1e-4)
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_across_instances(self):
+        redis_client = FakeRedis()
+        writer = EmbeddingCache("m", redis_client=redis_client)
+        reader = EmbeddingCache("m", redis_client=redis_client)
+        await writer.set_many(["shared clause"], [[0.5, 0.25]])
+
+        assert await reader.get_many(["shared clause", "new"]) == [[0.5, 0.25], None]
+        assert reader.stats()["redis_hit_ratio"] == 0.5
+        # Promoted into the reader's LRU
+        assert await reader.get_many(["shared clause"]) == [[0.5, 0.25]]
+        assert reader.stats()["memory_hit_ratio"] == pytest.approx(1 / 3, abs=1e-4)
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_degrades_to_memory(self):
+        cache = EmbeddingCache("m", redis_client=FakeRedis(fail=True))
+        await cache.set_many(["a"], [[1.0]])
+
+        assert await cache.get_many(["a", "b"]) == [[1.0], None]
+
+    @pytest.mark.asyncio
+    async def test_repeated_texts_counted_per_input(self):
+        redis_client = FakeRedis()
+        cache = EmbeddingCache("m", redis_client=redis_client)
+        # "a" only in this instance's LRU, "b" only in Redis
+        await cache.set_many(["a"], [[1.0]])
+        redis_client.store.clear()
+        await EmbeddingCache("m", redis_client=redis_client).set_many(["b"], [[2.0]])
+
+        assert await cache.get_many(["a", "a", "b", "b", "c"]) == [[1.0], [1.0], [2.0], [2.0], None]
+        assert cache._counts == {"memory_hit": 2, "redis_hit": 2, "miss": 1}
+        assert cache.stats()["lookups"] == 5
@@ -0,0 +1,78 @@
+"""
+Test Dedicated Embedding Executor
+"""
+
+import pytest
+import asyncio
+import threading
+import time
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.embedding_executor import EmbeddingExecutor, EmbeddingQueueFull, EMBEDDING_QUEUE_DEPTH
+
+
+class TestEmbeddingExecutor:
+    """Test off-loop execution and bounded admission"""
+
+    @pytest.mark.asyncio
+    async def test_runs_on_embedding_worker_thread(self):
+        executor = EmbeddingExecutor(workers=1, max_queue_depth=2, torch_threads=1)
+        try:
+            name = await executor.run(lambda: threading.current_thread().name)
+            assert name.startswith("embedding")
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        executor = EmbeddingExecutor(workers=1, max_queue_depth=2, torch_threads=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await executor.run(time.sleep, 0.2)
+            assert ticks >= 5
+        finally:
+            task.cancel()
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_stays_full(self):
+        executor = EmbeddingExecutor(workers=1, max_queue_depth=0, torch_threads=1, queue_timeout=0.05)
+        try:
+            running = asyncio.create_task(executor.run(time.sleep, 0.3))
+            await asyncio.sleep(0.01)
+
+            with pytest.raises(EmbeddingQueueFull) as exc:
+                await executor.run(time.sleep, 0)
+            assert exc.value.status_code == 503
+
+            await running
+            assert await executor.run(lambda: "ok") == "ok"
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_queue_gauge_drains(self):
+        executor = EmbeddingExecutor(workers=1, max_queue_depth=2, torch_threads=1)
+        depth_before = EMBEDDING_QUEUE_DEPTH._value.get()
+
+        def fail():
+            raise ValueError("bad batch")
+
+        try:
+            with pytest.raises(ValueError):
+                await executor.run(fail)
+            assert EMBEDDING_QUEUE_DEPTH._value.get() == depth_before
+        finally:
+            executor.shutdown()
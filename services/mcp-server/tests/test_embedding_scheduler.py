@@ -0,0 +1,83 @@
+"""
+Test Embedding Micro-Batching Scheduler
+"""
+
+import pytest
+import asyncio
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.embedding_scheduler import MicroBatcher
+
+
+class RecordingEncoder:
+    """Fake encoder: vector is the text length; records every batch"""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0)
+        if self.fail_on in texts:
+            raise RuntimeError("encode failed")
+        return [len(t) for t in texts]
+
+
+class TestMicroBatcher:
+    """Test coalescing, flushing and fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_batch(self):
+        encoder = RecordingEncoder()
+        batcher = MicroBatcher(encoder, max_batch_size=16, max_wait_ms=20)
+
+        results = await asyncio.gather(
+            batcher.submit(["a"]),
+            batcher.submit(["bb", "ccc"]),
+            batcher.submit(["dddd"])
+        )
+
+        assert results == [[1], [2, 3], [4]]
+        assert encoder.batches == [["a", "bb", "ccc", "dddd"]]
+
+    @pytest.mark.asyncio
+    async def test_full_batches_flush_without_waiting(self):
+        encoder = RecordingEncoder()
+        batcher = MicroBatcher(encoder, max_batch_size=2, max_wait_ms=10_000)
+
+        results = await asyncio.wait_for(batcher.submit(["a", "bb", "ccc", "dddd"]), timeout=1)
+
+        assert results == [1, 2, 3, 4]
+        assert encoder.batches == [["a", "bb"], ["ccc", "dddd"]]
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_flushes_after_max_wait(self):
+        encoder = RecordingEncoder()
+        batcher = MicroBatcher(encoder, max_batch_size=64, max_wait_ms=5)
+
+        assert await asyncio.wait_for(batcher.submit(["query"]), timeout=1) == [5]
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_caller_in_the_batch(self):
+        encoder = RecordingEncoder(fail_on="bad")
+        batcher = MicroBatcher(encoder, max_batch_size=8, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batcher.submit(["ok"]),
+            batcher.submit(["bad"]),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await batcher.submit(["fine"]) == [4]
+
+    @pytest.mark.asyncio
+    async def test_empty_submission(self):
+        batcher = MicroBatcher(RecordingEncoder())
+
+        assert await batcher.submit([]) == []
@@ -0,0 +1,159 @@
+"""
+Test Ranked Keyword Search Query Routing
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.fulltext_search import (
+    SEARCH_INDEX_DDL,
+    build_fulltext_query,
+    build_trigram_query,
+    contains_cjk,
+    ensure_search_indexes,
+    escape_like,
+    search_documents
+)
+
+
+class FakeConnection:
+    """Records queries and returns canned rows per query kind"""
+
+    def __init__(self, fulltext_rows=None, trigram_rows=None):
+        self.fulltext_rows = fulltext_rows or []
+        self.trigram_rows = trigram_rows or []
+        self.queries = []
+
+    async def fetch(self, sql, *args):
+        self.queries.append((sql, args))
+        return self.fulltext_rows if is_fulltext(sql) else self.trigram_rows
+
+
+class FakeDDLConnection:
+    """Records DDL statements; reports the given indexes as invalid"""
+
+    def __init__(self, invalid=(), locked=True):
+        self.invalid = list(invalid)
+        self.locked = locked
+        self.statements = []
+
+    async def fetchval(self, sql, *args):
+        return self.locked
+
+    async def fetch(self, sql, *args):
+        return [{"relname": name} for name in self.invalid if name in args[0]]
+
+    async def execute(self, sql, *args):
+        self.statements.append(sql)
+
+
+def is_fulltext(sql):
+    return "websearch_to_tsquery" in sql
+
+
+def row(id, score=0.5):
+    return {"id": id, "title": f"doc {id}", "snippet": "...", "score": score, "metadata": {}}
+
+
+class TestFullTextSearch:
+    """Test query routing between full-text and trigram paths"""
+
+    def test_detects_cjk(self):
+        assert contains_cjk("保密協議")
+        assert contains_cjk("NDA 合約")
+        assert not contains_cjk("non-disclosure agreement")
+
+    def test_trigram_query_escapes_and_requires_every_term(self):
+        sql, args = build_trigram_query("合約 100%_off", 5)
+
+        assert args[:2] == ["合約 100%_off", 5]
+        assert args[2:4] == ["%合約%", "%100\\%\\_off%"]
+        assert args[4] == "合約"
+        assert "$3" in sql and "$4" in sql and " AND " in sql
+        assert escape_like("a\\b") == "a\\\\b"
+
+    def test_filters_follow_query_parameters(self):
+        sql, args = build_fulltext_query("warranty", 5, {"category": "legal", "tags": "nda", "lang": "en"})
+
+        assert args == ["warranty", 5, "legal", "nda", '{"lang":"en"}']
+        assert "category = $3" in sql and "$4 = ANY(tags)" in sql and "metadata @> $5::jsonb" in sql
+
+    def test_headlines_have_no_markup(self):
+        sql, _ = build_fulltext_query("warranty", 5)
+
+        assert 'StartSel="", StopSel=""' in sql
+
+    @pytest.mark.asyncio
+    async def test_english_query_uses_fulltext(self):
+        conn = FakeConnection(fulltext_rows=[row(1, 0.9)])
+        results = await search_documents(conn, "termination clause", 5)
+
+        assert len(conn.queries) == 1
+        assert conn.queries[0][1] == ("termination clause", 5)
+        assert results[0]["match"] == "fulltext"
+        assert "content" not in results[0]
+
+    @pytest.mark.asyncio
+    async def test_metadata_decoded_from_jsonb_text(self):
+        rows = [dict(row(1), metadata='{"source": "upload"}'), dict(row(2), metadata=None)]
+        results = await search_documents(FakeConnection(fulltext_rows=rows), "termination", 5)
+
+        assert results[0]["metadata"] == {"source": "upload"}
+        assert results[1]["metadata"] == {}
+
+    @pytest.mark.asyncio
+    async def test_english_query_falls_back_to_trigram(self):
+        conn = FakeConnection(trigram_rows=[row(2)])
+        results = await search_documents(conn, "the", 5)
+
+        assert len(conn.queries) == 2
+        assert results[0]["match"] == "trigram"
+
+    @pytest.mark.asyncio
+    async def test_cjk_query_skips_fulltext(self):
+        conn = FakeConnection(fulltext_rows=[row(1)], trigram_rows=[row(3)])
+        results = await search_documents(conn, "保密協議", 5)
+
+        assert len(conn.queries) == 1
+        assert not is_fulltext(conn.queries[0][0])
+        assert results[0]["id"] == 3
+
+    @pytest.mark.asyncio
+    async def test_blank_query_returns_nothing(self):
+        conn = FakeConnection()
+
+        assert await search_documents(conn, "   ", 5) == []
+        assert conn.queries == []
+
+
+class TestSearchIndexes:
+    """Test search index DDL"""
+
+    @pytest.mark.asyncio
+    async def test_creates_indexes_under_lock(self):
+        conn = FakeDDLConnection()
+        await ensure_search_indexes(conn)
+
+        assert not any(s.startswith("DROP") for s in conn.statements)
+        assert all(ddl in conn.statements for ddl in SEARCH_INDEX_DDL.values())
+        assert "pg_advisory_unlock" in conn.statements[-1]
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_invalid_index(self):
+        conn = FakeDDLConnection(invalid=["idx_documents_content"])
+        await ensure_search_indexes(conn)
+
+        drop = conn.statements.index("DROP INDEX CONCURRENTLY IF EXISTS idx_documents_content")
+        assert conn.statements[drop + 1] == SEARCH_INDEX_DDL["idx_documents_content"]
+        assert sum(s.startswith("DROP") for s in conn.statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_skips_when_another_session_holds_lock(self):
+        conn = FakeDDLConnection(invalid=["idx_documents_content"], locked=False)
+        await ensure_search_indexes(conn)
+
+        assert conn.statements == []
@@ -0,0 +1,179 @@
+"""
+Test Background Ingestion Queue
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.ingest_queue import InProcessQueue, IngestWorker, new_job_id
+
+
+class FakeStore:
+    """documents rows keyed by id, with the same job guard as PostgresIngestStore"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, doc_id, content="text"):
+        job_id = new_job_id()
+        self.rows[doc_id] = {"job_id": job_id, "status": "queued", "attempts": 0, "content": content, "error": None}
+        return job_id
+
+    async def claim(self, doc_id, job_id):
+        row = self.rows.get(doc_id)
+        if not row or row["job_id"] != job_id or row["status"] not in ("queued", "embedding"):
+            return None
+        row["status"] = "embedding"
+        row["attempts"] += 1
+        return {"title": "t", "content": row["content"], "category": None, "tags": [], "metadata": {}}
+
+    async def is_current(self, doc_id, job_id):
+        row = self.rows.get(doc_id)
+        return row is not None and row["job_id"] == job_id
+
+    async def _set(self, doc_id, job_id, status, error=None, chunks=None):
+        row = self.rows.get(doc_id)
+        if row and row["job_id"] == job_id:
+            row.update(status=status, error=error)
+            if chunks is not None:
+                row["chunks"] = chunks
+
+    async def requeue(self, doc_id, job_id, error):
+        await self._set(doc_id, job_id, "queued", error)
+
+    async def mark_indexed(self, doc_id, job_id, chunks):
+        await self._set(doc_id, job_id, "indexed", chunks=chunks)
+
+    async def mark_failed(self, doc_id, job_id, error):
+        await self._set(doc_id, job_id, "failed", error)
+
+
+class FlakyIndex:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    async def __call__(self, doc_id, document, guard):
+        self.calls.append(doc_id)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("qdrant unavailable")
+        await guard()
+        return len(document["content"].split())
+
+
+class InterruptedIndex:
+    """Applies an edit or delete to the store while the job is indexing"""
+
+    def __init__(self, store, interrupt, before_guard=True):
+        self.store = store
+        self.interrupt = interrupt
+        self.before_guard = before_guard
+        self.writes = []
+
+    async def __call__(self, doc_id, document, guard):
+        if self.before_guard:
+            self.interrupt()
+        await guard()
+        self.writes.append(document["content"])
+        if not self.before_guard:
+            self.interrupt()
+        return 1
+
+
+async def run_jobs(worker, jobs):
+    await worker.start(concurrency=2)
+    for doc_id, job_id in jobs:
+        await worker.enqueue(doc_id, job_id)
+    await worker.queue.join()
+    await worker.queue.close()
+
+
+class TestIngestWorker:
+    """Test status transitions, retries and idempotency"""
+
+    @pytest.mark.asyncio
+    async def test_jobs_are_indexed_in_background(self):
+        store, index = FakeStore(), FlakyIndex()
+        worker = IngestWorker(InProcessQueue(), store, index, retry_delay=0)
+        jobs = [(1, store.add(1, "a b c")), (2, store.add(2, "d e"))]
+
+        await run_jobs(worker, jobs)
+
+        assert store.rows[1]["status"] == "indexed" and store.rows[1]["chunks"] == 3
+        assert store.rows[2]["status"] == "indexed"
+
+    @pytest.mark.asyncio
+    async def test_failures_retry_then_succeed(self):
+        store, index = FakeStore(), FlakyIndex(failures=2)
+        worker = IngestWorker(InProcessQueue(), store, index, max_attempts=3, retry_delay=0)
+
+        await run_jobs(worker, [(1, store.add(1))])
+
+        assert store.rows[1]["status"] == "indexed"
+        assert store.rows[1]["attempts"] == 3
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        store, index = FakeStore(), FlakyIndex(failures=5)
+        worker = IngestWorker(InProcessQueue(), store, index, max_attempts=2, retry_delay=0)
+
+        await run_jobs(worker, [(1, store.add(1))])
+
+        assert store.rows[1]["status"] == "failed"
+        assert "qdrant unavailable" in store.rows[1]["error"]
+        assert len(index.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_redelivered_and_superseded_jobs_are_skipped(self):
+        store, index = FakeStore(), FlakyIndex()
+        worker = IngestWorker(InProcessQueue(), store, index, retry_delay=0)
+        first = store.add(1)
+        stale = store.add(2)
+        current = store.add(2)  # re-upload replaced the job id
+
+        await run_jobs(worker, [(1, first), (1, first), (2, stale), (2, current)])
+
+        assert sorted(index.calls) == [1, 2]
+        assert store.rows[2]["status"] == "indexed"
+
+    @pytest.mark.asyncio
+    async def test_superseded_job_stops_writing_and_reconciles(self):
+        store = FakeStore()
+        reconciled = []
+
+        async def reconcile(doc_id):
+            reconciled.append(doc_id)
+
+        job_id = store.add(1, "old text")
+        index = InterruptedIndex(store, lambda: store.add(1, "new text"))
+        worker = IngestWorker(InProcessQueue(), store, index, reconcile=reconcile, retry_delay=0)
+
+        await run_jobs(worker, [(1, job_id)])
+
+        assert index.writes == []
+        assert reconciled == [1]
+        # The newer job's row is untouched: still queued for its own job
+        assert store.rows[1]["status"] == "queued"
+
+    @pytest.mark.asyncio
+    async def test_delete_after_last_write_is_reconciled(self):
+        store = FakeStore()
+        reconciled = []
+
+        async def reconcile(doc_id):
+            reconciled.append(doc_id)
+
+        job_id = store.add(1, "text")
+        index = InterruptedIndex(store, lambda: store.rows.pop(1), before_guard=False)
+        worker = IngestWorker(InProcessQueue(), store, index, reconcile=reconcile, retry_delay=0)
+
+        await run_jobs(worker, [(1, job_id)])
+
+        assert index.writes == ["text"]
+        assert reconciled == [1]
+        assert 1 not in store.rows
@@ -0,0 +1,134 @@
+"""
+Test Batched Qdrant Upserts
+"""
+
+import asyncio
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.qdrant_ops import (
+    BARRIER_POINT_ID, BatchedUpserter, QDRANT_ERRORS, timed,
+    quantization_config, quantization_mode_of, quantization_search_params
+)
+
+
+class FakeQdrant:
+    def __init__(self):
+        self.calls = []
+
+    async def upsert(self, collection_name, points, wait):
+        self.calls.append((len(points), wait))
+
+    async def delete(self, collection_name, points_selector, wait):
+        self.calls.append(("delete", points_selector.points, wait))
+
+
+class TestBatchedUpserter:
+    """Test batching, wait semantics and flush points"""
+
+    @pytest.mark.asyncio
+    async def test_splits_and_waits_only_on_last_batch(self):
+        client = FakeQdrant()
+        upserter = BatchedUpserter(client, "documents", batch_size=2)
+
+        assert await upserter.upsert(list(range(5))) == 3
+        assert client.calls == [(2, False), (2, False), (1, True)]
+
+        await upserter.flush()
+        assert len(client.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_confirms_non_blocking_upserts(self):
+        client = FakeQdrant()
+        upserter = BatchedUpserter(client, "documents", batch_size=10)
+
+        await upserter.upsert(list(range(3)), wait=False)
+        await upserter.upsert(list(range(4)), wait=False)
+        assert client.calls == [(3, False), (4, False)]
+
+        await upserter.flush()
+        assert client.calls[-1] == ("delete", [BARRIER_POINT_ID], True)  # barrier touches no real point
+
+        await upserter.flush()
+        assert len(client.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_later_waiting_upsert_does_not_cancel_pending_flush(self):
+        client = FakeQdrant()
+        upserter = BatchedUpserter(client, "documents", batch_size=10)
+        release = asyncio.Event()
+        blocking_upsert = client.upsert
+
+        async def slow_upsert(collection_name, points, wait):
+            if wait:
+                await release.wait()
+            await blocking_upsert(collection_name, points, wait)
+
+        client.upsert = slow_upsert
+        # A wait=True upsert is sent first but returns after a bulk caller's wait=False batch
+        waiting = asyncio.create_task(upserter.upsert(list(range(2)), wait=True))
+        await asyncio.sleep(0)
+        await upserter.upsert(list(range(3)), wait=False)
+        release.set()
+        await waiting
+
+        await upserter.flush()
+        assert client.calls[-1] == ("delete", [BARRIER_POINT_ID], True)
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self):
+        client = FakeQdrant()
+        upserter = BatchedUpserter(client, "documents")
+        await upserter.upsert([1], wait=False)
+
+        async def broken_delete(collection_name, points_selector, wait):
+            raise RuntimeError("qdrant down")
+
+        working_delete, client.delete = client.delete, broken_delete
+        with pytest.raises(RuntimeError):
+            await upserter.flush()
+
+        client.delete = working_delete
+        await upserter.flush()
+        assert client.calls[-1] == ("delete", [BARRIER_POINT_ID], True)
+
+    @pytest.mark.asyncio
+    async def test_empty_upsert_is_a_no_op(self):
+        client = FakeQdrant()
+
+        assert await BatchedUpserter(client, "documents").upsert([]) == 0
+        assert client.calls == []
+
+    @pytest.mark.asyncio
+    async def test_timed_counts_failures(self):
+        async def boom():
+            raise RuntimeError("qdrant down")
+
+        before = QDRANT_ERRORS.labels("test_op")._value.get()
+        with pytest.raises(RuntimeError):
+            await timed("test_op", boom())
+        assert QDRANT_ERRORS.labels("test_op")._value.get() == before + 1
+
+
+class TestQuantizationSettings:
+    """Test quantization config and search params"""
+
+    def test_configs_round_trip_to_mode_names(self):
+        for mode in ("none", "scalar", "binary"):
+            assert quantization_mode_of(quantization_config(mode)) == mode
+
+        with pytest.raises(ValueError):
+            quantization_config("product")
+
+    def test_search_params_oversample_and_rescore(self):
+        assert quantization_search_params("none") is None
+
+        params = quantization_search_params("binary", oversampling=3.0, rescore=True)
+        assert params.quantization.oversampling == 3.0
+        assert params.quantization.rescore is True
+        assert params.quantization.ignore is False
@@ -0,0 +1,67 @@
+"""
+Test Hybrid Retrieval Rank Fusion
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.rank_fusion import fuse, suggest_keyword_weight
+
+
+def hits(*pairs):
+    return [{"doc_id": doc_id, "title": f"doc {doc_id}", "score": score} for doc_id, score in pairs]
+
+
+class TestRankFusion:
+    """Test RRF and weighted score fusion"""
+
+    def test_rrf_rewards_documents_found_by_both_legs(self):
+        ranked = {
+            "vector": hits((1, 0.9), (2, 0.8), (3, 0.7)),
+            "keyword": hits((3, 0.4), (4, 0.3))
+        }
+        results = fuse(ranked, {"vector": 0.5, "keyword": 0.5}, limit=3)
+
+        assert [r["doc_id"] for r in results] == [3, 1, 2]
+        assert results[0]["ranks"] == {"vector": 3, "keyword": 1}
+        assert results[0]["scores"] == {"vector": 0.7, "keyword": 0.4}
+
+    def test_weights_shift_the_ranking(self):
+        ranked = {"vector": hits((1, 0.9)), "keyword": hits((2, 0.5))}
+
+        assert fuse(ranked, {"vector": 0.8, "keyword": 0.2}, limit=2)[0]["doc_id"] == 1
+        assert fuse(ranked, {"vector": 0.2, "keyword": 0.8}, limit=2)[0]["doc_id"] == 2
+
+    def test_weighted_fusion_normalizes_each_leg(self):
+        ranked = {
+            "vector": hits((1, 0.9), (2, 0.8), (5, 0.1)),
+            "keyword": hits((2, 12.0), (3, 2.0))
+        }
+        results = fuse(ranked, {"vector": 0.5, "keyword": 0.5}, limit=2, method="weighted")
+
+        assert [r["doc_id"] for r in results] == [2, 1]
+        assert results[0]["score"] == pytest.approx(0.5 * 0.875 + 0.5)
+
+    def test_merge_keeps_first_non_empty_fields(self):
+        ranked = {
+            "vector": [{"doc_id": 1, "score": 0.9, "content": "chunk text", "chunk_id": 4}],
+            "keyword": [{"doc_id": 1, "score": 0.2, "content": "snippet", "chunk_id": None, "match": "fulltext"}]
+        }
+        result = fuse(ranked, {"vector": 0.5, "keyword": 0.5}, limit=1)[0]
+
+        assert result["content"] == "chunk text"
+        assert result["chunk_id"] == 4
+        assert result["match"] == "fulltext"
+
+    def test_unknown_method_rejected(self):
+        with pytest.raises(ValueError):
+            fuse({}, {}, limit=1, method="borda")
+
+    def test_identifier_queries_favour_keywords(self):
+        assert suggest_keyword_weight("status of order SO-2024-000123") > 0.5
+        assert suggest_keyword_weight('"force majeure" clause') > 0.5
+        assert suggest_keyword_weight("how do I reset the machine") < 0.5
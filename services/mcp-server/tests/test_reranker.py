@@ -0,0 +1,97 @@
+"""
+Test Cross-encoder Reranker
+"""
+
+import asyncio
+import time
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.embedding_executor import EmbeddingExecutor
+from utils.reranker import Reranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words the text contains"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.calls.append(len(pairs))
+        time.sleep(self.delay)
+        return [float(sum(word in text for word in query.split())) for query, text in pairs]
+
+
+def make_reranker(model, **kwargs):
+    return Reranker(EmbeddingExecutor(workers=1), load_model=lambda name: model, **kwargs)
+
+
+def hits(*contents):
+    return [{"doc_id": i, "content": c, "score": 0.9 - i * 0.1} for i, c in enumerate(contents)]
+
+
+class TestReranker:
+    """Test reordering, caching and the latency budget"""
+
+    @pytest.mark.asyncio
+    async def test_reorders_by_cross_encoder_score(self):
+        reranker = make_reranker(FakeCrossEncoder())
+
+        results = await reranker.rerank("refund policy", hits("shipping times", "refund policy details", "refund"), limit=2)
+
+        assert [r["doc_id"] for r in results] == [1, 2]
+        assert results[0]["rerank_score"] == 2.0
+        reranker.executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_scores_are_cached_per_query_and_chunk(self):
+        model = FakeCrossEncoder()
+        reranker = make_reranker(model)
+
+        await reranker.rerank("refund", hits("a", "refund b"), limit=2)
+        await reranker.rerank("refund", hits("refund b", "c"), limit=2)
+
+        assert model.calls == [2, 1]
+        reranker.executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back_to_vector_order_and_warms_cache(self):
+        model = FakeCrossEncoder(delay=0.2)
+        reranker = make_reranker(model, timeout_ms=20)
+        candidates = hits("x", "y", "refund")
+
+        results = await reranker.rerank("refund", candidates, limit=2)
+        assert results == candidates[:2]
+
+        await asyncio.sleep(0.3)
+        results = await reranker.rerank("refund", candidates, limit=2)
+        assert results[0]["content"] == "refund"
+        assert model.calls == [3]
+        reranker.executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_model_errors_fall_back(self):
+        def broken(name):
+            raise RuntimeError("model missing")
+
+        reranker = Reranker(EmbeddingExecutor(workers=1), load_model=broken)
+        candidates = hits("a", "b")
+
+        assert await reranker.rerank("q", candidates, limit=1) == candidates[:1]
+        reranker.executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_min_score_drops_irrelevant_chunks(self):
+        reranker = make_reranker(FakeCrossEncoder(), min_score=1.0)
+
+        results = await reranker.rerank("refund", hits("refund", "unrelated", "other"), limit=3)
+
+        assert [r["content"] for r in results] == ["refund"]
+        reranker.executor.shutdown()
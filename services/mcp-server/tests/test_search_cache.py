@@ -0,0 +1,136 @@
+"""
+Test Versioned Search Result Cache
+"""
+
+import asyncio
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.search_cache import SearchResultCache, mark_degraded, track_degraded
+
+
+class FakeRedis:
+    """The handful of decoded-response Redis commands the cache uses"""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(k) for k in keys]
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self._check()
+        self.data[key] = value.decode() if isinstance(value, bytes) else value
+
+    async def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+class Search:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return [{"doc_id": self.calls, "score": 0.9}], False
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    return SearchResultCache("model:torch", redis_client=FakeRedis() if request.param == "redis" else None)
+
+
+class TestSearchResultCache:
+    """Test keys, hits and version-based invalidation"""
+
+    def test_key_normalizes_query_and_parameter_order(self, cache):
+        a = cache.key("rag", {"query": "ＮＤＡ  terms", "top_k": 5, "filter_metadata": {"a": 1, "b": 2}})
+        b = cache.key("rag", {"filter_metadata": {"b": 2, "a": 1}, "top_k": 5, "query": "NDA terms"})
+
+        assert a == b
+        assert a != cache.key("rag", {"query": "NDA terms", "top_k": 6, "filter_metadata": {"a": 1, "b": 2}})
+        assert a != SearchResultCache("other:onnx").key("rag", {"query": "NDA terms", "top_k": 5, "filter_metadata": {"a": 1, "b": 2}})
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_is_served_until_corpus_changes(self, cache):
+        search = Search()
+        params = {"query": "refund policy", "top_k": 5}
+
+        first, hit = await cache.get_or_compute("rag", params, search)
+        assert not hit
+        second, hit = await cache.get_or_compute("rag", params, search)
+        assert hit and second == first and search.calls == 1
+
+        await cache.bump()
+        third, hit = await cache.get_or_compute("rag", params, search)
+        assert not hit and third[0]["doc_id"] == 2
+
+    @pytest.mark.asyncio
+    async def test_result_computed_across_a_bump_is_not_served(self, cache):
+        params = {"query": "q"}
+
+        async def racing_search():
+            await cache.bump()  # a document is indexed while the search runs
+            return [], False
+
+        await cache.get_or_compute("rag", params, racing_search)
+        _, hit = await cache.get_or_compute("rag", params, Search())
+
+        assert not hit
+
+    @pytest.mark.asyncio
+    async def test_bump_is_shared_through_redis(self):
+        redis = FakeRedis()
+        worker_a = SearchResultCache("m", redis_client=redis)
+        worker_b = SearchResultCache("m", redis_client=redis)
+
+        await worker_a.get_or_compute("rag", {"query": "q"}, Search())
+        await worker_b.bump()
+        _, hit = await worker_a.get_or_compute("rag", {"query": "q"}, Search())
+
+        assert not hit
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_memory(self):
+        cache = SearchResultCache("m", redis_client=FakeRedis(fail=True))
+        search = Search()
+
+        await cache.get_or_compute("rag", {"query": "q"}, search)
+        _, hit = await cache.get_or_compute("rag", {"query": "q"}, search)
+
+        assert hit and search.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_degraded_results_are_not_stored(self, cache):
+        calls = []
+
+        async def failing_leg():
+            mark_degraded("hybrid vector leg failed")
+
+        async def hybrid_search():
+            calls.append(1)
+            await asyncio.gather(failing_leg())  # marks made in child tasks count too
+            return [{"doc_id": 1}]
+
+        for _ in range(2):
+            results, hit = await cache.get_or_compute("rag", {"query": "q"}, lambda: track_degraded(hybrid_search))
+            assert results == [{"doc_id": 1}] and not hit
+
+        assert len(calls) == 2
@@ -0,0 +1,196 @@
+"""
+Test Concurrent Web Search Providers
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import search_service
+from search_service import SearchService
+
+
+def slow_provider(name, delay, urls):
+    async def search(query, max_results=5):
+        await asyncio.sleep(delay)
+        return [{"title": url, "url": url, "snippet": "", "source": name, "rank": i + 1} for i, url in enumerate(urls)]
+    return search
+
+
+@pytest.fixture
+def service():
+    service = SearchService()
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+class TestSearchService:
+    """Test concurrency, per-provider timeouts and the REST providers"""
+
+    @pytest.mark.asyncio
+    async def test_providers_run_concurrently(self, service):
+        service.provider_methods["duckduckgo"] = slow_provider("DuckDuckGo", 0.2, ["https://a", "https://b"])
+        service.provider_methods["google"] = slow_provider("Google", 0.2, ["https://b", "https://c"])
+
+        started = time.perf_counter()
+        result = await service.search("q", providers=["duckduckgo", "google"])
+
+        assert time.perf_counter() - started < 0.35
+        assert [r["url"] for r in result["results"]] == ["https://a", "https://b", "https://c"]
+        assert result["provider_errors"] == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_or_failing_provider_does_not_hold_up_the_rest(self, service):
+        async def broken(query, max_results=5):
+            raise httpx.ConnectError("refused")
+
+        service.provider_methods["duckduckgo"] = slow_provider("DuckDuckGo", 5, ["https://slow"])
+        service.provider_methods["google"] = slow_provider("Google", 0.01, ["https://fast"])
+        service.provider_methods["tavily"] = broken
+        service.timeouts["duckduckgo"] = 0.1
+
+        started = time.perf_counter()
+        result = await service.search("q", providers=["duckduckgo", "google", "tavily"])
+
+        assert time.perf_counter() - started < 1
+        assert [r["url"] for r in result["results"]] == ["https://fast"]
+        assert result["provider_errors"] == {"duckduckgo": "timeout", "tavily": "refused"}
+
+    @pytest.mark.asyncio
+    async def test_blocking_duckduckgo_client_runs_off_the_event_loop(self, service):
+        def blocking_search(query, max_results):
+            time.sleep(0.2)
+            return [{"title": "t", "href": "https://ddg", "body": "b"}]
+
+        service._duckduckgo_sync = blocking_search
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await service.search_duckduckgo("q")
+        task.cancel()
+
+        assert results[0]["url"] == "https://ddg" and results[0]["snippet"] == "b"
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_rest_providers_share_the_pooled_client(self, service, monkeypatch):
+        monkeypatch.setenv("TAVILY_API_KEY", "tv")
+        monkeypatch.setenv("SERPAPI_API_KEY", "sp")
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if request.url.host == "api.tavily.com":
+                return httpx.Response(200, json={
+                    "answer": "summary",
+                    "results": [{"title": "T", "url": "https://t", "content": "c", "score": 0.9}]
+                })
+            return httpx.Response(200, json={"organic_results": [{"title": "S", "link": "https://s", "snippet": "s", "position": 1}]})
+
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        result = await service.search("q", providers=["tavily", "serpapi"])
+        await service.close()
+
+        assert [r["source"] for r in result["results"]] == ["Tavily AI", "Tavily", "Google (SerpAPI)"]
+        assert requests[0].method == "POST" and b'"api_key":"tv"' in requests[0].content.replace(b" ", b"")
+        assert requests[1].url.params["api_key"] == "sp"
+
+
+class TestProviderRacing:
+    """Test race mode and stats-driven provider selection"""
+
+    @pytest.mark.asyncio
+    async def test_race_returns_once_enough_results_arrive(self, service):
+        cancelled = []
+
+        async def straggler(query, max_results=5):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append("google")
+                raise
+
+        service.provider_methods["duckduckgo"] = slow_provider("DuckDuckGo", 0.01, ["https://a", "https://b"])
+        service.provider_methods["google"] = straggler
+
+        started = time.perf_counter()
+        result = await service.search("q", max_results=2, providers=["duckduckgo", "google"], race=True)
+
+        assert time.perf_counter() - started < 1
+        assert [r["url"] for r in result["results"]] == ["https://a", "https://b"]
+        assert result["providers_cancelled"] == ["google"] and cancelled == ["google"]
+        [(latency, ok)] = service.stats["google"].samples
+        assert latency > 0 and ok is None  # a lower-bound latency, not a failure
+        assert service.stats["google"].success_rate == 1.0
+
+    @pytest.mark.asyncio
+    async def test_race_soft_deadline_settles_for_partial_results(self, service, monkeypatch):
+        monkeypatch.setattr(search_service, "WEB_SEARCH_SOFT_DEADLINE", 0.05)
+        service.provider_methods["duckduckgo"] = slow_provider("DuckDuckGo", 0.01, ["https://a"])
+        service.provider_methods["google"] = slow_provider("Google", 5, ["https://b"])
+
+        started = time.perf_counter()
+        result = await service.search("q", max_results=5, providers=["duckduckgo", "google"], race=True)
+
+        assert time.perf_counter() - started < 1
+        assert [r["url"] for r in result["results"]] == ["https://a"]
+
+    @pytest.mark.asyncio
+    async def test_race_without_results_waits_past_the_soft_deadline(self, service, monkeypatch):
+        monkeypatch.setattr(search_service, "WEB_SEARCH_SOFT_DEADLINE", 0.01)
+        service.provider_methods["duckduckgo"] = slow_provider("DuckDuckGo", 0.1, ["https://late"])
+
+        result = await service.search("q", providers=["duckduckgo"], race=True)
+
+        assert [r["url"] for r in result["results"]] == ["https://late"]
+
+    def test_providers_are_ordered_by_latency_and_success(self, service):
+        for _ in range(5):
+            service.stats["duckduckgo"].record(1.0, True)
+            service.stats["google"].record(0.2, True)
+            service.stats["tavily"].record(0.2, False)
+
+        selected, skipped = service.select_providers(["duckduckgo", "google", "tavily", "serpapi"])
+
+        assert selected == ["serpapi", "google", "duckduckgo"]  # serpapi has no samples yet
+        assert skipped == ["tavily"]
+        assert service.provider_stats()["google"]["p95_seconds"] == 0.2
+
+    def test_providers_that_always_lose_races_move_back(self, service):
+        for _ in range(5):
+            service.stats["duckduckgo"].record(0.3, True)
+            service.stats["google"].record(2.0, None)  # cancelled after 2s every time
+
+        selected, _ = service.select_providers(["google", "duckduckgo"])
+
+        assert selected == ["duckduckgo", "google"]
+        assert service.provider_stats()["google"]["p50_seconds"] == 2.0
+
+    def test_explicit_providers_are_not_skipped(self, service):
+        for _ in range(5):
+            service.stats["tavily"].record(0.2, False)
+
+        assert service.select_providers(["tavily"], allow_skip=False) == (["tavily"], [])
+        assert service.select_providers(["tavily"]) == (["tavily"], [])  # never skip every provider
+
+    def test_unhealthy_provider_is_probed_after_cooldown(self, service, monkeypatch):
+        for _ in range(5):
+            service.stats["tavily"].record(0.2, False)
+        assert service.select_providers(["duckduckgo", "tavily"])[1] == ["tavily"]
+
+        monkeypatch.setattr(search_service, "WEB_SEARCH_SKIP_COOLDOWN", 0)
+
+        assert service.select_providers(["duckduckgo", "tavily"])[1] == []
@@ -0,0 +1,66 @@
+"""
+Test Token-aware Text Chunker
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.text_chunker import approximate_token_offsets, chunk_by_tokens
+
+
+def token_count(text):
+    return len(approximate_token_offsets(text))
+
+
+class TestChunkByTokens:
+    """Test token limits, sentence boundaries and overlap"""
+
+    def test_chinese_text_is_split_on_sentence_ends(self):
+        text = "合同自签署之日起生效。" * 20 + "双方应当遵守保密义务！" * 20
+
+        chunks = chunk_by_tokens(text, max_tokens=50, overlap_tokens=0)
+
+        assert len(chunks) > 1
+        assert all(token_count(c) <= 50 for c in chunks)
+        assert all(c.endswith(("。", "！")) for c in chunks)
+        assert "".join(chunks) == text
+
+    def test_short_text_is_one_chunk(self):
+        assert chunk_by_tokens("One sentence. Another one!", max_tokens=50) == ["One sentence. Another one!"]
+        assert chunk_by_tokens("   ", max_tokens=50) == []
+
+    def test_paragraphs_are_kept_together_when_they_fit(self):
+        first = "Alpha beta gamma. Delta epsilon."
+        second = "Zeta eta theta. Iota kappa."
+
+        chunks = chunk_by_tokens(f"{first}\n\n{second}", max_tokens=8, overlap_tokens=0)
+
+        assert chunks == [first, second]
+
+    def test_overlap_repeats_trailing_sentence(self):
+        sentences = [f"Sentence number {i} is here." for i in range(12)]
+
+        chunks = chunk_by_tokens(" ".join(sentences), max_tokens=20, overlap_tokens=6)
+
+        assert all(token_count(c) <= 20 for c in chunks)
+        for previous, current in zip(chunks, chunks[1:]):
+            last_sentence = previous.split(". ")[-1]
+            assert current.startswith(last_sentence.rstrip("."))
+
+    def test_long_sentence_is_cut_at_word_boundaries_with_overlap(self):
+        words = [f"w{i}" for i in range(100)]
+
+        chunks = chunk_by_tokens(" ".join(words), max_tokens=30, overlap_tokens=5)
+
+        assert all(token_count(c) <= 30 for c in chunks)
+        assert all(set(c.split()) <= set(words) for c in chunks)
+        assert chunks[0].split()[-5:] == chunks[1].split()[:5]
+        assert chunks[-1].split()[-1] == "w99"
+
+    def test_invalid_limit(self):
+        with pytest.raises(ValueError):
+            chunk_by_tokens("text", max_tokens=0)
@@ -0,0 +1,202 @@
+"""
+Test Read-only Tool Cache
+"""
+
+import asyncio
+
+import pytest
+from pathlib import Path
+import sys
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.fast_json import ORJSONResponse
+from utils.tool_cache import ToolCache
+
+
+class FakeRedis:
+    """Decoded-response Redis with SET NX locks; fail=True simulates an outage"""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(k) for k in keys]
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self._check()
+        self.data[key] = value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key, value, nx=False, px=None):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        self._check()
+        if self.data.get(key) == token:
+            del self.data[key]
+
+    async def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+class LookupRequest(BaseModel):
+    name: str
+    verbose: bool = False
+
+
+def build(cache):
+    calls = []
+
+    @cache.cached("get_item", ttl=60, tags=["items", "item:{item_id}"])
+    async def get_item(item_id: int, detail: bool = False):
+        calls.append(item_id)
+        await asyncio.sleep(0.01)
+        if item_id == 404:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return {"id": item_id, "detail": detail, "call": len(calls)}
+
+    @cache.cached("lookup", ttl=60)
+    async def lookup(request: LookupRequest):
+        calls.append(request.name)
+        return ORJSONResponse({"name": request.name})
+
+    return get_item, lookup, calls
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    return ToolCache(redis_client=FakeRedis() if request.param == "redis" else None)
+
+
+class TestToolCache:
+    """Test hits, tag invalidation, coalescing and Redis outages"""
+
+    @pytest.mark.asyncio
+    async def test_hits_are_keyed_by_arguments(self, cache):
+        get_item, _, calls = build(cache)
+
+        assert await get_item(1) == await get_item(item_id=1, detail=False)
+        await get_item(1, detail=True)
+
+        assert calls == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_tags_invalidate_only_matching_entries(self, cache):
+        get_item, _, calls = build(cache)
+        await get_item(1)
+        await get_item(2)
+
+        await cache.invalidate("item:1")
+        await get_item(1)
+        await get_item(2)
+        assert calls == [1, 2, 1]
+
+        await cache.invalidate("items")
+        await get_item(2)
+        assert calls == [1, 2, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self, cache):
+        get_item, _, calls = build(cache)
+
+        results = await asyncio.gather(*(get_item(7) for _ in range(10)))
+
+        assert calls == [7]
+        assert all(r == results[0] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_but_not_cached(self, cache):
+        get_item, _, calls = build(cache)
+
+        results = await asyncio.gather(get_item(404), get_item(404), return_exceptions=True)
+        assert all(isinstance(r, HTTPException) and r.status_code == 404 for r in results)
+        with pytest.raises(HTTPException):
+            await get_item(404)
+
+        assert calls == [404, 404]
+
+    @pytest.mark.asyncio
+    async def test_prerendered_responses_are_rebuilt(self, cache):
+        _, lookup, calls = build(cache)
+
+        await lookup(LookupRequest(name="a"))
+        response = await lookup(LookupRequest(name="a"))
+
+        assert isinstance(response, ORJSONResponse) and response.body == b'{"name":"a"}'
+        assert calls == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_other_worker_holding_the_lock_is_awaited(self):
+        redis = FakeRedis()
+        worker_a = ToolCache(redis_client=redis, poll_interval_ms=5)
+        worker_b = ToolCache(redis_client=redis, poll_interval_ms=5)
+        get_a, _, calls_a = build(worker_a)
+        get_b, _, calls_b = build(worker_b)
+
+        await asyncio.gather(get_a(3), get_b(3))
+
+        assert len(calls_a) + len(calls_b) == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_outage_degrades_to_memory(self):
+        cache = ToolCache(redis_client=FakeRedis(fail=True))
+        get_item, _, calls = build(cache)
+
+        await get_item(1)
+        await get_item(1)
+        await cache.invalidate("items")
+        await get_item(1)
+
+        assert calls == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_results_rejected_by_cacheable_are_not_stored(self, cache):
+        calls = []
+
+        @cache.cached("web", ttl=60, cacheable=lambda r: not r["errors"])
+        async def web(query: str):
+            calls.append(query)
+            return {"results": [], "errors": {"google": "timeout"} if len(calls) == 1 else {}}
+
+        assert (await web("q"))["errors"] == {"google": "timeout"}
+        assert (await web("q"))["errors"] == {}
+        await web("q")
+
+        assert calls == ["q", "q"]
+
+    @pytest.mark.asyncio
+    async def test_tags_can_depend_on_arguments(self, cache):
+        calls = []
+
+        @cache.cached("search", ttl=60, tags=lambda args: ["documents"] if args["mix"] else [])
+        async def search(query: str, mix: bool = True):
+            calls.append((query, mix))
+            return {"query": query}
+
+        await search("q")
+        await search("q", mix=False)
+        await cache.invalidate("documents")
+        await search("q")
+        await search("q", mix=False)
+
+        assert calls == [("q", True), ("q", False), ("q", True)]
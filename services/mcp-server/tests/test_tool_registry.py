@@ -0,0 +1,162 @@
+"""
+Test Tool Registry Dispatch
+"""
+
+import pytest
+import asyncio
+import json
+from pathlib import Path
+import sys
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tool_registry import ToolRegistry, ToolInvocationError
+
+
+class EchoRequest(BaseModel):
+    text: str
+    repeat: int = 1
+
+
+def build_registry() -> ToolRegistry:
+    registry = ToolRegistry(max_concurrency=4)
+
+    @registry.tool("echo", description="Echo text", category="test", parameters={"text": "string"})
+    async def echo(request: EchoRequest):
+        return {"text": request.text * request.repeat}
+
+    @registry.tool("get_item", description="Get item", category="test", arg_aliases={"item_id": "id"})
+    async def get_item(id: int, verbose: bool = False):
+        if id == 404:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return {"id": id, "verbose": verbose}
+
+    @registry.tool("slow", description="Sleep", category="test")
+    async def slow(delay: float):
+        await asyncio.sleep(delay)
+        return {"slept": delay}
+
+    return registry
+
+
+class TestToolRegistry:
+    """Test registration and single invocation"""
+
+    def test_descriptors_keep_registration_order(self):
+        registry = build_registry()
+
+        assert registry.names() == ["echo", "get_item", "slow"]
+        assert registry.get("echo").descriptor() == {
+            "name": "echo",
+            "description": "Echo text",
+            "category": "test",
+            "parameters": {"text": "string"}
+        }
+
+    def test_duplicate_registration_rejected(self):
+        registry = build_registry()
+
+        with pytest.raises(ValueError):
+            registry.tool("echo", description="", category="test")(lambda: None)
+
+    def test_catalog_is_cached_and_filtered(self):
+        registry = build_registry()
+        body, etag = registry.catalog()
+
+        assert registry.catalog() == (body, etag)
+        assert [t["name"] for t in json.loads(body)["tools"]] == ["echo", "get_item", "slow"]
+        assert json.loads(registry.catalog(["missing"])[0]) == {"tools": []}
+        assert registry.catalog(["test", "junk"]) == registry.catalog(["test"])
+        assert len(registry._catalog_cache) == 3  # unfiltered, ("test",) and no known category
+
+        @registry.tool("late", description="Late", category="other")
+        async def late():
+            return {}
+
+        assert registry.catalog()[1] != etag
+        assert registry.categories() == ["other", "test"]
+        assert [t["name"] for t in json.loads(registry.catalog(["other"])[0])["tools"]] == ["late"]
+
+    @pytest.mark.asyncio
+    async def test_invoke_request_model_tool(self):
+        registry = build_registry()
+        result = await registry.invoke("echo", {"text": "ab", "repeat": 2})
+
+        assert result == {"text": "abab"}
+
+    @pytest.mark.asyncio
+    async def test_invoke_keyword_tool_coerces_and_aliases(self):
+        registry = build_registry()
+        result = await registry.invoke("get_item", {"item_id": "7"})
+
+        assert result == {"id": 7, "verbose": False}
+
+    @pytest.mark.asyncio
+    async def test_invoke_errors_carry_status(self):
+        registry = build_registry()
+
+        with pytest.raises(ToolInvocationError) as unknown:
+            await registry.invoke("missing", {})
+        assert unknown.value.status_code == 404
+
+        with pytest.raises(ToolInvocationError) as invalid:
+            await registry.invoke("echo", {})
+        assert invalid.value.status_code == 422
+
+        with pytest.raises(ToolInvocationError) as not_found:
+            await registry.invoke("get_item", {"id": 404})
+        assert not_found.value.status_code == 404
+        assert not_found.value.detail == "Item not found"
+
+
+class TestBatchInvoke:
+    """Test concurrent batch invocation"""
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_per_call_results_in_order(self):
+        registry = build_registry()
+        results = await registry.batch_invoke([
+            {"id": "a", "tool": "echo", "arguments": {"text": "x"}},
+            {"id": "b", "tool": "get_item", "arguments": {"id": 404}},
+            {"tool": "missing"}
+        ])
+
+        assert [r["id"] for r in results] == ["a", "b", "2"]
+        assert results[0]["success"] and results[0]["result"] == {"text": "x"}
+        assert not results[1]["success"] and results[1]["status_code"] == 404
+        assert not results[2]["success"] and results[2]["status_code"] == 404
+
+    @pytest.mark.asyncio
+    async def test_batch_runs_concurrently(self):
+        registry = build_registry()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        results = await registry.batch_invoke([
+            {"tool": "slow", "arguments": {"delay": 0.1}} for _ in range(4)
+        ])
+
+        assert all(r["success"] for r in results)
+        assert loop.time() - start < 0.3
+
+    @pytest.mark.asyncio
+    async def test_requested_concurrency_is_capped(self):
+        registry = build_registry()
+        running = peak = 0
+
+        @registry.tool("track", description="Track concurrency", category="test")
+        async def track():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {}
+
+        await registry.batch_invoke([{"tool": "track"} for _ in range(10)], max_concurrency=100)
+
+        assert peak == 4
@@ -0,0 +1,147 @@
+"""
+Test Two-tier Cache and Pub/Sub Invalidation
+"""
+
+import asyncio
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.two_tier_cache import InvalidationBus, TwoTierCache
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.append(self.queue)
+
+    async def listen(self):
+        while True:
+            message = await self.queue.get()
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+    async def aclose(self):
+        self.redis.subscribers.remove(self.queue)
+
+
+class FakeRedis:
+    """Decoded-response Redis that counts round trips and fans out PUBLISH"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+        self.calls = 0
+
+    async def mget(self, keys):
+        self.calls += 1
+        return [self.data.get(k) for k in keys]
+
+    async def get(self, key):
+        self.calls += 1
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.calls += 1
+        self.data[key] = value.decode() if isinstance(value, bytes) else value
+
+    async def incr(self, key):
+        self.calls += 1
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def publish(self, channel, message):
+        self.calls += 1
+        for queue in self.subscribers:
+            queue.put_nowait({"type": "message", "data": message.decode()})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+async def worker(redis):
+    """A cache with its invalidation subscription running, as in one uvicorn worker"""
+    cache = TwoTierCache("test", redis_client=redis)
+    bus = InvalidationBus(retry_seconds=0.01)
+    bus.register(cache)
+    await bus.start(redis)
+    while not bus.connected:
+        await asyncio.sleep(0)
+    return cache, bus
+
+
+class TestTwoTierCache:
+    """Test tier-1 hits, cross-worker invalidation and memory bounds"""
+
+    @pytest.mark.asyncio
+    async def test_hot_key_is_served_without_redis_round_trips(self):
+        redis = FakeRedis()
+        cache, bus = await worker(redis)
+        versions, _, _ = await cache.get("k", ["docs"])
+        await cache.set("k", versions, {"rows": [1, 2]}, 300)
+
+        before = redis.calls
+        for _ in range(100):
+            assert (await cache.get("k", ["docs"]))[1] == {"rows": [1, 2]}
+
+        assert redis.calls == before
+        assert cache.stats()["l1_hit_ratio"] > 0.9
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_other_workers(self):
+        redis = FakeRedis()
+        (a, bus_a), (b, bus_b) = await worker(redis), await worker(redis)
+        versions, _, _ = await a.get("k", ["docs"])
+        await a.set("k", versions, "old", 300)
+        assert (await b.get("k", ["docs"]))[1] == "old"  # filled from Redis into b's tier 1
+
+        await a.invalidate("docs")
+        await asyncio.sleep(0.01)
+
+        assert (await a.get("k", ["docs"]))[1] is None
+        assert (await b.get("k", ["docs"]))[2] is True  # stale, not served
+        await bus_a.close()
+        await bus_b.close()
+
+    @pytest.mark.asyncio
+    async def test_without_subscription_versions_come_from_redis(self):
+        redis = FakeRedis()
+        a, b = TwoTierCache("test", redis_client=redis), TwoTierCache("test", redis_client=redis)
+        versions, _, _ = await a.get("k", ["docs"])
+        await a.set("k", versions, "old", 300)
+
+        await b.invalidate("docs")
+
+        assert (await a.get("k", ["docs"]))[1] is None
+
+    @pytest.mark.asyncio
+    async def test_resubscribing_drops_tier_one(self):
+        redis = FakeRedis()
+        cache, bus = await worker(redis)
+        await cache.set("k", {}, "value", 300)
+
+        bus.handle(b'{"cache": "test", "tags": {"docs": 3}}')
+        redis.subscribers[0].put_nowait(ConnectionError("connection reset"))
+        await asyncio.sleep(0.05)
+
+        assert bus.connected
+        assert cache.stats()["l1_items"] == 0
+        assert await cache.versions(["docs"]) == {"docs": 0}  # mirror re-read from Redis
+        await bus.close()
+
+    def test_tier_one_is_bounded_by_bytes(self):
+        cache = TwoTierCache("test", l1_max_bytes=200)
+        for i in range(10):
+            cache._remember(f"k{i}", {}, b"x" * 50, 300)
+
+        stats = cache.stats()
+        assert stats["l1_bytes"] <= 200 and stats["l1_items"] == 4
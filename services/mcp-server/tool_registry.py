@@ -0,0 +1,219 @@
+"""
+MCP Tool Registry
+Single place where each tool declares its handler and schema, used by
+/tools/list, /tools/invoke and /tools/batch_invoke
+"""
+
+import asyncio
+import hashlib
+import inspect
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError, create_model
+
+from utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolSpec:
+    """A registered tool: public descriptor plus how to call it"""
+    name: str
+    description: str
+    category: str
+    parameters: Dict[str, Any]
+    handler: Callable[..., Awaitable[Any]]
+    arguments_model: Type[BaseModel]
+    takes_request_model: bool
+    arg_aliases: Dict[str, str] = field(default_factory=dict)
+    examples: Optional[List[str]] = None
+
+    def descriptor(self) -> Dict[str, Any]:
+        """Descriptor as returned by /tools/list"""
+        info = {
+            "name": self.name,
+            "description": self.description,
+            "category": self.category,
+            "parameters": self.parameters
+        }
+        if self.examples:
+            info["examples"] = self.examples
+        return info
+
+
+class ToolInvocationError(Exception):
+    """Tool call failed; carries the HTTP status the route would have returned"""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(str(detail))
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ToolRegistry:
+    """Registry of MCP tools keyed by name"""
+
+    def __init__(self, max_concurrency: int = 8):
+        self._tools: Dict[str, ToolSpec] = {}
+        self._catalog_cache: Dict[tuple, tuple] = {}
+        self.max_concurrency = max_concurrency
+
+    def tool(
+        self,
+        name: str,
+        description: str,
+        category: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        examples: Optional[List[str]] = None,
+        arg_aliases: Optional[Dict[str, str]] = None
+    ):
+        """
+        Decorator registering a route handler as a tool
+
+        The handler either takes a single Pydantic request model, or plain
+        keyword arguments (path/query params) which are validated through a
+        model built from its signature. arg_aliases maps tool argument names
+        to handler parameter names (e.g. document_id -> doc_id).
+        """
+        def decorator(handler: Callable[..., Awaitable[Any]]):
+            if name in self._tools:
+                raise ValueError(f"Tool already registered: {name}")
+
+            arguments_model, takes_request_model = self._arguments_model(name, handler)
+            self._tools[name] = ToolSpec(
+                name=name,
+                description=description,
+                category=category,
+                parameters=parameters or {},
+                handler=handler,
+                arguments_model=arguments_model,
+                takes_request_model=takes_request_model,
+                arg_aliases=arg_aliases or {},
+                examples=examples
+            )
+            self._catalog_cache.clear()
+            return handler
+
+        return decorator
+
+    @staticmethod
+    def _arguments_model(name: str, handler: Callable) -> tuple:
+        """Pydantic model used to validate the tool's arguments"""
+        params = list(inspect.signature(handler).parameters.values())
+
+        if len(params) == 1 and inspect.isclass(params[0].annotation) and issubclass(params[0].annotation, BaseModel):
+            return params[0].annotation, True
+
+        fields = {}
+        for param in params:
+            annotation = Any if param.annotation is inspect.Parameter.empty else param.annotation
+            default = ... if param.default is inspect.Parameter.empty else param.default
+            fields[param.name] = (annotation, default)
+        return create_model(f"{name}_arguments", **fields), False
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def specs(self) -> List[ToolSpec]:
+        return list(self._tools.values())
+
+    def categories(self) -> List[str]:
+        return sorted({spec.category for spec in self._tools.values()})
+
+    def catalog(self, categories: Optional[List[str]] = None) -> tuple:
+        """
+        Serialized /tools/list payload and its ETag
+
+        Tools are registered at import, so each payload is built once per
+        category filter and then served from memory. Unknown categories are
+        dropped from the filter first, so arbitrary query values can't grow
+        the cache; a filter naming no known category is keyed None.
+        """
+        key: Optional[tuple] = ()
+        if categories:
+            key = tuple(sorted(set(categories) & {spec.category for spec in self._tools.values()})) or None
+        cached = self._catalog_cache.get(key)
+        if cached is None:
+            tools = [
+                spec.descriptor() for spec in self._tools.values()
+                if key == () or (key is not None and spec.category in key)
+            ]
+            body = fast_json.dumps({"tools": tools})
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            cached = self._catalog_cache[key] = (body, etag)
+        return cached
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    async def invoke(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Validate arguments and run a tool, raising ToolInvocationError on failure"""
+        spec = self._tools.get(name)
+        if spec is None:
+            raise ToolInvocationError(404, f"Unknown tool: {name}")
+
+        arguments = dict(arguments or {})
+        for alias, target in spec.arg_aliases.items():
+            if alias in arguments and target not in arguments:
+                arguments[target] = arguments.pop(alias)
+
+        try:
+            validated = spec.arguments_model(**arguments)
+        except ValidationError as e:
+            raise ToolInvocationError(422, e.errors(include_url=False))
+
+        try:
+            if spec.takes_request_model:
+                result = await spec.handler(validated)
+            else:
+                result = await spec.handler(**validated.model_dump())
+        except HTTPException as e:
+            raise ToolInvocationError(e.status_code, e.detail)
+        except Exception as e:
+            logger.error(f"Tool {name} failed: {e}", exc_info=True)
+            raise ToolInvocationError(500, str(e))
+
+        # Routes may return a pre-rendered response (e.g. ORJSONResponse); unwrap it
+        if isinstance(result, Response):
+            if result.status_code >= 400:
+                raise ToolInvocationError(result.status_code, fast_json.loads(result.body))
+            return fast_json.loads(result.body)
+        return result
+
+    async def batch_invoke(self, calls: List[Dict[str, Any]], max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Run several tool calls concurrently
+
+        Each call is {"id": optional, "tool": name, "arguments": {...}}. Results
+        keep the input order and report success or error per call. A
+        requested max_concurrency can only lower the registry's limit.
+        """
+        limit = self.max_concurrency if max_concurrency is None else max(1, min(max_concurrency, self.max_concurrency))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(index: int, call: Dict[str, Any]) -> Dict[str, Any]:
+            call_id = call.get("id") or str(index)
+            tool_name = call.get("tool")
+            async with semaphore:
+                try:
+                    result = await self.invoke(tool_name, call.get("arguments"))
+                    return {"id": call_id, "tool": tool_name, "success": True, "status_code": 200, "result": result}
+                except ToolInvocationError as e:
+                    return {"id": call_id, "tool": tool_name, "success": False, "status_code": e.status_code, "error": e.detail}
+
+        return await asyncio.gather(*(run(i, call) for i, call in enumerate(calls)))
+
+
+# Global instance
+tool_registry = ToolRegistry()
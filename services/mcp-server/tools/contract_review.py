@@ -14,6 +14,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.contract_parser import ContractParser, parse_contract_text
+from utils import fast_json
 from prompts.contract_review_template import (
     CONTRACT_REVIEW_SYSTEM_PROMPT,
     get_contract_review_prompt,
@@ -256,7 +257,7 @@ async def review_contract_tool(
     contract_name: str = "Untitled Contract",
     contract_type: Optional[str] = None,
     llm_client=None
-) -> str:
+) -> Dict[str, Any]:
     """
     Review a contract and provide comprehensive analysis
 
@@ -267,26 +268,24 @@ async def review_contract_tool(
         llm_client: LLM client for AI analysis
 
     Returns:
-        JSON string with review results
+        Dict with review results
     """
     try:
         reviewer = ContractReviewer(llm_client)
-        result = await reviewer.review_contract(
+        return await reviewer.review_contract(
             contract_content, contract_name, contract_type
         )
 
-        return json.dumps(result, indent=2, default=str)
-
     except Exception as e:
         logger.error(f"Contract review error: {str(e)}")
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 async def analyze_clause_tool(
     clause_text: str,
     context: str = "",
     llm_client=None
-) -> str:
+) -> Dict[str, Any]:
     """
     Analyze a specific contract clause
 
@@ -296,11 +295,11 @@ async def analyze_clause_tool(
         llm_client: LLM client
 
     Returns:
-        Analysis of the clause
+        Dict with the analysis of the clause
     """
     try:
         if not llm_client:
-            return json.dumps({"error": "LLM client required for clause analysis"})
+            return {"error": "LLM client required for clause analysis"}
 
         prompt = get_clause_analysis_prompt(clause_text, context)
 
@@ -314,18 +313,23 @@ async def analyze_clause_tool(
             max_tokens=1500
         )
 
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        try:
+            return fast_json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse clause analysis result: {e}")
+            return {"error": "Failed to parse analysis result", "raw_result": content}
 
     except Exception as e:
         logger.error(f"Clause analysis error: {str(e)}")
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 async def compare_contracts_tool(
     contract_a: str,
     contract_b: str,
     llm_client=None
-) -> str:
+) -> Dict[str, Any]:
     """
     Compare two contracts
 
@@ -335,11 +339,11 @@ async def compare_contracts_tool(
         llm_client: LLM client
 
     Returns:
-        Comparison analysis
+        Dict with the comparison analysis
     """
     try:
         if not llm_client:
-            return json.dumps({"error": "LLM client required for comparison"})
+            return {"error": "LLM client required for comparison"}
 
         prompt = get_comparison_prompt(contract_a, contract_b)
 
@@ -353,11 +357,16 @@ async def compare_contracts_tool(
             max_tokens=2000
         )
 
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        try:
+            return fast_json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse comparison result: {e}")
+            return {"error": "Failed to parse comparison result", "raw_result": content}
 
     except Exception as e:
         logger.error(f"Contract comparison error: {str(e)}")
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 # Tool metadata for MCP registration
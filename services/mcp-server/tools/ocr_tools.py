@@ -14,7 +14,6 @@ Available Tools:
 import os
 import logging
 import tempfile
-import json
 from typing import Dict, Any, Optional
 from pathlib import Path
 import base64
@@ -27,7 +26,7 @@ async def ocr_extract_pdf_tool(
     pdf_base64: str = None,
     force_ocr: bool = False,
     use_gpu: bool = False
-) -> str:
+) -> Dict[str, Any]:
     """
     Extract text from PDF file using OCR
 
@@ -41,7 +40,7 @@ async def ocr_extract_pdf_tool(
         use_gpu: Use GPU-based OCR if available (DeepSeek-OCR)
 
     Returns:
-        JSON string with extracted text and metadata
+        Dict with extracted text and metadata
     """
     try:
         from utils.ocr_parser import OCRParser, OCRBackend
@@ -58,15 +57,15 @@ async def ocr_extract_pdf_tool(
         elif pdf_file:
             pdf_path = pdf_file
             if not os.path.exists(pdf_path):
-                return json.dumps({
+                return {
                     "success": False,
                     "error": f"PDF file not found: {pdf_path}"
-                })
+                }
         else:
-            return json.dumps({
+            return {
                 "success": False,
                 "error": "Either pdf_file or pdf_base64 must be provided"
-            })
+            }
 
         try:
             # Initialize OCR parser
@@ -91,7 +90,7 @@ async def ocr_extract_pdf_tool(
             }
 
             logger.info(f"✓ Extracted {len(text)} characters from PDF")
-            return json.dumps(result, ensure_ascii=False, indent=2)
+            return result
 
         finally:
             # Clean up temp file
@@ -100,17 +99,17 @@ async def ocr_extract_pdf_tool(
 
     except Exception as e:
         logger.error(f"OCR PDF extraction failed: {e}")
-        return json.dumps({
+        return {
             "success": False,
             "error": str(e)
-        })
+        }
 
 
 async def ocr_extract_image_tool(
     image_file: str = None,
     image_base64: str = None,
     use_gpu: bool = False
-) -> str:
+) -> Dict[str, Any]:
     """
     Extract text from image file using OCR
 
@@ -120,7 +119,7 @@ async def ocr_extract_image_tool(
         use_gpu: Use GPU-based OCR if available (DeepSeek-OCR)
 
     Returns:
-        JSON string with extracted text and metadata
+        Dict with extracted text and metadata
     """
     try:
         from utils.ocr_parser import OCRParser, OCRBackend
@@ -137,15 +136,15 @@ async def ocr_extract_image_tool(
         elif image_file:
             image_path = image_file
             if not os.path.exists(image_path):
-                return json.dumps({
+                return {
                     "success": False,
                     "error": f"Image file not found: {image_path}"
-                })
+                }
         else:
-            return json.dumps({
+            return {
                 "success": False,
                 "error": "Either image_file or image_base64 must be provided"
-            })
+            }
 
         try:
             # Initialize OCR parser
@@ -169,7 +168,7 @@ async def ocr_extract_image_tool(
             }
 
             logger.info(f"✓ Extracted {len(text)} characters from image")
-            return json.dumps(result, ensure_ascii=False, indent=2)
+            return result
 
         finally:
             # Clean up temp file
@@ -178,18 +177,18 @@ async def ocr_extract_image_tool(
 
     except Exception as e:
         logger.error(f"OCR image extraction failed: {e}")
-        return json.dumps({
+        return {
             "success": False,
             "error": str(e)
-        })
+        }
 
 
-async def ocr_get_status_tool() -> str:
+async def ocr_get_status_tool() -> Dict[str, Any]:
     """
     Get OCR service status and available backends
 
     Returns:
-        JSON string with OCR service information
+        Dict with OCR service information
     """
     try:
         status = {
@@ -244,14 +243,14 @@ async def ocr_get_status_tool() -> str:
             "text_pdfs": "Text-based PDFs are handled automatically without OCR"
         }
 
-        return json.dumps(status, ensure_ascii=False, indent=2)
+        return status
 
     except Exception as e:
         logger.error(f"Failed to get OCR status: {e}")
-        return json.dumps({
+        return {
             "ocr_available": False,
             "error": str(e)
-        })
+        }
 
 
 # Tool definitions for MCP server
@@ -284,7 +283,7 @@ OCR_TOOLS = [
                 "default": False
             }
         },
-        "returns": "JSON with extracted text and metadata",
+        "returns": "Dict with extracted text and metadata",
         "handler": ocr_extract_pdf_tool
     },
     {
@@ -309,7 +308,7 @@ OCR_TOOLS = [
                 "default": False
             }
         },
-        "returns": "JSON with extracted text and metadata",
+        "returns": "Dict with extracted text and metadata",
         "handler": ocr_extract_image_tool
     },
     {
@@ -317,7 +316,7 @@ OCR_TOOLS = [
         "description": "Get OCR service status, available backends, and recommendations",
         "category": "system",
         "parameters": {},
-        "returns": "JSON with OCR service information",
+        "returns": "Dict with OCR service information",
         "handler": ocr_get_status_tool
     }
 ]
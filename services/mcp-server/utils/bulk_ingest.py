@@ -0,0 +1,397 @@
+"""
+Bulk document ingestion pipeline
+extract → store → index as bounded concurrent stages connected by queues.
+Extraction (PDF/DOCX parsing) runs in a process pool, documents are written
+to Postgres in batches with one COPY, and indexing runs several
+process_document calls at once so their chunks share embedding micro-batches
+and batched, non-blocking Qdrant upserts. A status event is produced for
+every document as soon as it is indexed or fails. Stored rows carry an
+index_job_id and index_status like single uploads, so
+GET /rag/documents/{id}/status reports them too.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Type
+
+from fastapi.responses import StreamingResponse
+from prometheus_client import Counter
+
+from utils import fast_json
+from utils.ingest_queue import new_job_id
+
+logger = logging.getLogger(__name__)
+
+BULK_DOCUMENTS = Counter(
+    "mcp_bulk_documents_total", "Documents processed by bulk ingestion",
+    ["status"]
+)
+
+_DONE = object()
+
+# Failed events for documents whose upserts may or may not have been applied:
+# the flush barrier failed, or the upload stopped before they were settled
+UNCONFIRMED_STAGES = ("flush", "cancelled")
+
+# Reports for documents left unsettled by a cancelled run outlive the run
+_background_reports: Set[asyncio.Task] = set()
+
+
+@dataclass
+class BulkItem:
+    index: int
+    title: str
+    filename: Optional[str] = None
+    data: Optional[bytes] = None  # raw file, extracted in the process pool
+    path: Optional[str] = None  # spooled upload on disk; deleted once extracted
+    content: Optional[str] = None  # text supplied directly (NDJSON)
+    category: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    document_type: Optional[str] = None
+    doc_id: Optional[int] = None
+    job_id: Optional[str] = None
+    error: Optional[str] = None  # set when the input itself was invalid
+
+
+async def ndjson_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[BulkItem]:
+    """
+    Documents from an NDJSON byte stream, one JSON object per line
+
+    Each line needs title and content; category, tags and metadata are
+    optional. Invalid lines become items with error set.
+    """
+    buffer = b""
+    index = 0
+
+    def parse(line: bytes) -> BulkItem:
+        try:
+            doc = fast_json.loads(line)
+            return BulkItem(
+                index=index,
+                title=str(doc["title"]),
+                content=str(doc["content"]),
+                category=doc.get("category"),
+                tags=list(doc.get("tags") or []),
+                metadata=dict(doc.get("metadata") or {})
+            )
+        except Exception as e:
+            return BulkItem(index=index, title="", error=f"Invalid NDJSON line: {e!r}")
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield parse(line)
+                index += 1
+    if buffer.strip():
+        yield parse(buffer)
+
+
+async def insert_documents(conn, items: List[BulkItem]) -> List[int]:
+    """
+    Reserve ids from the documents sequence, then write all rows with one COPY
+
+    Rows start out as 'embedding' under a fresh job id (set on each item);
+    the pipeline's report hook marks them indexed or failed.
+    """
+    ids = [
+        row["id"] for row in await conn.fetch(
+            "SELECT nextval(pg_get_serial_sequence('documents', 'id')) AS id FROM generate_series(1, $1)",
+            len(items)
+        )
+    ]
+    for item in items:
+        item.job_id = new_job_id()
+    await conn.copy_records_to_table(
+        "documents",
+        columns=["id", "title", "content", "category", "tags", "document_type", "metadata",
+                 "index_status", "index_job_id"],
+        records=[
+            (doc_id, item.title, item.content, item.category, item.tags, item.document_type,
+             fast_json.dumps_str(item.metadata), "embedding", uuid.UUID(item.job_id))
+            for doc_id, item in zip(ids, items)
+        ]
+    )
+    return ids
+
+
+def _remove_spool(item: BulkItem) -> None:
+    if item.path:
+        try:
+            os.unlink(item.path)
+        except FileNotFoundError:
+            pass
+        item.path = None
+
+
+class BulkIngestPipeline:
+    """
+    Bounded extract → store → index pipeline
+
+    extract(path or data, filename) -> text runs on extract_executor (a
+    process pool); store(items) -> ids writes a batch of up to store_batch_size
+    documents; index(item) -> chunk count embeds and upserts one document,
+    with up to index_concurrency in flight; flush() runs once at the end.
+    report(event) is awaited once with the final event of every stored
+    document, e.g. to record its index_status; its errors are only logged.
+    Indexed events are streamed right away but only reported once flush()
+    has confirmed the upserts. If the flush fails or the run is cancelled
+    (client gone, input broke off) the remaining documents are reported as
+    failed with a stage in UNCONFIRMED_STAGES, so the caller can re-queue them.
+    Queues hold at most queue_size documents, so a fast producer waits for
+    the embedding stage instead of buffering the whole upload.
+
+    index raising one of busy_errors (e.g. EmbeddingQueueFull when the
+    embedding admission limit is reached) is backpressure, not a failure:
+    the document is retried with exponential backoff for up to busy_max_wait
+    seconds before it is reported failed.
+    """
+
+    def __init__(
+        self,
+        extract: Callable[[bytes, str], str],
+        store: Callable[[List[BulkItem]], Awaitable[List[int]]],
+        index: Callable[[BulkItem], Awaitable[int]],
+        flush: Optional[Callable[[], Awaitable[None]]] = None,
+        report: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        extract_executor: Optional[Executor] = None,
+        extract_concurrency: int = 4,
+        store_batch_size: int = 64,
+        index_concurrency: int = 8,
+        queue_size: int = 64,
+        busy_errors: Tuple[Type[BaseException], ...] = (),
+        busy_retry_delay: float = 0.5,
+        busy_max_wait: float = 300.0
+    ):
+        self.extract = extract
+        self.store = store
+        self.index = index
+        self.flush = flush
+        self.report = report
+        self.extract_executor = extract_executor
+        self.extract_concurrency = extract_concurrency
+        self.store_batch_size = store_batch_size
+        self.index_concurrency = index_concurrency
+        self.queue_size = queue_size
+        self.busy_errors = busy_errors
+        self.busy_retry_delay = busy_retry_delay
+        self.busy_max_wait = busy_max_wait
+
+    @classmethod
+    def _failed(cls, item: BulkItem, stage: str, error: str) -> Dict[str, Any]:
+        BULK_DOCUMENTS.labels("failed").inc()
+        return cls._unconfirmed(item, stage, error)
+
+    @staticmethod
+    def _unconfirmed(item: BulkItem, stage: str, error: str) -> Dict[str, Any]:
+        """Failed event without counting it (already counted as indexed, or settled elsewhere)"""
+        return {
+            "index": item.index, "title": item.title, "doc_id": item.doc_id, "job_id": item.job_id,
+            "status": "failed", "stage": stage, "error": error
+        }
+
+    async def _report_all(self, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            await self._report(event)
+
+    async def _report(self, event: Dict[str, Any]) -> None:
+        if self.report is None:
+            return
+        try:
+            await self.report(event)
+        except Exception as e:
+            logger.warning(f"Bulk ingest status report failed for document {event['doc_id']}: {e}")
+
+    async def _index_with_backoff(self, item: BulkItem) -> int:
+        deadline = time.monotonic() + self.busy_max_wait
+        delay = self.busy_retry_delay
+        while True:
+            try:
+                return await self.index(item)
+            except self.busy_errors:
+                if time.monotonic() + delay > deadline:
+                    raise
+                logger.debug(f"Indexing of {item.title!r} deferred {delay:.1f}s: embedding queue full")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    async def run(self, items: AsyncIterator[BulkItem]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one status event per document, then a summary event"""
+        started = time.perf_counter()
+        extract_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        store_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        index_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        events: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        extractors_left = self.extract_concurrency
+        # Stored documents whose final outcome hasn't been reported yet
+        unsettled: Dict[int, BulkItem] = {}
+        awaiting_flush: List[Dict[str, Any]] = []
+
+        async def feed():
+            try:
+                async for item in items:
+                    if item.error:
+                        await events.put(self._failed(item, "parse", item.error))
+                    else:
+                        await extract_q.put(item)
+            finally:
+                for _ in range(self.extract_concurrency):
+                    await extract_q.put(_DONE)
+
+        async def extract():
+            nonlocal extractors_left
+            while (item := await extract_q.get()) is not _DONE:
+                try:
+                    if item.content is None:
+                        item.content = await loop.run_in_executor(
+                            self.extract_executor, self.extract, item.path or item.data, item.filename or item.title
+                        )
+                        item.data = None
+                except Exception as e:
+                    await events.put(self._failed(item, "extract", str(e)))
+                    continue
+                finally:
+                    _remove_spool(item)
+                if not item.content or not item.content.strip():
+                    await events.put(self._failed(item, "extract", "No text content extracted"))
+                    continue
+                await store_q.put(item)
+
+            extractors_left -= 1
+            if extractors_left == 0:
+                await store_q.put(_DONE)
+
+        async def store():
+            finished = False
+            while not finished:
+                batch = []
+                item = await store_q.get()
+                while item is not _DONE:
+                    batch.append(item)
+                    if len(batch) >= self.store_batch_size or store_q.empty():
+                        break
+                    item = store_q.get_nowait()
+                finished = item is _DONE
+                if not batch:
+                    continue
+                try:
+                    ids = await self.store(batch)
+                except Exception as e:
+                    logger.error(f"Bulk ingest store failed for {len(batch)} documents: {e}")
+                    for failed in batch:
+                        await events.put(self._failed(failed, "store", str(e)))
+                    continue
+                for doc_id, stored in zip(ids, batch):
+                    stored.doc_id = doc_id
+                    unsettled[doc_id] = stored
+                    await index_q.put(stored)
+            await index_q.put(_DONE)
+
+        async def index_one(item: BulkItem, slots: asyncio.Semaphore):
+            try:
+                chunks = await self._index_with_backoff(item)
+                BULK_DOCUMENTS.labels("indexed").inc()
+                event = {
+                    "index": item.index, "title": item.title, "doc_id": item.doc_id, "job_id": item.job_id,
+                    "status": "indexed", "chunks": chunks
+                }
+            except Exception as e:
+                event = self._failed(item, "index", str(e))
+            try:
+                if event["status"] == "indexed":
+                    awaiting_flush.append(event)
+                else:
+                    await self._report(event)
+                    unsettled.pop(item.doc_id, None)
+                await events.put(event)
+            finally:
+                slots.release()
+
+        async def index():
+            slots = asyncio.Semaphore(self.index_concurrency)
+            running = set()
+            while (item := await index_q.get()) is not _DONE:
+                await slots.acquire()
+                task = asyncio.create_task(index_one(item, slots))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            if running:
+                await asyncio.gather(*running)
+            flush_error = None
+            if self.flush is not None:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    flush_error = str(e)
+            for event in awaiting_flush:
+                if flush_error is not None:
+                    event = self._unconfirmed(unsettled[event["doc_id"]], "flush", flush_error)
+                await self._report(event)
+                unsettled.pop(event["doc_id"], None)
+            await events.put((_DONE, flush_error))
+
+        stages = [asyncio.create_task(feed()), asyncio.create_task(store()), asyncio.create_task(index())]
+        stages += [asyncio.create_task(extract()) for _ in range(self.extract_concurrency)]
+
+        counts = {"indexed": 0, "failed": 0, "chunks": 0}
+        try:
+            while True:
+                event = await events.get()
+                if isinstance(event, tuple) and event[0] is _DONE:
+                    flush_error = event[1]
+                    break
+                counts[event["status"]] += 1
+                counts["chunks"] += event.get("chunks", 0)
+                yield event
+
+            summary = {"status": "done", **counts, "seconds": round(time.perf_counter() - started, 3)}
+            if flush_error:
+                summary["flush_error"] = flush_error
+                summary["unconfirmed"] = len(awaiting_flush)
+            # e.g. the request body stream broke off: report what made it through
+            input_error = stages[0].exception() if stages[0].done() and not stages[0].cancelled() else None
+            if input_error is not None:
+                summary["error"] = f"Input stream failed: {input_error}"
+            yield summary
+        finally:
+            for stage in stages:
+                stage.cancel()
+            if unsettled and self.report is not None:
+                leftovers = [
+                    self._unconfirmed(item, "cancelled", "Bulk upload stopped before the document was indexed")
+                    for item in unsettled.values()
+                ]
+                unsettled.clear()
+                # Not awaited here: the generator may be closing because its consumer went away
+                task = asyncio.create_task(self._report_all(leftovers))
+                _background_reports.add(task)
+                task.add_done_callback(_background_reports.discard)
+            # Spooled files of documents that never reached extraction
+            while not extract_q.empty():
+                leftover = extract_q.get_nowait()
+                if leftover is not _DONE:
+                    _remove_spool(leftover)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that can stream while the request body is still being read
+
+    Starlette's StreamingResponse listens for client disconnects by calling
+    receive(), which steals the request body messages an NDJSON upload is
+    still consuming and stalls it. This variant only streams; ingestion
+    carries on if the client goes away.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
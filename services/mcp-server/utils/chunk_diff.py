@@ -0,0 +1,75 @@
+"""
+Chunk identity and diffing for incremental re-indexing
+Point ids are derived from (doc_id, chunk content hash, occurrence), so an
+unchanged chunk keeps its id across edits and only changed chunks need new
+embeddings.
+"""
+
+import hashlib
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+# Fixed namespace so point ids are stable across processes and restarts
+POINT_NAMESPACE = uuid.UUID("6f1c8a52-3d7e-4b0a-9a44-2f5d7c1e8b90")
+
+# Payload fields that can change without the chunk text changing
+MUTABLE_PAYLOAD_FIELDS = ("chunk_id", "title", "metadata")
+
+
+@dataclass
+class ChunkRecord:
+    point_id: str
+    chunk_hash: str
+    chunk_id: int
+    content: str
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def chunk_records(doc_id: int, chunks: List[str]) -> List[ChunkRecord]:
+    """Stable point ids; repeated identical chunks in one document get distinct ids"""
+    seen: Counter = Counter()
+    records = []
+    for idx, chunk in enumerate(chunks):
+        digest = chunk_hash(chunk)
+        occurrence = seen[digest]
+        seen[digest] += 1
+        point_id = str(uuid.uuid5(POINT_NAMESPACE, f"{doc_id}:{digest}:{occurrence}"))
+        records.append(ChunkRecord(point_id, digest, idx, chunk))
+    return records
+
+
+def diff_chunks(
+    records: List[ChunkRecord],
+    existing: Dict[str, Dict[str, Any]],
+    payload_fields: Dict[str, Any]
+) -> Tuple[List[ChunkRecord], List[str], List[Tuple[str, Dict[str, Any]]]]:
+    """
+    Compare desired chunks with the points already stored for a document
+
+    Returns (records to embed and upsert, point ids to delete, (point id,
+    payload patch) for kept chunks whose position, title or metadata moved).
+    Points without a chunk_hash (indexed before hashes existed) count as
+    removed, so legacy documents are rebuilt once on their first update.
+    """
+    to_embed, to_patch = [], []
+    wanted = set()
+
+    for record in records:
+        wanted.add(record.point_id)
+        stored = existing.get(record.point_id)
+        if stored is None or stored.get("chunk_hash") != record.chunk_hash:
+            to_embed.append(record)
+            continue
+
+        desired = {"chunk_id": record.chunk_id, **payload_fields}
+        patch = {field: desired[field] for field in MUTABLE_PAYLOAD_FIELDS if stored.get(field) != desired[field]}
+        if patch:
+            to_patch.append((record.point_id, patch))
+
+    to_delete = [point_id for point_id in existing if point_id not in wanted]
+    return to_embed, to_delete, to_patch
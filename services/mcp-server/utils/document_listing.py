@@ -0,0 +1,210 @@
+"""
+Document listing with keyset pagination
+Pages are ordered by (created_at, id) descending, undated rows last, and
+continue from an opaque cursor holding the last row's key, so each page is an index range scan of
+limit + 1 rows no matter how deep the client has paged (OFFSET had to walk
+and discard every earlier row). search filters through the same to_tsvector
+and pg_trgm GIN indexes as fulltext_search instead of ILIKE scans, and the
+total count can be exact, a planner estimate, or skipped.
+"""
+
+import base64
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import fast_json
+from utils.fulltext_search import contains_cjk, escape_like
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ("exact", "estimated", "none")
+
+# Estimates below this are replaced by an exact count, which is cheap at that size
+# and avoids showing reltuples = -1/0 for tables that were never analyzed
+COUNT_EXACT_BELOW = int(os.getenv("DOCUMENT_COUNT_EXACT_BELOW", "1000"))
+
+# created_at is nullable: NULL never compares in the keyset predicate, so the
+# key maps it to the epoch (sorting undated rows last, ties broken by id)
+SORT_KEY = "COALESCE(created_at, to_timestamp(0))"
+
+# CONCURRENTLY: no write lock on documents while building (asyncpg runs each statement outside a transaction)
+LISTING_INDEX_DDL = [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_listing_key ON documents(({SORT_KEY}) DESC, id DESC)",
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_category_listing_key ON documents(category, ({SORT_KEY}) DESC, id DESC)",
+    # Superseded by the two above
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_documents_created_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_documents_category_created_id",
+]
+
+LIST_COLUMNS = f"id, title, category, tags, created_at, updated_at, {SORT_KEY} AS sort_key"
+
+
+async def ensure_listing_indexes(conn) -> None:
+    """Create the (sort key, id) keyset indexes if missing"""
+    for statement in LISTING_INDEX_DDL:
+        try:
+            await conn.execute(statement)
+        except Exception as e:
+            # e.g. lock timeout, or another replica building the same index; listing still works, just slower
+            logger.warning(f"Could not apply listing index DDL ({statement}): {e}")
+
+
+def encode_cursor(created_at: datetime, doc_id: int) -> str:
+    """Opaque cursor for the row after which the next page starts"""
+    raw = fast_json.dumps([created_at.isoformat(), doc_id])
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, doc_id = fast_json.loads(raw)
+        return datetime.fromisoformat(created_at), int(doc_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _where_clause(category: Optional[str], search: Optional[str], args: List[Any]) -> str:
+    """
+    Filters shared by the page and count queries
+
+    English search terms use the to_tsvector('english') index expressions
+    verbatim; CJK terms, which the english parser can't split, require each
+    whitespace-separated term as a substring, served by the trigram indexes.
+    """
+    clauses = []
+    if category:
+        args.append(category)
+        clauses.append(f"category = ${len(args)}")
+
+    search = (search or "").strip()
+    if search and not contains_cjk(search):
+        args.append(search)
+        idx = len(args)
+        clauses.append(
+            f"(to_tsvector('english', title) @@ websearch_to_tsquery('english', ${idx})"
+            f" OR to_tsvector('english', content) @@ websearch_to_tsquery('english', ${idx}))"
+        )
+    elif search:
+        for term in search.split():
+            args.append(f"%{escape_like(term)}%")
+            idx = len(args)
+            clauses.append(f"(title ILIKE ${idx} OR content ILIKE ${idx})")
+
+    return " AND ".join(clauses) or "TRUE"
+
+
+def build_page_query(
+    limit: int,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Tuple[str, List[Any]]:
+    """
+    One page ordered by (SORT_KEY, id) descending
+
+    Selects limit + 1 rows; the extra row only tells whether a next page
+    exists. The row-value comparison matches the index order, so the scan
+    starts right after the cursor.
+    """
+    args: List[Any] = []
+    where = _where_clause(category, search, args)
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        args.extend([created_at, doc_id])
+        where += f" AND ({SORT_KEY}, id) < (${len(args) - 1}, ${len(args)})"
+    args.append(limit + 1)
+
+    sql = f"""
+SELECT {LIST_COLUMNS}
+FROM documents
+WHERE {where}
+ORDER BY {SORT_KEY} DESC, id DESC
+LIMIT ${len(args)}
+"""
+    return sql, args
+
+
+def build_count_query(category: Optional[str] = None, search: Optional[str] = None) -> Tuple[str, List[Any]]:
+    args: List[Any] = []
+    return f"SELECT COUNT(*) FROM documents WHERE {_where_clause(category, search, args)}", args
+
+
+async def estimate_count(conn, category: Optional[str] = None, search: Optional[str] = None) -> int:
+    """
+    Row count without scanning: pg_class.reltuples for the whole table, the
+    planner's row estimate for filtered listings
+    """
+    if not category and not (search or "").strip():
+        estimate = await conn.fetchval(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = 'documents'::regclass"
+        )
+        return max(int(estimate or 0), 0)
+
+    sql, args = build_count_query(category, search)
+    plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *args)
+    if isinstance(plan, str):
+        plan = fast_json.loads(plan)
+    # COUNT(*) aggregates to one row; the estimate we want is its input's
+    node = plan[0]["Plan"]
+    while node.get("Plans") and node.get("Node Type") == "Aggregate":
+        node = node["Plans"][0]
+    return int(node.get("Plan Rows", 0))
+
+
+async def count_documents(
+    conn,
+    mode: str,
+    category: Optional[str] = None,
+    search: Optional[str] = None
+) -> Optional[int]:
+    """Total matching documents for the given count mode (None for 'none')"""
+    if mode == "none":
+        return None
+    if mode == "estimated":
+        estimate = await estimate_count(conn, category, search)
+        if estimate >= COUNT_EXACT_BELOW:
+            return estimate
+    sql, args = build_count_query(category, search)
+    return await conn.fetchval(sql, *args)
+
+
+async def list_documents_page(
+    conn,
+    limit: int,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: str = "estimated"
+) -> Dict[str, Any]:
+    """One page of documents plus the cursor for the next page"""
+    if count not in COUNT_MODES:
+        raise ValueError(f"count must be one of {', '.join(COUNT_MODES)}")
+
+    sql, args = build_page_query(limit, category, search, cursor)
+    rows = await conn.fetch(sql, *args)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = encode_cursor(rows[-1]["sort_key"], rows[-1]["id"]) if has_more else None
+
+    return {
+        "documents": [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "category": row["category"],
+                "tags": row["tags"],
+                "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None
+            }
+            for row in rows
+        ],
+        "total": await count_documents(conn, count, category, search),
+        "count": count,
+        "limit": limit,
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,173 @@
+"""
+Embedding model backends
+PyTorch (SentenceTransformer), ONNX Runtime and int8-quantized ONNX Runtime
+implementations of the same sentence-transformers model. All of them return
+L2-normalized, mean-pooled vectors of the model's native dimension, so they
+are interchangeable behind RAGService and the Qdrant collection.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# all-MiniLM-L6-v2 truncates at 256 word pieces in sentence-transformers
+DEFAULT_MAX_SEQ_LENGTH = 256
+
+# Where int8 models are written; the hub cache snapshot may be read-only in the container
+DEFAULT_ONNX_CACHE_DIR = os.path.join(tempfile.gettempdir(), "embedding-onnx")
+
+
+def hub_repo_id(model_name: str) -> str:
+    """Short sentence-transformers names live under the sentence-transformers org"""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def mean_pool_normalize(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Masked mean over tokens followed by L2 normalization (sentence-transformers Pooling + Normalize)"""
+    mask = attention_mask[..., None].astype(token_embeddings.dtype)
+    summed = (token_embeddings * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return pooled / np.clip(norms, 1e-12, None)
+
+
+class TorchBackend:
+    """SentenceTransformer on PyTorch (the reference implementation)"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.max_seq_length = self.model.max_seq_length
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+
+    def token_offsets(self, text: str) -> List[Tuple[int, int]]:
+        """Character spans of the model's tokens over the whole text (no truncation)"""
+        return self.model.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+        )["offset_mapping"]
+
+
+class OnnxBackend:
+    """
+    The same model exported to ONNX and run with ONNX Runtime on CPU
+
+    Uses the ONNX export published in the model's hub repo (onnx/model.onnx)
+    unless model_path points at a local file. With quantize=True the model is
+    dynamically quantized to int8 weights once and cached in cache_dir; int8 matmuls are usually 1.5-3x faster on CPU at a small cosine cost
+    (see benchmarks/bench_embedding_backends.py).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        model_path: Optional[str] = None,
+        threads: Optional[int] = None,
+        max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH,
+        cache_dir: str = DEFAULT_ONNX_CACHE_DIR
+    ):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        repo_id = hub_repo_id(model_name)
+        path = model_path or hf_hub_download(repo_id, "onnx/model.onnx")
+        if quantize:
+            path = quantized_model_path(path, cache_dir)
+
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.max_seq_length = max_seq_length
+        tokenizer_path = hf_hub_download(repo_id, "tokenizer.json")
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.offsets_tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+        logger.info(f"ONNX embedding model loaded from {path}")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        return mean_pool_normalize(token_embeddings, attention_mask).astype(np.float32)
+
+    def token_offsets(self, text: str) -> List[Tuple[int, int]]:
+        """Character spans of the model's tokens over the whole text (no truncation)"""
+        return self.offsets_tokenizer.encode(text, add_special_tokens=False).offsets
+
+
+def quantized_model_path(source: str, cache_dir: str = DEFAULT_ONNX_CACHE_DIR) -> Path:
+    """
+    Dynamic int8 quantization of an ONNX model, written once to cache_dir
+
+    The file name carries a hash of the source path, so a new hub snapshot
+    gets its own file. Workers quantizing concurrently each write a temp
+    file and rename it into place.
+    """
+    source = Path(source).resolve()
+    digest = hashlib.sha256(str(source).encode("utf-8")).hexdigest()[:12]
+    target = Path(cache_dir) / f"{source.stem}.{digest}.int8{source.suffix}"
+    if not target.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=source.suffix)
+        os.close(fd)
+        try:
+            logger.info(f"Quantizing {source} to int8 at {target}")
+            quantize_dynamic(str(source), tmp, weight_type=QuantType.QInt8)
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return target
+
+
+def load_embedding_backend(backend: str, model_name: str, threads: Optional[int] = None):
+    """Load the configured backend; every backend exposes name, dimension, max_seq_length, encode() and token_offsets()"""
+    if backend == "torch":
+        return TorchBackend(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxBackend(
+            model_name,
+            quantize=backend == "onnx-int8",
+            model_path=os.getenv("EMBEDDING_ONNX_PATH") or None,
+            threads=threads,
+            max_seq_length=int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", str(DEFAULT_MAX_SEQ_LENGTH))),
+            cache_dir=os.getenv("EMBEDDING_ONNX_CACHE_DIR", DEFAULT_ONNX_CACHE_DIR)
+        )
+    raise ValueError(f"Unknown embedding backend: {backend} (expected one of {EMBEDDING_BACKENDS})")
@@ -0,0 +1,36 @@
+"""
+Batching helpers for embedding generation
+Groups texts of similar length so each forward pass pads as little as possible.
+"""
+
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def length_sorted_batches(texts: Sequence[str], batch_size: int) -> List[List[int]]:
+    """
+    Split text indices into batches of at most batch_size, longest first
+
+    Sorting by length keeps texts of similar length together, so padding to
+    the longest item in a batch wastes little compute. Longest-first means
+    a too-large batch fails on the first pass instead of the last.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def encode_in_batches(
+    texts: Sequence[str],
+    encode_batch: Callable[[List[str]], Sequence[T]],
+    batch_size: int
+) -> List[T]:
+    """Run encode_batch over length-sorted batches and return results in input order"""
+    results: List[T] = [None] * len(texts)
+    for indices in length_sorted_batches(texts, batch_size):
+        encoded = encode_batch([texts[i] for i in indices])
+        for i, vector in zip(indices, encoded):
+            results[i] = vector
+    return results
@@ -0,0 +1,132 @@
+"""
+Content-hash embedding cache
+Keys are (model name, hash of normalized text); vectors are stored as float16
+bytes in an in-process LRU in front of Redis.
+"""
+
+import hashlib
+import logging
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_REQUESTS = Counter(
+    "mcp_embedding_cache_requests_total", "Embedding cache lookups by tier and result",
+    ["tier", "result"]
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC (full-width -> half-width) and collapsed whitespace; case is kept for cased models"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def encode_vector(vector: Sequence[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float16).tobytes()
+
+
+def decode_vector(data: bytes) -> List[float]:
+    return np.frombuffer(data, dtype=np.float16).astype(np.float32).tolist()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache
+
+    The LRU holds float16 bytes (768 bytes for a 384-dim vector) so tens of
+    thousands of entries stay small. Redis is shared across workers and
+    optional: if it is unset or failing, lookups fall back to the LRU only.
+    The Redis client must not decode responses.
+    """
+
+    def __init__(self, model_name: str, max_items: int = 10000, ttl_seconds: int = 7 * 24 * 3600, redis_client=None):
+        self.model_name = model_name
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self._lru: "OrderedDict[str, bytes]" = OrderedDict()
+        self._counts: Dict[str, int] = {"memory_hit": 0, "redis_hit": 0, "miss": 0}
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"emb:{self.model_name}:{digest}"
+
+    def _remember(self, key: str, data: bytes) -> None:
+        self._lru[key] = data
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    async def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors in input order, None where missing"""
+        keys = [self.key(text) for text in texts]
+        found: Dict[str, bytes] = {}
+
+        for key in keys:
+            data = self._lru.get(key)
+            if data is not None:
+                self._lru.move_to_end(key)
+                found[key] = data
+
+        # Counted per input text (repeated texts included) so hits + misses == len(keys) per tier
+        memory_hits = sum(k in found for k in keys)
+        remote_keys = list(dict.fromkeys(k for k in keys if k not in found))
+        if remote_keys and self.redis is not None:
+            try:
+                values = await self.redis.mget(remote_keys)
+            except Exception as e:
+                logger.warning(f"Embedding cache Redis lookup failed: {e}")
+                values = [None] * len(remote_keys)
+            for key, data in zip(remote_keys, values):
+                if data is not None:
+                    found[key] = data
+                    self._remember(key, data)
+
+        hits = sum(k in found for k in keys)
+        redis_hits = hits - memory_hits
+        misses = len(keys) - hits
+        EMBEDDING_CACHE_REQUESTS.labels("memory", "hit").inc(memory_hits)
+        EMBEDDING_CACHE_REQUESTS.labels("memory", "miss").inc(len(keys) - memory_hits)
+        if self.redis is not None:
+            EMBEDDING_CACHE_REQUESTS.labels("redis", "hit").inc(redis_hits)
+            EMBEDDING_CACHE_REQUESTS.labels("redis", "miss").inc(misses)
+        self._counts["memory_hit"] += memory_hits
+        self._counts["redis_hit"] += redis_hits
+        self._counts["miss"] += misses
+
+        return [decode_vector(found[k]) if k in found else None for k in keys]
+
+    async def set_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store freshly computed vectors in both tiers"""
+        entries = {self.key(text): encode_vector(vector) for text, vector in zip(texts, vectors)}
+        for key, data in entries.items():
+            self._remember(key, data)
+
+        if entries and self.redis is not None:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key, data in entries.items():
+                        pipe.setex(key, self.ttl_seconds, data)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """Lookup counts and hit ratios since startup"""
+        total = sum(self._counts.values())
+        hits = self._counts["memory_hit"] + self._counts["redis_hit"]
+        return {
+            "lookups": total,
+            "memory_items": len(self._lru),
+            "memory_hit_ratio": round(self._counts["memory_hit"] / total, 4) if total else 0.0,
+            "redis_hit_ratio": round(self._counts["redis_hit"] / total, 4) if total else 0.0,
+            "hit_ratio": round(hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,162 @@
+"""
+Dedicated worker pool for embedding inference
+Keeps SentenceTransformer forward passes off the FastAPI event loop and off
+the default executor, with bounded queue depth and Prometheus metrics.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_QUEUE_DEPTH = Gauge(
+    "mcp_embedding_queue_depth", "Embedding jobs waiting for a worker"
+)
+EMBEDDING_RUNNING = Gauge(
+    "mcp_embedding_running", "Embedding jobs currently running"
+)
+EMBEDDING_QUEUE_WAIT = Histogram(
+    "mcp_embedding_queue_wait_seconds", "Time an embedding job waited before a worker picked it up",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+EMBEDDING_RUN_TIME = Histogram(
+    "mcp_embedding_run_seconds", "Time spent encoding one embedding job",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+EMBEDDING_TEXTS = Counter(
+    "mcp_embedding_texts_total", "Texts embedded"
+)
+EMBEDDING_REJECTED = Counter(
+    "mcp_embedding_rejected_total", "Embedding jobs rejected because the queue stayed full"
+)
+
+
+class EmbeddingQueueFull(HTTPException):
+    """Embedding queue stayed full for the whole admission timeout"""
+
+    def __init__(self, retry_after: int = 5):
+        super().__init__(
+            status_code=503,
+            detail="Embedding queue is full, retry later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def default_torch_threads(workers: int) -> int:
+    """Split the cores between workers, leaving one for the event loop"""
+    return max(1, ((os.cpu_count() or 2) - 1) // max(1, workers))
+
+
+def configure_torch_threads(num_threads: int) -> None:
+    """Set torch intra-op threads (process-wide) if torch is installed"""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(num_threads)
+    logger.info(f"torch intra-op threads set to {num_threads}")
+
+
+class EmbeddingExecutor:
+    """
+    Thread pool reserved for embedding jobs
+
+    Threads rather than processes: the model is loaded once and shared, and
+    torch releases the GIL inside forward passes. At most workers +
+    max_queue_depth jobs are admitted; further callers wait asynchronously
+    and get EmbeddingQueueFull (HTTP 503) after queue_timeout seconds.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queue_depth: int = 16,
+        torch_threads: Optional[int] = None,
+        queue_timeout: float = 30.0
+    ):
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.torch_threads = torch_threads or default_torch_threads(workers)
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(workers + max_queue_depth)
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingExecutor":
+        torch_threads = os.getenv("EMBEDDING_TORCH_THREADS")
+        return cls(
+            workers=int(os.getenv("EMBEDDING_WORKERS", "1")),
+            max_queue_depth=int(os.getenv("EMBEDDING_MAX_QUEUE_DEPTH", "16")),
+            torch_threads=int(torch_threads) if torch_threads else None,
+            queue_timeout=float(os.getenv("EMBEDDING_QUEUE_TIMEOUT", "30"))
+        )
+
+    def start(self) -> None:
+        if self._executor is None:
+            configure_torch_threads(self.torch_threads)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embedding")
+            logger.info(
+                f"Embedding executor started: {self.workers} workers, "
+                f"queue depth {self.max_queue_depth}, {self.torch_threads} torch threads"
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _run_job(self, fn: Callable[..., Any], submitted: float, size: int) -> Any:
+        started = time.perf_counter()
+        EMBEDDING_QUEUE_DEPTH.dec()
+        EMBEDDING_RUNNING.inc()
+        EMBEDDING_QUEUE_WAIT.observe(started - submitted)
+        try:
+            return fn()
+        finally:
+            EMBEDDING_RUNNING.dec()
+            EMBEDDING_RUN_TIME.observe(time.perf_counter() - started)
+            EMBEDDING_TEXTS.inc(size)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, size: int = 1, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) on an embedding worker; size is the number of texts"""
+        self.start()
+        submitted = time.perf_counter()
+        EMBEDDING_QUEUE_DEPTH.inc()
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            EMBEDDING_QUEUE_DEPTH.dec()
+            EMBEDDING_REJECTED.inc()
+            raise EmbeddingQueueFull()
+        except asyncio.CancelledError:
+            EMBEDDING_QUEUE_DEPTH.dec()
+            raise
+
+        loop = asyncio.get_running_loop()
+
+        def on_done(future) -> None:
+            if future.cancelled():
+                EMBEDDING_QUEUE_DEPTH.dec()
+            # Free the slot only when the worker is really done, even if the caller was cancelled
+            try:
+                loop.call_soon_threadsafe(self._slots.release)
+            except RuntimeError:
+                pass  # loop already closed during shutdown
+
+        try:
+            future = self._executor.submit(self._run_job, partial(fn, *args, **kwargs), submitted, size)
+        except Exception:
+            EMBEDDING_QUEUE_DEPTH.dec()
+            self._slots.release()
+            raise
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
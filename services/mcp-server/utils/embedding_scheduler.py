@@ -0,0 +1,103 @@
+"""
+Dynamic micro-batching for embedding requests
+Texts submitted by concurrent callers within a short window are encoded in
+one forward pass and the vectors are fanned back to each caller.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCH_TEXTS = Histogram(
+    "mcp_embedding_batch_size", "Texts per micro-batched forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+EMBEDDING_BATCH_CALLERS = Histogram(
+    "mcp_embedding_batch_callers", "Distinct callers sharing one micro-batch",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 32)
+)
+
+
+class MicroBatcher:
+    """
+    Collects texts until max_batch_size are pending or max_wait_ms has passed
+    since the first one arrived, then runs encode_batch on them
+
+    Large submissions (document ingest) fill whole batches and flush at once;
+    single query embeddings wait at most max_wait_ms for company. Batches are
+    dispatched without waiting for the previous one, so concurrency is
+    bounded by whatever encode_batch runs on (the embedding executor).
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], Awaitable[List[Any]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 3.0
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[str, asyncio.Future, int]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._submissions = 0
+
+    async def submit(self, texts: List[str]) -> List[Any]:
+        """Queue texts for encoding and wait for their vectors (in input order)"""
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        self._submissions += 1
+        caller = self._submissions
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future, caller))
+            futures.append(future)
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        """Dispatch everything pending as one or more full batches"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future, int]]) -> None:
+        live = [item for item in batch if not item[1].done()]
+        if not live:
+            return
+
+        EMBEDDING_BATCH_TEXTS.observe(len(live))
+        EMBEDDING_BATCH_CALLERS.observe(len({caller for _, _, caller in live}))
+        try:
+            vectors = await self.encode_batch([text for text, _, _ in live])
+        except Exception as e:
+            for _, future, _ in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), vector in zip(live, vectors):
+            if not future.done():
+                future.set_result(vector)
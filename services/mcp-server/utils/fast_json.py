@@ -0,0 +1,48 @@
+"""
+Fast JSON serialization helpers backed by orjson
+Used for HTTP responses, cache payloads and tool results
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Serialize dict keys that aren't strings (e.g. ints from pandas groupby) and numpy arrays
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson doesn't handle natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+def dumps_str(obj: Any) -> str:
+    """Serialize to a JSON string (for Redis values, LLM messages, etc.)"""
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from bytes or str"""
+    return orjson.loads(data)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, tolerant of Decimal and other DB types"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
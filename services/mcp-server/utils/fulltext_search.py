@@ -0,0 +1,237 @@
+"""
+Ranked keyword search over the documents table
+English text goes through the to_tsvector GIN indexes (websearch_to_tsquery +
+ts_rank_cd); CJK text, where English stemming doesn't tokenize, goes through
+pg_trgm GIN indexes. Both return short snippets instead of full content.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+# Han, kana and hangul: no whitespace word boundaries, so the english parser sees one token
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+SNIPPET_CHARS = 200
+# Empty StartSel/StopSel: the default <b>…</b> markup would end up in snippets and LLM prompts
+HEADLINE_OPTIONS = "StartSel=\"\", StopSel=\"\", MaxFragments=2, MinWords=8, MaxWords=30, FragmentDelimiter=\" … \""
+
+# Idempotent; the english indexes match schema.sql so existing databases keep them
+# CONCURRENTLY: building GIN indexes on a large documents table must not block writes
+# (asyncpg runs each statement outside a transaction)
+SEARCH_EXTENSION_DDL = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+SEARCH_INDEX_DDL = {
+    "idx_documents_title": "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_title ON documents USING gin(to_tsvector('english', title))",
+    "idx_documents_content": "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_content ON documents USING gin(to_tsvector('english', content))",
+    "idx_documents_title_trgm": "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_title_trgm ON documents USING gin(title gin_trgm_ops)",
+    "idx_documents_content_trgm": "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_content_trgm ON documents USING gin(content gin_trgm_ops)",
+}
+
+# A failed concurrent build leaves an INVALID index behind that IF NOT EXISTS would skip forever
+INVALID_INDEXES_SQL = """
+SELECT c.relname
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+WHERE c.relname = ANY($1::text[]) AND NOT i.indisvalid
+"""
+
+# Session advisory lock serializing the DDL across workers and replicas
+SEARCH_INDEX_LOCK_ID = 0x5EA2C4
+
+
+def contains_cjk(text: str) -> bool:
+    """Whether the text contains Chinese/Japanese/Korean characters"""
+    return bool(CJK_PATTERN.search(text))
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filter_clause(filter_metadata: Optional[Dict[str, Any]], args: List[Any]) -> str:
+    """
+    Extra WHERE conditions mirroring the Qdrant payload filters
+
+    category and tags are columns on documents; other keys match the jsonb
+    metadata column.
+    """
+    clauses = []
+    for key, value in (filter_metadata or {}).items():
+        if key == "category":
+            args.append(value)
+            clauses.append(f"category = ${len(args)}")
+        elif key == "tags":
+            args.append(value)
+            clauses.append(f"${len(args)} = ANY(tags)")
+        else:
+            args.append(fast_json.dumps_str({key: value}))
+            clauses.append(f"metadata @> ${len(args)}::jsonb")
+    return "".join(f" AND {clause}" for clause in clauses)
+
+
+def build_fulltext_query(
+    query: str,
+    limit: int,
+    filter_metadata: Optional[Dict[str, Any]] = None
+) -> Tuple[str, List[Any]]:
+    """
+    Ranked search backed by the to_tsvector('english') indexes
+
+    The WHERE clause repeats the index expressions verbatim so the planner
+    can use them; ranking and headlines only run on matching rows.
+    """
+    args: List[Any] = [query, limit]
+    filters = _filter_clause(filter_metadata, args)
+
+    sql = f"""
+WITH hits AS (
+    SELECT id, title, content, metadata,
+           ts_rank_cd(
+               setweight(to_tsvector('english', title), 'A') ||
+               setweight(to_tsvector('english', coalesce(content, '')), 'B'),
+               websearch_to_tsquery('english', $1),
+               32
+           ) AS score
+    FROM documents
+    WHERE (to_tsvector('english', title) @@ websearch_to_tsquery('english', $1)
+           OR to_tsvector('english', content) @@ websearch_to_tsquery('english', $1)){filters}
+    ORDER BY score DESC, id
+    LIMIT $2
+)
+SELECT id, title, metadata, score,
+       ts_headline('english', coalesce(content, ''), websearch_to_tsquery('english', $1),
+                   '{HEADLINE_OPTIONS}') AS snippet
+FROM hits
+ORDER BY score DESC, id
+"""
+    return sql, args
+
+
+def build_trigram_query(
+    query: str,
+    limit: int,
+    filter_metadata: Optional[Dict[str, Any]] = None
+) -> Tuple[str, List[Any]]:
+    """
+    Substring search backed by the pg_trgm indexes
+
+    Every whitespace-separated term must appear in the title or content.
+    Terms shorter than three characters yield no trigrams, so a query made
+    only of such terms (e.g. a two-character Chinese word) still has to walk
+    the whole index.
+    """
+    terms = query.split() or [query]
+    args: List[Any] = [query, limit]
+    conditions = []
+    for term in terms:
+        args.append(f"%{escape_like(term)}%")
+        idx = len(args)
+        conditions.append(f"(title ILIKE ${idx} OR content ILIKE ${idx})")
+
+    args.append(terms[0])
+    first = len(args)
+    filters = _filter_clause(filter_metadata, args)
+
+    sql = f"""
+WITH hits AS (
+    SELECT id, title, content, metadata,
+           greatest(word_similarity($1, title) * 1.5, word_similarity($1, coalesce(content, ''))) AS score
+    FROM documents
+    WHERE {" AND ".join(conditions)}{filters}
+    ORDER BY score DESC, id
+    LIMIT $2
+)
+SELECT id, title, metadata, score,
+       substr(coalesce(content, ''),
+              greatest(strpos(lower(coalesce(content, '')), lower(${first})) - {SNIPPET_CHARS // 4}, 1),
+              {SNIPPET_CHARS}) AS snippet
+FROM hits
+ORDER BY score DESC, id
+"""
+    return sql, args
+
+
+def _decode_metadata(metadata: Any) -> Dict[str, Any]:
+    """asyncpg returns jsonb as a string (no codec on the pool); match the dicts in Qdrant payloads"""
+    if isinstance(metadata, str):
+        return fast_json.loads(metadata)
+    return metadata or {}
+
+
+def _rows_to_results(rows, mode: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "snippet": row["snippet"],
+            "score": round(float(row["score"]), 4),
+            "metadata": _decode_metadata(row["metadata"]),
+            "match": mode
+        }
+        for row in rows
+    ]
+
+
+async def ensure_search_indexes(conn) -> None:
+    """
+    Create the search indexes if missing and rebuild ones left invalid
+
+    Only one session runs the DDL at a time: an index whose concurrent build
+    is still in progress is also marked invalid, so other workers must not
+    drop it. Workers that don't get the lock skip the DDL.
+    """
+    if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", SEARCH_INDEX_LOCK_ID):
+        logger.info("Search index DDL already running in another session, skipping")
+        return
+
+    try:
+        try:
+            await conn.execute(SEARCH_EXTENSION_DDL)
+        except Exception as e:
+            # e.g. no privilege to CREATE EXTENSION; search still works, just slower
+            logger.warning(f"Could not apply search index DDL ({SEARCH_EXTENSION_DDL}): {e}")
+
+        invalid = {row["relname"] for row in await conn.fetch(INVALID_INDEXES_SQL, list(SEARCH_INDEX_DDL))}
+        for name, statement in SEARCH_INDEX_DDL.items():
+            try:
+                if name in invalid:
+                    logger.warning(f"Search index {name} is invalid, rebuilding")
+                    await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                await conn.execute(statement)
+            except Exception as e:
+                logger.warning(f"Could not apply search index DDL ({statement}): {e}")
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", SEARCH_INDEX_LOCK_ID)
+
+
+async def search_documents(
+    conn,
+    query: str,
+    limit: int,
+    filter_metadata: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Ranked keyword search
+
+    CJK queries use the trigram path. Other queries use full-text ranking and
+    fall back to trigrams when nothing matches (stop-word-only queries,
+    partial words, product codes).
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    if not contains_cjk(query):
+        sql, args = build_fulltext_query(query, limit, filter_metadata)
+        rows = await conn.fetch(sql, *args)
+        if rows:
+            return _rows_to_results(rows, "fulltext")
+
+    sql, args = build_trigram_query(query, limit, filter_metadata)
+    rows = await conn.fetch(sql, *args)
+    return _rows_to_results(rows, "trigram")
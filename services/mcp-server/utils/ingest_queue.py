@@ -0,0 +1,361 @@
+"""
+Background ingestion queue
+Uploads persist the document in Postgres and enqueue a small job
+({job_id, doc_id, attempt}); a worker in the service embeds and indexes it.
+RabbitMQ (durable queue, persistent messages, ack after indexing) is used
+when RABBITMQ_URL is set and aio-pika is installed; otherwise an in-process
+asyncio queue with the same contract stands in.
+
+Jobs are idempotent: the worker only claims a document whose current
+index_job_id matches the job and whose status is still queued/embedding,
+and indexing goes through RAGService.reindex_document, whose point ids come
+from chunk hashes, so a redelivered or retried job converges on the same
+points. An edit or delete can still land while a job is running: the job
+re-checks its index_job_id before every Qdrant write and once more when
+done, and a superseded job hands the document to reconcile(), which
+re-diffs it against the current row (or drops its vectors if the row is
+gone) after the stale writes.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from utils import fast_json
+
+try:
+    import aio_pika
+    AIO_PIKA_AVAILABLE = True
+except ImportError:
+    AIO_PIKA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+INGEST_STATUSES = ("queued", "embedding", "indexed", "failed")
+
+INGEST_JOBS = Counter(
+    "mcp_ingest_jobs_total", "Ingestion jobs by outcome",
+    ["outcome"]
+)
+INGEST_IN_FLIGHT = Gauge(
+    "mcp_ingest_jobs_in_flight", "Ingestion jobs currently being indexed"
+)
+
+INGEST_COLUMNS_DDL = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS index_status VARCHAR(20) DEFAULT 'indexed'",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS index_job_id UUID",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS index_attempts INTEGER DEFAULT 0",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS index_error TEXT",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS index_chunks INTEGER",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS indexed_at TIMESTAMP WITH TIME ZONE",
+    # CONCURRENTLY: no write lock on documents (asyncpg runs each statement outside a transaction)
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_index_status ON documents(index_status) "
+    "WHERE index_status IN ('queued', 'embedding')",
+]
+
+
+async def ensure_ingest_columns(conn) -> None:
+    """Add the indexing status columns to databases created before they existed"""
+    for statement in INGEST_COLUMNS_DDL:
+        try:
+            await conn.execute(statement)
+        except Exception as e:
+            # e.g. lock timeout, or another replica applying the same DDL; don't abort the rest of startup
+            logger.warning(f"Could not apply ingest DDL ({statement}): {e}")
+
+
+def new_job_id() -> str:
+    return str(uuid.uuid4())
+
+
+class JobSuperseded(Exception):
+    """The document was edited or deleted while its ingest job was running"""
+
+
+class PostgresIngestStore:
+    """Job state kept on the documents row, guarded by index_job_id"""
+
+    def __init__(self, pool_getter: Callable[[], Any]):
+        # Called per use: main.py creates the pool at startup
+        self.pool_getter = pool_getter
+
+    async def claim(self, doc_id: int, job_id: str) -> Optional[Dict[str, Any]]:
+        """Mark the job embedding and return the document, or None if the job is stale or done"""
+        async with self.pool_getter().acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                UPDATE documents
+                SET index_status = 'embedding', index_attempts = index_attempts + 1
+                WHERE id = $1 AND index_job_id = $2 AND index_status IN ('queued', 'embedding')
+                RETURNING title, content, category, tags, metadata
+                """,
+                doc_id, uuid.UUID(job_id)
+            )
+        if row is None:
+            return None
+        document = dict(row)
+        if isinstance(document["metadata"], str):
+            document["metadata"] = fast_json.loads(document["metadata"])
+        return document
+
+    async def is_current(self, doc_id: int, job_id: str) -> bool:
+        """Whether the document still exists and still belongs to this job"""
+        async with self.pool_getter().acquire() as conn:
+            return await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM documents WHERE id = $1 AND index_job_id = $2)",
+                doc_id, uuid.UUID(job_id)
+            )
+
+    async def requeue(self, doc_id: int, job_id: str, error: str) -> None:
+        await self._set(doc_id, job_id, "queued", error=error)
+
+    async def mark_indexed(self, doc_id: int, job_id: str, chunks: int) -> None:
+        await self._set(doc_id, job_id, "indexed", chunks=chunks)
+
+    async def mark_failed(self, doc_id: int, job_id: str, error: str) -> None:
+        await self._set(doc_id, job_id, "failed", error=error)
+
+    async def _set(self, doc_id: int, job_id: str, status: str, error: Optional[str] = None, chunks: Optional[int] = None):
+        async with self.pool_getter().acquire() as conn:
+            await conn.execute(
+                """
+                UPDATE documents
+                SET index_status = $3, index_error = $4,
+                    index_chunks = COALESCE($5, index_chunks),
+                    indexed_at = CASE WHEN $3 = 'indexed' THEN CURRENT_TIMESTAMP ELSE indexed_at END
+                WHERE id = $1 AND index_job_id = $2
+                """,
+                doc_id, uuid.UUID(job_id), status, error, chunks
+            )
+
+    async def pending_jobs(self) -> List[Dict[str, Any]]:
+        """Jobs that were queued or running; re-enqueued at startup when the queue isn't durable"""
+        async with self.pool_getter().acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT id, index_job_id FROM documents
+                WHERE index_status IN ('queued', 'embedding') AND index_job_id IS NOT NULL
+                ORDER BY id
+                """
+            )
+        return [{"job_id": str(r["index_job_id"]), "doc_id": r["id"], "attempt": 1} for r in rows]
+
+    async def orphaned_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Bulk-ingested documents that never got settled, re-enqueued at startup whatever the queue
+
+        Bulk rows are written as 'embedding' without a queue message, and
+        claim() bumps index_attempts, so 'embedding' with no attempts means
+        the bulk upload died before marking the row. A bulk upload still
+        running on another replica can match too; the job then re-indexes
+        the same content under the same job id.
+        """
+        async with self.pool_getter().acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT id, index_job_id FROM documents
+                WHERE index_status = 'embedding' AND index_attempts = 0 AND index_job_id IS NOT NULL
+                ORDER BY id
+                """
+            )
+        return [{"job_id": str(r["index_job_id"]), "doc_id": r["id"], "attempt": 1} for r in rows]
+
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class InProcessQueue:
+    """
+    asyncio stand-in for RabbitMQ (tests and single-node setups)
+
+    Same publish/consume contract, but jobs live in memory: they are lost on
+    restart, which is why pending jobs are re-enqueued from Postgres at
+    startup when durable is False.
+    """
+
+    durable = False
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+
+    async def connect(self) -> None:
+        pass
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        await self._queue.put(fast_json.dumps(message))
+
+    async def consume(self, handler: Handler, concurrency: int = 1) -> None:
+        async def work():
+            while True:
+                body = await self._queue.get()
+                try:
+                    await handler(fast_json.loads(body))
+                except Exception as e:
+                    logger.error(f"Ingest job handler crashed: {e}", exc_info=True)
+                finally:
+                    self._queue.task_done()
+
+        self._workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+
+    async def join(self) -> None:
+        """Wait until every published job has been handled"""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+
+class RabbitMQQueue:
+    """
+    Durable RabbitMQ queue via aio-pika
+
+    Messages are persistent and acked only after the handler returns, so a
+    crash mid-indexing redelivers the job; prefetch bounds jobs in flight.
+    """
+
+    durable = True
+
+    def __init__(self, url: str, queue_name: str = "mcp.ingest"):
+        self.url = url
+        self.queue_name = queue_name
+        self._connection = None
+        self._channel = None
+
+    async def connect(self) -> None:
+        self._connection = await aio_pika.connect_robust(self.url)
+        self._channel = await self._connection.channel()
+        await self._channel.declare_queue(self.queue_name, durable=True)
+        logger.info(f"Connected to RabbitMQ queue '{self.queue_name}'")
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        await self._channel.default_exchange.publish(
+            aio_pika.Message(
+                fast_json.dumps(message),
+                content_type="application/json",
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+            ),
+            routing_key=self.queue_name
+        )
+
+    async def consume(self, handler: Handler, concurrency: int = 1) -> None:
+        await self._channel.set_qos(prefetch_count=concurrency)
+        queue = await self._channel.declare_queue(self.queue_name, durable=True)
+
+        async def on_message(message):
+            # requeue on unexpected errors; the handler itself acks failures it has recorded
+            async with message.process(requeue=True):
+                await handler(fast_json.loads(message.body))
+
+        await queue.consume(on_message)
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+def create_ingest_queue():
+    """RabbitMQ when configured and available, otherwise the in-process queue"""
+    url = os.getenv("RABBITMQ_URL")
+    if url and AIO_PIKA_AVAILABLE:
+        return RabbitMQQueue(url, os.getenv("INGEST_QUEUE_NAME", "mcp.ingest"))
+    if url:
+        logger.warning("RABBITMQ_URL is set but aio-pika is not installed; using the in-process ingest queue")
+    return InProcessQueue()
+
+
+class IngestWorker:
+    """
+    Handles ingestion jobs: claim → index → mark indexed
+
+    index(doc_id, document, guard) returns the chunk count and awaits
+    guard() before each Qdrant write; guard raises JobSuperseded once the
+    row is gone or belongs to a newer job. A superseded job is dropped and
+    reconcile(doc_id) repairs whatever it already wrote. Failures are
+    retried by re-publishing the job with attempt + 1 after
+    retry_delay * attempt seconds, up to max_attempts; then the document is
+    marked failed.
+    """
+
+    def __init__(
+        self,
+        queue,
+        store,
+        index: Callable[[int, Dict[str, Any], Callable[[], Awaitable[None]]], Awaitable[int]],
+        reconcile: Optional[Callable[[int], Awaitable[None]]] = None,
+        max_attempts: int = 3,
+        retry_delay: float = 2.0
+    ):
+        self.queue = queue
+        self.store = store
+        self.index = index
+        self.reconcile = reconcile
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    async def enqueue(self, doc_id: int, job_id: str) -> None:
+        await self.queue.publish({"job_id": job_id, "doc_id": doc_id, "attempt": 1})
+        INGEST_JOBS.labels("enqueued").inc()
+
+    async def handle(self, message: Dict[str, Any]) -> None:
+        doc_id, job_id = message["doc_id"], message["job_id"]
+        attempt = int(message.get("attempt", 1))
+
+        document = await self.store.claim(doc_id, job_id)
+        if document is None:
+            # Already indexed, superseded by a newer upload, or deleted
+            INGEST_JOBS.labels("skipped").inc()
+            return
+
+        async def guard() -> None:
+            if not await self.store.is_current(doc_id, job_id):
+                raise JobSuperseded(f"document {doc_id} changed while job {job_id} was running")
+
+        INGEST_IN_FLIGHT.inc()
+        try:
+            chunks = await self.index(doc_id, document, guard)
+            # Edits or deletes that landed after the last guard check
+            await guard()
+        except JobSuperseded:
+            await self._superseded(doc_id, job_id)
+            return
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < self.max_attempts:
+                logger.warning(f"Ingest job {job_id} (doc {doc_id}) attempt {attempt} failed, retrying: {error}")
+                await self.store.requeue(doc_id, job_id, error)
+                await asyncio.sleep(self.retry_delay * attempt)
+                await self.queue.publish({**message, "attempt": attempt + 1})
+                INGEST_JOBS.labels("retried").inc()
+            else:
+                logger.error(f"Ingest job {job_id} (doc {doc_id}) failed after {attempt} attempts: {error}")
+                await self.store.mark_failed(doc_id, job_id, error)
+                INGEST_JOBS.labels("failed").inc()
+            return
+        finally:
+            INGEST_IN_FLIGHT.dec()
+
+        await self.store.mark_indexed(doc_id, job_id, chunks)
+        INGEST_JOBS.labels("indexed").inc()
+        logger.info(f"Ingest job {job_id}: document {doc_id} indexed ({chunks} chunks)")
+
+    async def _superseded(self, doc_id: int, job_id: str) -> None:
+        INGEST_JOBS.labels("superseded").inc()
+        logger.info(f"Ingest job {job_id}: document {doc_id} was edited or deleted while indexing, reconciling")
+        if self.reconcile is None:
+            return
+        try:
+            await self.reconcile(doc_id)
+        except Exception as e:
+            logger.error(f"Failed to reconcile document {doc_id} after superseded job {job_id}: {e}")
+
+    async def start(self, concurrency: int = 1) -> None:
+        await self.queue.connect()
+        await self.queue.consume(self.handle, concurrency)
@@ -0,0 +1,141 @@
+"""
+Qdrant operation helpers
+Per-operation latency metrics, batched and optionally non-blocking upserts
+for the shared AsyncQdrantClient, and quantization settings.
+"""
+
+import logging
+from typing import Any, Awaitable, List, Optional
+
+from prometheus_client import Counter, Histogram
+from qdrant_client.models import (
+    BinaryQuantization, BinaryQuantizationConfig, PointIdsList, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams
+)
+
+logger = logging.getLogger(__name__)
+
+QDRANT_LATENCY = Histogram(
+    "mcp_qdrant_operation_seconds", "Qdrant call latency by operation",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+QDRANT_ERRORS = Counter(
+    "mcp_qdrant_errors_total", "Failed Qdrant calls by operation",
+    ["operation"]
+)
+QDRANT_POINTS_UPSERTED = Counter(
+    "mcp_qdrant_points_upserted_total", "Points sent to Qdrant upsert"
+)
+
+# Never a real point: chunk point ids are uuid5, which can't be the nil UUID
+BARRIER_POINT_ID = "00000000-0000-0000-0000-000000000000"
+
+
+async def timed(operation: str, call: Awaitable[Any]) -> Any:
+    """Await a Qdrant call, recording its latency and failures under operation"""
+    with QDRANT_LATENCY.labels(operation).time():
+        try:
+            return await call
+        except Exception:
+            QDRANT_ERRORS.labels(operation).inc()
+            raise
+
+
+class BatchedUpserter:
+    """
+    Splits upserts into batch_size chunks
+
+    With wait=False, Qdrant acknowledges each batch once it is in the WAL
+    instead of after indexing, so bulk ingest isn't throttled by indexing.
+    Updates on a collection are applied in order, so flush() sends a no-op
+    update with wait=True (deleting BARRIER_POINT_ID, which never exists):
+    when it returns, every earlier batch has been applied and is
+    searchable. Re-sending a real point instead could resurrect it if it
+    was deleted or re-indexed in the meantime.
+
+    The upserter is shared by concurrent callers, so wait=False batches are
+    numbered once acknowledged and only flush() advances the flushed mark;
+    a wait=True upsert finishing later doesn't cover other callers' batches.
+    """
+
+    def __init__(self, client, collection_name: str, batch_size: int = 256):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self._sent_seq = 0  # wait=False batches acknowledged so far
+        self._flushed_seq = 0  # covered by a completed flush()
+
+    async def upsert(self, points: List[Any], wait: bool = True) -> int:
+        """Upsert points in batches; with wait=True the call returns once all are applied"""
+        batches = [points[i:i + self.batch_size] for i in range(0, len(points), self.batch_size)]
+        for index, batch in enumerate(batches):
+            last = index == len(batches) - 1
+            await timed("upsert", self.client.upsert(
+                collection_name=self.collection_name,
+                points=batch,
+                wait=wait and last
+            ))
+            QDRANT_POINTS_UPSERTED.inc(len(batch))
+            if not wait:
+                self._sent_seq += 1
+
+        return len(batches)
+
+    async def flush(self) -> None:
+        """Block until every earlier wait=False upsert has been applied"""
+        target = self._sent_seq
+        if target <= self._flushed_seq:
+            return
+        await timed("flush", self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=PointIdsList(points=[BARRIER_POINT_ID]),
+            wait=True
+        ))
+        self._flushed_seq = max(self._flushed_seq, target)
+
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+def quantization_config(mode: str, always_ram: bool = True):
+    """
+    Collection quantization config for a mode
+
+    scalar: int8 per dimension (4x smaller, recall close to float32).
+    binary: 1 bit per dimension (32x smaller); needs oversampling and
+    rescoring to recover recall and loses a lot on small models like
+    384-dim MiniLM (see benchmarks/bench_quantization.py). None for "none".
+    """
+    if mode == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=always_ram)
+        )
+    if mode == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=always_ram))
+    if mode == "none":
+        return None
+    raise ValueError(f"Unknown quantization mode: {mode} (expected one of {QUANTIZATION_MODES})")
+
+
+def quantization_search_params(mode: str, oversampling: float = 2.0, rescore: bool = True) -> Optional[SearchParams]:
+    """
+    Query-time params: fetch limit * oversampling candidates with the
+    quantized vectors, then rescore them with the original vectors
+    """
+    if mode == "none":
+        return None
+    return SearchParams(
+        quantization=QuantizationSearchParams(ignore=False, rescore=rescore, oversampling=oversampling)
+    )
+
+
+def quantization_mode_of(quantization) -> str:
+    """Mode name for a collection's current quantization_config"""
+    if quantization is None:
+        return "none"
+    if isinstance(quantization, ScalarQuantization):
+        return "scalar"
+    if isinstance(quantization, BinaryQuantization):
+        return "binary"
+    return "other"
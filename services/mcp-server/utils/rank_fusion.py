@@ -0,0 +1,94 @@
+"""
+Rank fusion for hybrid retrieval
+Merges ranked result lists from several retrievers (e.g. Qdrant vector search
+and Postgres full-text search) into a single top-k keyed by document id.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# Tokens that look like identifiers: part numbers, order numbers, clause refs
+IDENTIFIER_PATTERN = re.compile(r"\b(?=[\w./-]*\d)[\w./-]{3,}\b|\"[^\"]+\"")
+
+DEFAULT_RRF_K = 60
+
+
+def suggest_keyword_weight(query: str) -> float:
+    """
+    Keyword-leg weight for a query when the caller doesn't set one
+
+    Identifier-like tokens and quoted phrases are exact-match needs that
+    embeddings blur, so they shift weight toward keyword search.
+    """
+    return 0.7 if IDENTIFIER_PATTERN.search(query) else 0.4
+
+
+def _merge(fused: Dict[Any, Dict[str, Any]], source: str, rank: int, item: Dict[str, Any], key: str) -> Dict[str, Any]:
+    doc_key = item[key]
+    entry = fused.get(doc_key)
+    if entry is None:
+        entry = fused[doc_key] = {**item, "score": 0.0, "scores": {}, "ranks": {}}
+    else:
+        for field, value in item.items():
+            if entry.get(field) in (None, "", {}):
+                entry[field] = value
+    entry["scores"][source] = item.get("score")
+    entry["ranks"][source] = rank
+    return entry
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, List[Dict[str, Any]]],
+    weights: Dict[str, float],
+    key: str = "doc_id",
+    k: int = DEFAULT_RRF_K
+) -> List[Dict[str, Any]]:
+    """Weighted RRF: score = sum(weight / (k + rank)), ranks starting at 1"""
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for source, items in ranked_lists.items():
+        weight = weights.get(source, 1.0)
+        for rank, item in enumerate(items, 1):
+            entry = _merge(fused, source, rank, item, key)
+            entry["score"] += weight / (k + rank)
+    return sorted(fused.values(), key=lambda e: e["score"], reverse=True)
+
+
+def weighted_score_fusion(
+    ranked_lists: Dict[str, List[Dict[str, Any]]],
+    weights: Dict[str, float],
+    key: str = "doc_id"
+) -> List[Dict[str, Any]]:
+    """Weighted sum of per-source min-max normalized scores"""
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for source, items in ranked_lists.items():
+        if not items:
+            continue
+        weight = weights.get(source, 1.0)
+        raw = [float(item.get("score") or 0.0) for item in items]
+        low, high = min(raw), max(raw)
+        for rank, (item, score) in enumerate(zip(items, raw), 1):
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            entry = _merge(fused, source, rank, item, key)
+            entry["score"] += weight * normalized
+    return sorted(fused.values(), key=lambda e: e["score"], reverse=True)
+
+
+def fuse(
+    ranked_lists: Dict[str, List[Dict[str, Any]]],
+    weights: Dict[str, float],
+    limit: int,
+    method: str = "rrf",
+    key: str = "doc_id",
+    rrf_k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Fuse ranked lists with "rrf" or "weighted" and return the merged top-k"""
+    if method == "rrf":
+        merged = reciprocal_rank_fusion(ranked_lists, weights, key=key, k=rrf_k or DEFAULT_RRF_K)
+    elif method == "weighted":
+        merged = weighted_score_fusion(ranked_lists, weights, key=key)
+    else:
+        raise ValueError(f"Unknown fusion method: {method}")
+
+    for entry in merged:
+        entry["score"] = round(entry["score"], 6)
+    return merged[:limit]
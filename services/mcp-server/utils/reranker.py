@@ -0,0 +1,184 @@
+"""
+Cross-encoder reranking with a latency budget
+Vector search over-fetches candidates; a small CPU cross-encoder rescores
+(query, chunk) pairs in one batched call on the embedding workers. Scores are
+cached by (model, query, chunk) hash. If scoring doesn't finish within the
+budget the caller gets the original vector order, and the scoring keeps
+running in the background so the cache is warm for the next identical query.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Histogram
+
+from utils.search_cache import mark_degraded
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+RERANK_LATENCY = Histogram(
+    "mcp_rerank_seconds", "Time spent reranking one result list, including cache lookups",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+RERANK_FALLBACKS = Counter(
+    "mcp_rerank_fallbacks_total", "Rerank requests answered in vector order",
+    ["reason"]
+)
+RERANK_CACHE = Counter(
+    "mcp_rerank_cache_requests_total", "Rerank score cache lookups",
+    ["result"]
+)
+
+
+def load_cross_encoder(model_name: str):
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name)
+
+
+class Reranker:
+    """
+    Rescores search results with a cross-encoder
+
+    Runs on the shared EmbeddingExecutor so inference is admitted and
+    throttled together with embedding jobs. The model is loaded on first use;
+    requests that arrive while it is loading fall back to vector order.
+    """
+
+    def __init__(
+        self,
+        executor,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        enabled: bool = False,
+        candidates: int = 20,
+        timeout_ms: float = 300.0,
+        batch_size: int = 32,
+        cache_max_items: int = 20000,
+        min_score: Optional[float] = None,
+        load_model: Callable[[str], Any] = load_cross_encoder
+    ):
+        self.executor = executor
+        self.model_name = model_name
+        self.enabled = enabled
+        self.candidates = candidates
+        self.timeout = timeout_ms / 1000
+        self.batch_size = batch_size
+        self.cache_max_items = cache_max_items
+        self.min_score = min_score
+        self.model = None
+        self._load_model = load_model
+        self._loading: Optional[asyncio.Future] = None
+        self._scores: "OrderedDict[str, float]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls, executor) -> "Reranker":
+        min_score = os.getenv("RERANK_MIN_SCORE")
+        return cls(
+            executor,
+            model_name=os.getenv("RERANK_MODEL", DEFAULT_RERANK_MODEL),
+            enabled=os.getenv("RERANK_ENABLED", "false").lower() == "true",
+            candidates=int(os.getenv("RERANK_CANDIDATES", "20")),
+            timeout_ms=float(os.getenv("RERANK_TIMEOUT_MS", "300")),
+            batch_size=int(os.getenv("RERANK_BATCH_SIZE", "32")),
+            cache_max_items=int(os.getenv("RERANK_CACHE_MAX_ITEMS", "20000")),
+            min_score=float(min_score) if min_score else None
+        )
+
+    def _key(self, query: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{query}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+    def _remember(self, key: str, score: float) -> None:
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.cache_max_items:
+            self._scores.popitem(last=False)
+
+    async def _ensure_model(self):
+        if self.model is None:
+            if self._loading is None:
+                logger.info(f"Loading rerank model: {self.model_name}")
+                self._loading = asyncio.ensure_future(self.executor.run(self._load_model, self.model_name, size=0))
+            try:
+                self.model = await asyncio.shield(self._loading)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._loading = None
+                raise
+        return self.model
+
+    def _predict(self, model, pairs: List[List[str]]) -> List[float]:
+        scores = model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        return [float(s) for s in scores]
+
+    async def _score(self, query: str, pending: Dict[str, str]) -> Dict[str, float]:
+        model = await self._ensure_model()
+        scores = await self.executor.run(
+            self._predict, model, [[query, text] for text in pending.values()], size=0
+        )
+        result = dict(zip(pending, scores))
+        for key, score in result.items():
+            self._remember(key, score)
+        return result
+
+    async def rerank(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        limit: int,
+        text_key: str = "content"
+    ) -> List[Dict[str, Any]]:
+        """
+        Top limit results by cross-encoder score, each with a rerank_score
+
+        Falls back to results[:limit] unchanged if scoring fails or takes
+        longer than the budget. Results below min_score are dropped.
+        """
+        if not results:
+            return results
+
+        started = time.perf_counter()
+        keys = [self._key(query, r.get(text_key) or "") for r in results]
+        scores: Dict[str, float] = {}
+        pending: Dict[str, str] = {}
+        for key, result in zip(keys, results):
+            if key in self._scores:
+                scores[key] = self._scores[key]
+                self._scores.move_to_end(key)
+                RERANK_CACHE.labels("hit").inc()
+            elif key not in pending:
+                pending[key] = result.get(text_key) or ""
+                RERANK_CACHE.labels("miss").inc()
+
+        if pending:
+            # Shielded so a timed-out batch still finishes and fills the cache
+            task = asyncio.ensure_future(self._score(query, pending))
+            try:
+                scores.update(await asyncio.wait_for(asyncio.shield(task), self.timeout))
+            except asyncio.TimeoutError:
+                RERANK_FALLBACKS.labels("timeout").inc()
+                logger.warning(f"Rerank exceeded {self.timeout * 1000:.0f}ms budget, using vector order")
+                mark_degraded("rerank timeout")
+                return results[:limit]
+            except Exception as e:
+                RERANK_FALLBACKS.labels("error").inc()
+                logger.warning(f"Rerank failed, using vector order: {e}")
+                mark_degraded("rerank error")
+                return results[:limit]
+
+        reranked = sorted(
+            (dict(result, rerank_score=scores[key]) for key, result in zip(keys, results)),
+            key=lambda r: r["rerank_score"],
+            reverse=True
+        )
+        if self.min_score is not None:
+            reranked = [r for r in reranked if r["rerank_score"] >= self.min_score]
+        RERANK_LATENCY.observe(time.perf_counter() - started)
+        return reranked[:limit]
@@ -0,0 +1,106 @@
+"""
+Versioned search result cache
+Results are cached per (query, filters, top_k, threshold, ...) and tagged
+with the corpus version current when the search started. Indexing, editing
+or deleting a document bumps the version, so every older entry stops
+matching on its next lookup instead of lingering until a TTL runs out; the
+TTL only bounds how long unused entries occupy memory.
+
+Storage is a TwoTierCache: hot queries are answered from the worker's
+in-process tier, and corpus bumps reach the other workers over the
+invalidation channel.
+
+Degraded results (a fallback answered, e.g. the reranker ran out of its
+budget or one hybrid leg failed) are returned but not stored, so the next
+request for the query gets a full answer.
+"""
+
+import hashlib
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from utils.embedding_cache import normalize_text
+from utils.two_tier_cache import TwoTierCache
+
+CORPUS_TAG = "corpus"
+
+# A list shared by the search and any tasks it spawns, collecting fallback reasons
+_degraded: ContextVar[Optional[List[str]]] = ContextVar("search_degraded", default=None)
+
+
+def mark_degraded(reason: str) -> None:
+    """Flag the search running in this context as degraded (a fallback answered)"""
+    reasons = _degraded.get()
+    if reasons is not None:
+        reasons.append(reason)
+
+
+async def track_degraded(search: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+    """(result, whether any fallback marked it degraded while it ran)"""
+    reasons: List[str] = []
+    token = _degraded.set(reasons)
+    try:
+        value = await search()
+    finally:
+        _degraded.reset(token)
+    return value, bool(reasons)
+
+
+def params_digest(params: Dict[str, Any]) -> str:
+    """sha256 of the parameters serialized with sorted keys (order-independent cache keys)"""
+    canonical = orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    return hashlib.sha256(canonical).hexdigest()
+
+
+class SearchResultCache(TwoTierCache):
+    """
+    Search results keyed by request parameters, valid for one corpus version
+
+    namespace separates caches whose results differ for the same request
+    (e.g. embedding model and backend).
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int = 24 * 3600, redis_client=None, **tier_options):
+        super().__init__("search", redis_client=redis_client, **tier_options)
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        # Other caches derived from the corpus (e.g. tool results tagged "documents")
+        self.on_bump: List[Callable[[], Awaitable[None]]] = []
+
+    def key(self, kind: str, params: Dict[str, Any]) -> str:
+        """Stable key for a search: the query is normalized, parameters are sorted"""
+        params = dict(params)
+        if isinstance(params.get("query"), str):
+            params["query"] = normalize_text(params["query"])
+        return f"search:{kind}:{self.namespace}:{params_digest(params)}"
+
+    async def get_or_compute(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Tuple[Any, bool]]]
+    ) -> Tuple[Any, bool]:
+        """
+        (value, cache hit) for a search
+
+        compute returns (value, degraded); degraded values are not stored.
+        The version is read before computing: if the corpus changes while the
+        search runs, the entry is stored under the old version and is never
+        served.
+        """
+        key = self.key(kind, params)
+        versions, value, _ = await self.get(key, [CORPUS_TAG])
+        if value is not None:
+            return value, True
+        value, degraded = await compute()
+        if not degraded:
+            await self.set(key, versions, value, self.ttl_seconds)
+        return value, False
+
+    async def bump(self) -> None:
+        """Invalidate every cached result (the corpus changed)"""
+        await self.invalidate(CORPUS_TAG)
+        for hook in self.on_bump:
+            await hook()
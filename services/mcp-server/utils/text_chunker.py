@@ -0,0 +1,121 @@
+"""
+Token-aware, sentence-aware text chunking
+Chunks are measured in the embedding model's own tokens, so every chunk fits
+the model's max sequence length instead of being silently truncated. Cuts
+prefer paragraph and sentence ends (including 。！？ for CJK text, which has
+no spaces to split on), fall back to word boundaries, and consecutive chunks
+share up to overlap_tokens tokens.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Callable, List, Tuple
+
+Span = Tuple[int, int]
+
+# Sentence ends: CJK full stops, ASCII terminators before whitespace (with any
+# closing quotes/brackets), and line breaks
+SENTENCE_END = re.compile(r"(?:[。！？]|[.!?](?=[\s\"'”’)\]]|$))[\"'”’」』）)\]]*|\n+")
+
+CJK_CHAR = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+# Stand-in for the model tokenizer when it isn't loaded: one token per CJK
+# character, per run of other word characters and per punctuation mark
+APPROXIMATE_TOKEN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+    r"|[^\W\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+    r"|[^\w\s]"
+)
+
+
+def approximate_token_offsets(text: str) -> List[Span]:
+    return [m.span() for m in APPROXIMATE_TOKEN.finditer(text)]
+
+
+def sentence_ends(text: str) -> List[int]:
+    """Character offsets just past each sentence or line end"""
+    return [m.end() for m in SENTENCE_END.finditer(text)]
+
+
+def _is_word_start(text: str, tokens: List[Span], index: int) -> bool:
+    """A cut before tokens[index] doesn't split a word (whitespace gap or CJK on either side)"""
+    if index == 0:
+        return True
+    prev_end, start = tokens[index - 1][1], tokens[index][0]
+    return start > prev_end or bool(CJK_CHAR.match(text[start])) or bool(CJK_CHAR.match(text[prev_end - 1]))
+
+
+def _split_long(text: str, tokens: List[Span], start: int, end: int, size: int) -> List[Span]:
+    """Split a token range longer than size, cutting at word boundaries where possible"""
+    pieces = []
+    while end - start > size:
+        cut = start + size
+        while cut > start + 1 and not _is_word_start(text, tokens, cut):
+            cut -= 1
+        if cut == start + 1 and not _is_word_start(text, tokens, cut):
+            cut = start + size
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def chunk_by_tokens(
+    text: str,
+    token_offsets: Callable[[str], List[Span]] = approximate_token_offsets,
+    max_tokens: int = 254,
+    overlap_tokens: int = 32
+) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens tokens
+
+    token_offsets returns (start, end) character offsets of each token,
+    without special tokens; the whole text is tokenized once. Sentences are
+    packed greedily; a sentence longer than max_tokens is split on its own.
+    The next chunk starts at the earliest sentence within the last
+    overlap_tokens tokens of the previous one, or mid-sentence if none fits.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be positive")
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    tokens = token_offsets(text)
+    if not tokens:
+        return []
+
+    # Sentence boundaries as token indices; long sentences are cut short enough
+    # that the overlap still fits in front of each piece
+    starts = [s for s, _ in tokens]
+    bounds = sorted({bisect_left(starts, offset) for offset in sentence_ends(text)} | {len(tokens)})
+    units, previous = [], 0
+    for bound in bounds:
+        if bound > previous:
+            units.extend(_split_long(text, tokens, previous, bound, max_tokens - overlap_tokens))
+            previous = bound
+
+    ranges = []
+    chunk_start, chunk_end, unit_starts = units[0][0], units[0][1], [units[0][0]]
+    for unit_start, unit_end in units[1:]:
+        if unit_end - chunk_start <= max_tokens:
+            chunk_end = unit_end
+            unit_starts.append(unit_start)
+            continue
+
+        ranges.append((chunk_start, chunk_end))
+        overlap_start = next((s for s in unit_starts[1:] if chunk_end - s <= overlap_tokens), None)
+        if overlap_start is None:
+            overlap_start = chunk_end - overlap_tokens
+            while overlap_start < chunk_end and not _is_word_start(text, tokens, overlap_start):
+                overlap_start += 1
+        # Shrink the overlap if it would push this unit past max_tokens
+        chunk_start = max(overlap_start, unit_end - max_tokens)
+        chunk_end = unit_end
+        unit_starts = [chunk_start] + [s for s in unit_starts if s > chunk_start] + [unit_start]
+    ranges.append((chunk_start, chunk_end))
+
+    chunks = []
+    for start, end in ranges:
+        chunk = text[tokens[start][0]:tokens[end - 1][1]].strip()
+        if chunk:
+            chunks.append(chunk)
+    return chunks
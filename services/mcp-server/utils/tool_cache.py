@@ -0,0 +1,211 @@
+"""
+Result cache for read-only tools
+A tool opts in with @tool_cache.cached(name, ttl, tags): results are keyed by
+the tool name and its arguments and expire after ttl seconds, or earlier
+when one of their tags is invalidated (e.g. "documents" when the corpus
+changes, "document:{doc_id}" when that document is edited). Storage and tag
+versions come from TwoTierCache, so hot tools (schema, table lists) are
+answered from the worker's in-process tier.
+
+Concurrent misses for the same key are coalesced: within a worker they
+await one computation, across workers a short Redis lock lets one worker
+compute while the others poll for its result. Redis is optional: without
+it, or while it fails, the in-process tier is used and nothing errors.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from fastapi.responses import Response
+from prometheus_client import Counter
+from pydantic import BaseModel
+
+from utils import fast_json
+from utils.fast_json import ORJSONResponse
+from utils.search_cache import params_digest
+from utils.two_tier_cache import TwoTierCache
+
+logger = logging.getLogger(__name__)
+
+TOOL_CACHE_REQUESTS = Counter(
+    "mcp_tool_cache_requests_total", "Read-only tool cache lookups",
+    ["tool", "result"]  # hit, miss, coalesced, stale
+)
+
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+return 0
+"""
+
+
+class ToolCache(TwoTierCache):
+    """
+    Per-tool TTL cache with tag invalidation and miss coalescing
+
+    A cached call returns what the route would have serialized
+    (pre-rendered responses are rebuilt as ORJSONResponse). Exceptions,
+    error responses and results the tool's cacheable check rejects are
+    never cached.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        lock_timeout_ms: int = 5000,
+        poll_interval_ms: int = 50,
+        **tier_options
+    ):
+        super().__init__("tools", redis_client=redis_client, **tier_options)
+        self.lock_timeout_ms = lock_timeout_ms
+        self.poll_interval_ms = poll_interval_ms
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        """Token if this worker should compute the key; None if another worker holds the lock"""
+        token = uuid.uuid4().hex
+        if self.redis is None:
+            return token
+        try:
+            if await self.redis.set(f"{key}:lock", token, nx=True, px=self.lock_timeout_ms):
+                return token
+            return None
+        except Exception as e:
+            logger.warning(f"Tool cache Redis lock failed: {e}")
+            return token
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        if self.redis is not None:
+            try:
+                await self.redis.eval(_RELEASE_LOCK, 1, f"{key}:lock", token)
+            except Exception as e:
+                logger.warning(f"Tool cache Redis unlock failed: {e}")
+
+    async def _wait_for_other_worker(self, key: str, tags: List[str]) -> Optional[Dict[str, Any]]:
+        """Poll for the entry another worker is computing, up to the lock timeout"""
+        deadline = time.monotonic() + self.lock_timeout_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval_ms / 1000)
+            _, entry, _ = await self.get(key, tags)
+            if entry is not None:
+                return entry
+        return None
+
+    async def get_or_compute(
+        self,
+        tool: str,
+        key: str,
+        ttl: int,
+        tags: List[str],
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Cached result for key, computing it at most once across concurrent callers"""
+        versions, entry, stale = await self.get(key, tags)
+        if entry is not None:
+            TOOL_CACHE_REQUESTS.labels(tool, "hit").inc()
+            return self._unwrap(entry)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            TOOL_CACHE_REQUESTS.labels(tool, "coalesced").inc()
+            return self._unwrap(await asyncio.shield(inflight))
+
+        TOOL_CACHE_REQUESTS.labels(tool, "stale" if stale else "miss").inc()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            token = await self._acquire_lock(key)
+            if token is None:
+                entry = await self._wait_for_other_worker(key, tags)
+                if entry is None:
+                    token = uuid.uuid4().hex  # the other worker failed or is slow: compute here
+            if token is not None:
+                try:
+                    result = await compute()
+                    if cacheable is not None and not isinstance(result, Response) and not cacheable(result):
+                        raise _Uncacheable(result)
+                    entry = self._wrap(result)
+                    await self.set(key, versions, entry, ttl)
+                finally:
+                    await self._release_lock(key, token)
+            future.set_result(entry)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here; waiters re-raise it themselves
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        return self._unwrap(entry)
+
+    @staticmethod
+    def _wrap(result: Any) -> Dict[str, Any]:
+        if isinstance(result, Response):
+            if result.status_code >= 400:
+                raise _Uncacheable(result)
+            return {"response": True, "value": fast_json.loads(result.body)}
+        return {"response": False, "value": fast_json.loads(fast_json.dumps(result))}
+
+    @staticmethod
+    def _unwrap(entry: Dict[str, Any]) -> Any:
+        return ORJSONResponse(entry["value"]) if entry["response"] else entry["value"]
+
+    def cached(
+        self,
+        tool: str,
+        ttl: int,
+        tags: Union[Iterable[str], Callable[[Dict[str, Any]], Iterable[str]]] = (),
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ):
+        """
+        Decorator caching an async route/tool handler
+
+        Place it directly on the handler (below @app.* and
+        @tool_registry.tool); the wrapper keeps the handler's signature, so
+        FastAPI and the registry see the same parameters. Tags may reference
+        arguments, e.g. "document:{doc_id}"; tags can also be a function of
+        the arguments (pydantic models as dicts) when they depend on a flag.
+        cacheable(result) returning
+        False passes a result through without storing it (e.g. partial
+        answers after an upstream failure).
+        """
+        if not callable(tags):
+            tags = tuple(tags)
+
+        def decorator(handler: Callable[..., Awaitable[Any]]):
+            signature = inspect.signature(handler)
+
+            @functools.wraps(handler)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = {
+                    name: value.model_dump() if isinstance(value, BaseModel) else value
+                    for name, value in bound.arguments.items()
+                }
+                key = f"toolcache:{tool}:{params_digest(arguments)}"
+                tag_templates = tags(arguments) if callable(tags) else tags
+                entry_tags = sorted(tag.format(**arguments) for tag in tag_templates)
+                try:
+                    return await self.get_or_compute(
+                        tool, key, ttl, entry_tags, lambda: handler(*args, **kwargs), cacheable
+                    )
+                except _Uncacheable as e:
+                    return e.result
+
+            return wrapper
+
+        return decorator
+
+
+class _Uncacheable(Exception):
+    """A result passed through but not cached: an error response, or one the cacheable check rejected"""
+
+    def __init__(self, result: Any):
+        super().__init__("uncacheable result")
+        self.result = result
@@ -0,0 +1,295 @@
+"""
+Two-tier cache: in-process LRU in front of Redis
+Hot keys are served from a bounded per-worker LRU (tier 1) without a
+network round trip; Redis (tier 2) is shared by all workers. Every entry
+carries the versions of its tags at the time it was computed, and a lookup
+only accepts an entry whose versions match the current ones.
+
+Tag versions are counters in Redis. Invalidating a tag INCRs its counter
+and publishes the new version on a pub/sub channel; each worker keeps a
+local mirror of the versions it has seen, updated by those messages, so a
+lookup needs no Redis call at all when tier 1 hits. While the subscription
+is down the mirror can't be trusted: versions are then read from Redis on
+every lookup, and after resubscribing tier 1 and the mirror start empty,
+since messages may have been missed. Tier-1 TTLs are short, which bounds
+staleness even in the gap between a bump and its message arriving.
+
+Without Redis, or while it fails, tier 1 with local versions is the cache.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "mcp_cache_requests_total", "Two-tier cache lookups by cache, tier and result",
+    ["cache", "tier", "result"]  # tier l1/l2; result hit, miss, stale
+)
+CACHE_INVALIDATIONS = Counter(
+    "mcp_cache_invalidations_total", "Tag invalidations by cache",
+    ["cache"]
+)
+CACHE_L1_ITEMS = Gauge(
+    "mcp_cache_l1_items", "Entries held in the in-process tier",
+    ["cache"]
+)
+CACHE_L1_BYTES = Gauge(
+    "mcp_cache_l1_bytes", "Serialized size of the entries held in the in-process tier",
+    ["cache"]
+)
+
+INVALIDATION_CHANNEL = "mcp:cache:invalidate"
+
+
+class TwoTierCache:
+    """
+    Versioned JSON values in an in-process LRU backed by Redis
+
+    name prefixes the Redis keys and labels the metrics. Values must be
+    JSON-serializable; they are stored serialized in both tiers, so every
+    hit returns a fresh copy. The Redis client is attached at startup and
+    must decode responses; bus is set by InvalidationBus.register.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_client=None,
+        l1_max_items: int = 1000,
+        l1_max_bytes: int = 32 * 1024 * 1024,
+        l1_ttl_seconds: float = 60.0
+    ):
+        self.name = name
+        self.redis = redis_client
+        self.bus: Optional["InvalidationBus"] = None
+        self.l1_max_items = l1_max_items
+        self.l1_max_bytes = l1_max_bytes
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self._l1: "OrderedDict[str, Tuple[float, Dict[str, int], bytes]]" = OrderedDict()
+        self._l1_bytes = 0
+        self._versions: Dict[str, int] = {}
+        self._counts = {"l1_hit": 0, "l2_hit": 0, "miss": 0, "stale": 0}
+
+    def _tag_key(self, tag: str) -> str:
+        return f"cache:{self.name}:tag:{tag}"
+
+    @property
+    def mirror_live(self) -> bool:
+        """Whether local tag versions are current: no Redis, or a live invalidation subscription"""
+        return self.redis is None or (self.bus is not None and self.bus.connected)
+
+    async def versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Current version of each tag"""
+        tags = list(tags)
+        if self.redis is not None:
+            # With a live mirror only tags never seen before need a round trip
+            fetch = [tag for tag in tags if tag not in self._versions] if self.mirror_live else tags
+            if fetch:
+                try:
+                    values = await self.redis.mget([self._tag_key(tag) for tag in fetch])
+                    fetched = {tag: int(value or 0) for tag, value in zip(fetch, values)}
+                    if not self.mirror_live:
+                        return {tag: fetched.get(tag, 0) for tag in tags}
+                    self.apply_versions(fetched)
+                except Exception as e:
+                    logger.warning(f"Cache '{self.name}' Redis version lookup failed: {e}")
+        return {tag: self._versions.get(tag, 0) for tag in tags}
+
+    def _count(self, tier: str, result: str) -> None:
+        CACHE_REQUESTS.labels(self.name, tier, result).inc()
+
+    async def get(self, key: str, tags: Iterable[str] = ()) -> Tuple[Dict[str, int], Optional[Any], bool]:
+        """(current tag versions, cached value or None, whether a stale entry was found)"""
+        versions = await self.versions(tags)
+        stale = False
+
+        cached = self._l1.get(key)
+        if cached is not None:
+            expires, entry_versions, body = cached
+            if entry_versions == versions and expires >= time.monotonic():
+                self._l1.move_to_end(key)
+                self._count("l1", "hit")
+                self._counts["l1_hit"] += 1
+                return versions, fast_json.loads(body)["value"], False
+            stale = entry_versions != versions
+            self._drop(key)
+        self._count("l1", "stale" if stale else "miss")
+
+        if self.redis is not None:
+            try:
+                body = await self.redis.get(key)
+            except Exception as e:
+                logger.warning(f"Cache '{self.name}' Redis lookup failed: {e}")
+                body = None
+            if body is not None:
+                entry = fast_json.loads(body)
+                if entry["tags"] == versions:
+                    self._count("l2", "hit")
+                    self._counts["l2_hit"] += 1
+                    self._remember(key, versions, body.encode("utf-8") if isinstance(body, str) else body, None)
+                    return versions, entry["value"], False
+                stale = True
+            self._count("l2", "stale" if stale else "miss")
+
+        self._counts["stale" if stale else "miss"] += 1
+        return versions, None, stale
+
+    async def set(self, key: str, versions: Dict[str, int], value: Any, ttl_seconds: float) -> None:
+        """Store a value computed under the given tag versions in both tiers"""
+        body = fast_json.dumps({"tags": versions, "value": value})
+        self._remember(key, versions, body, ttl_seconds)
+        if self.redis is not None:
+            try:
+                await self.redis.setex(key, max(int(ttl_seconds), 1), body)
+            except Exception as e:
+                logger.warning(f"Cache '{self.name}' Redis write failed: {e}")
+
+    def _remember(self, key: str, versions: Dict[str, int], body: bytes, ttl_seconds: Optional[float]) -> None:
+        if len(body) > self.l1_max_bytes:
+            return
+        if ttl_seconds is None:
+            ttl = self.l1_ttl_seconds
+        elif self.redis is None:
+            ttl = ttl_seconds  # tier 1 is the only tier
+        else:
+            ttl = min(ttl_seconds, self.l1_ttl_seconds)
+        self._drop(key)
+        self._l1[key] = (time.monotonic() + ttl, versions, body)
+        self._l1_bytes += len(body)
+        while len(self._l1) > self.l1_max_items or self._l1_bytes > self.l1_max_bytes:
+            self._drop(next(iter(self._l1)))
+        self._update_gauges()
+
+    def _drop(self, key: str) -> None:
+        cached = self._l1.pop(key, None)
+        if cached is not None:
+            self._l1_bytes -= len(cached[2])
+            self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        CACHE_L1_ITEMS.labels(self.name).set(len(self._l1))
+        CACHE_L1_BYTES.labels(self.name).set(self._l1_bytes)
+
+    async def invalidate(self, *tags: str) -> None:
+        """Expire every entry carrying any of the tags, in all workers"""
+        for tag in tags:
+            CACHE_INVALIDATIONS.labels(self.name).inc()
+            version = self._versions.get(tag, 0) + 1
+            if self.redis is not None:
+                try:
+                    version = await self.redis.incr(self._tag_key(tag))
+                    if self.bus is not None:
+                        await self.bus.publish(self.name, {tag: version})
+                except Exception as e:
+                    # Other workers keep serving the tag until their tier-1 TTL runs out
+                    logger.error(f"Cache '{self.name}' invalidation of '{tag}' failed: {e}")
+            self.apply_versions({tag: version})
+
+    def apply_versions(self, versions: Dict[str, int]) -> None:
+        """Advance mirrored tag versions (from Redis or an invalidation message)"""
+        for tag, version in versions.items():
+            if version > self._versions.get(tag, -1):
+                self._versions[tag] = version
+
+    def reset(self) -> None:
+        """Forget tier 1 and mirrored versions (invalidations may have been missed)"""
+        self._l1.clear()
+        self._l1_bytes = 0
+        self._versions.clear()
+        self._update_gauges()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier hit ratios since startup and tier-1 memory use"""
+        total = sum(self._counts.values())
+        return {
+            "lookups": total,
+            "l1_items": len(self._l1),
+            "l1_bytes": self._l1_bytes,
+            "l1_hit_ratio": round(self._counts["l1_hit"] / total, 4) if total else 0.0,
+            "l2_hit_ratio": round(self._counts["l2_hit"] / total, 4) if total else 0.0,
+            "hit_ratio": round((self._counts["l1_hit"] + self._counts["l2_hit"]) / total, 4) if total else 0.0,
+            "invalidation_subscription": self.bus is not None and self.bus.connected
+        }
+
+
+class InvalidationBus:
+    """
+    Redis pub/sub fan-out of tag invalidations to every worker's caches
+
+    Messages are {"cache": name, "tags": {tag: version}}; applying one is
+    idempotent, so a worker also receiving its own messages is harmless.
+    """
+
+    def __init__(self, channel: str = INVALIDATION_CHANNEL, retry_seconds: float = 1.0):
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self.redis = None
+        self.connected = False
+        self.caches: Dict[str, TwoTierCache] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, cache: TwoTierCache) -> None:
+        self.caches[cache.name] = cache
+        cache.bus = self
+
+    async def publish(self, cache_name: str, versions: Dict[str, int]) -> None:
+        await self.redis.publish(
+            self.channel,
+            fast_json.dumps({"cache": cache_name, "tags": versions})
+        )
+
+    def handle(self, data: Any) -> None:
+        message = fast_json.loads(data)
+        cache = self.caches.get(message.get("cache"))
+        if cache is not None:
+            cache.apply_versions({tag: int(version) for tag, version in message["tags"].items()})
+
+    async def start(self, redis_client) -> None:
+        """Subscribe in the background; resubscribes after connection errors"""
+        self.redis = redis_client
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                for cache in self.caches.values():
+                    cache.reset()
+                self.connected = True
+                logger.info(f"Subscribed to cache invalidations on '{self.channel}'")
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        try:
+                            self.handle(message["data"])
+                        except Exception as e:
+                            logger.warning(f"Ignoring malformed cache invalidation: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscription lost, retrying: {e}")
+            finally:
+                self.connected = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(self.retry_seconds)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
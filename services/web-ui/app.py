@@ -877,7 +877,8 @@ with tab1:
                         "conversation_history": truncated_history,
                         "temperature": temperature,
                         "top_p": top_p,
-                        "top_k": top_k
+                        "top_k": top_k,
+                        "verbosity": "minimal"  # Chat view only shows step names and status
                     }
 
                     # Add image data for vision models
@@ -1180,7 +1181,8 @@ with tab2:
                         "conversation_history": st.session_state.agent_conversation_history,
                         "temperature": temperature,
                         "top_p": top_p,
-                        "top_k": top_k
+                        "top_k": top_k,
+                        "verbosity": "summary"
                     },
                     timeout=180
                 )
@@ -1985,11 +1987,12 @@ with tab6:
                             timeout=30
                         )
 
-                        if response.status_code == 200:
+                        # 202: stored, indexing continues in the background
+                        if response.status_code in (200, 202):
                             result = response.json()
                             st.success(get_text("rag_upload_success", lang).format(
                                 doc_id=result.get('doc_id'),
-                                chunks=result.get('chunks_count')
+                                status=result.get('status')
                             ))
                         else:
                             st.error(f"{get_text('rag_upload_error', lang)}: {response.text}")
@@ -2026,9 +2029,9 @@ with tab6:
                                 timeout=30
                             )
 
-                            if response.status_code == 200:
+                            if response.status_code in (200, 202):
                                 result = response.json()
-                                st.success(f"✅ Document created! ID: {result.get('doc_id')}, Chunks: {result.get('chunks_count')}")
+                                st.success(f"✅ Document created! ID: {result.get('doc_id')}, Indexing: {result.get('status')}")
                             else:
                                 st.error(f"❌ Error: {response.text}")
                         except Exception as e:
@@ -209,7 +209,7 @@ TRANSLATIONS = {
         "rag_doc_tags": "標籤 (逗號分隔)",
         "rag_upload_button": "上傳並向量化",
         "rag_uploading": "上傳中...",
-        "rag_upload_success": "✅ 文檔上傳成功！文檔ID: {doc_id}, 分塊數: {chunks}",
+        "rag_upload_success": "✅ 文檔上傳成功！文檔ID: {doc_id}, 索引狀態: {status}",
         "rag_upload_error": "❌ 上傳失敗",
         "rag_search_section": "🔍 語義搜索",
         "rag_search_query": "搜索內容",
@@ -471,7 +471,7 @@ TRANSLATIONS = {
         "rag_doc_tags": "标签 (逗号分隔)",
         "rag_upload_button": "上传并向量化",
         "rag_uploading": "上传中...",
-        "rag_upload_success": "✅ 文档上传成功！文档ID: {doc_id}, 分块数: {chunks}",
+        "rag_upload_success": "✅ 文档上传成功！文档ID: {doc_id}, 索引状态: {status}",
         "rag_upload_error": "❌ 上传失败",
         "rag_search_section": "🔍 语义搜索",
         "rag_search_query": "搜索内容",
@@ -733,7 +733,7 @@ TRANSLATIONS = {
         "rag_doc_tags": "Tags (comma-separated)",
         "rag_upload_button": "Upload & Vectorize",
         "rag_uploading": "Uploading...",
-        "rag_upload_success": "✅ Document uploaded successfully! Doc ID: {doc_id}, Chunks: {chunks}",
+        "rag_upload_success": "✅ Document uploaded successfully! Doc ID: {doc_id}, Indexing: {status}",
         "rag_upload_error": "❌ Upload failed",
         "rag_search_section": "🔍 Semantic Search",
         "rag_search_query": "Search Query",
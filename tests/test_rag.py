@@ -63,11 +63,21 @@ def test_create_document():
             json=doc_data
         )
 
-        if response.status_code == 200:
+        if response.status_code == 202:
             data = response.json()
-            print(f"   ✅ Document created: ID {data['doc_id']}")
-            print(f"   📊 Chunks created: {data['chunks_count']}")
+            print(f"   ✅ Document created: ID {data['doc_id']} (job {data['job_id']})")
             print(f"   📏 Content length: {data['content_length']}")
+
+            # Indexing runs in the background; wait for it
+            for _ in range(60):
+                status = requests.get(f"{MCP_SERVER_URL}/rag/documents/{data['doc_id']}/status").json()
+                if status["status"] in ("indexed", "failed"):
+                    break
+                time.sleep(1)
+            if status["status"] != "indexed":
+                print(f"   ❌ Indexing {status['status']}: {status.get('error')}")
+                return None
+            print(f"   📊 Chunks created: {status['chunks_count']}")
             return data['doc_id']
         else:
             print(f"   ❌ Error: {response.status_code}")